@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from datetime import datetime
 from typing import Optional
 
 
@@ -7,14 +8,62 @@ class Settings(BaseSettings):
     app_name: str = "Smart FCU Simulator"
     database_url: str = "sqlite+aiosqlite:///./data/hvac.db"
     environment: str = "development"
+    sql_echo: bool = False  # log every SQL statement (noisy; prefer the query profiler)
+
+    # Diagnostics
+    admin_token: Optional[str] = None  # X-Admin-Token for /api/diagnostics; disabled if unset
+    query_profile_sample_rate: float = 1.0  # share of requests and ticks profiled
+    slow_query_threshold: float = 0.1  # seconds; slower statements are logged
+    n_plus_one_threshold: int = 10  # repeats of one SELECT in a scope flagged as N+1
+    loop_monitor_enabled: bool = True
+    loop_lag_interval: float = 0.1  # seconds between event loop lag samples
+    blocking_threshold: float = 0.1  # seconds the loop may stall before the stack is captured
+    table_rows_interval: float = 60.0  # seconds between /metrics row counts (each scans the table)
 
     # Simulation settings
+    simulation_mode: str = "embedded"  # 'embedded' or 'external' (python -m app.simulation)
+    event_bus_host: str = "127.0.0.1"
+    event_bus_port: int = 8765
+    simulator_metrics_port: Optional[int] = None  # /metrics for the standalone simulator
     sensor_update_interval: float = 5.0  # seconds
+    tick_overrun_policy: str = "skip"  # 'skip' or 'merge' late ticks
+    tick_stagger_fraction: float = 0.8  # share of the interval zones are spread over
+    zone_concurrency: int = 8  # zone pipelines running at once
+    simulator_backend: str = "random_walk"  # 'random_walk' or 'rc_network'
+    rc_substeps: int = 10  # Euler sub-steps per tick for the RC network
+    simulation_seed: Optional[int] = None  # seeds every RNG and switches to a simulated clock
+    simulation_start: datetime = datetime(2024, 1, 1, 8, 0)  # simulated clock start (seeded runs)
+    trace_record_path: Optional[str] = None  # append generated readings/events to this trace
+    trace_replay_path: Optional[str] = None  # replay this trace instead of simulating
+    replay_speed: float = 1.0  # replay ticks at N x the recorded rate
+    simulation_shards: int = 0  # worker processes; 0 simulates in the API process
+    load_shedding_enabled: bool = True
+    shed_recovery_ticks: int = 5  # healthy ticks before stepping a level back
     prediction_horizon_minutes: int = 15
+    websocket_stats_window: Optional[int] = None  # 1, 5, 15 or 60: add that window's stats to readings
+    energy_max_gap: float = 60.0  # seconds; longer gaps between power readings aren't integrated
+    energy_flush_interval: float = 30.0  # seconds between energy counter writes
+    alert_rules_path: Optional[str] = None  # JSON list of alert rules; built-in rules if unset
+    adaptive_budget_ms: float = 5.0  # per-tick compute budget of the setpoint optimizer
+    adaptive_max_offset: float = 2.0  # furthest an applied setpoint may stray from the target
+    adaptive_comfort_band: float = 0.5  # deviation from target (°C) that costs no comfort
+    adaptive_energy_weight: float = 0.5  # cost of 1 kW relative to 1 °C² of discomfort
     discovery_check_interval: float = 30.0  # seconds
+    device_sync_seconds: float = 3.0  # simulated syncing -> online handshake
+    device_offline_timeout: float = 30.0  # seconds without a heartbeat before offline
+    heartbeat_flush_interval: float = 10.0  # seconds between batched last_seen writes
+    device_resync_interval: float = 60.0  # seconds between registry reloads from the DB
 
-    # Gemini API
+    # Chat assistant
     gemini_api_key: Optional[str] = None
+    chat_provider: str = "gemini"  # 'gemini' or 'fake' (offline, no API key needed)
+    chat_model: str = "gemini-3-flash-preview"
+    chat_max_concurrency: int = 4  # model calls in flight at once
+    chat_queue_timeout: float = 5.0  # seconds to wait for a free slot before rejecting
+    chat_timeout: float = 60.0  # seconds allowed per model call
+    chat_cache_size: int = 256  # cached answers; 0 disables the cache
+    chat_cache_ttl: float = 300.0  # seconds an answer is served from the cache
+    chat_context_refresh: float = 10.0  # seconds between zone summary rebuilds
 
     class Config:
         env_file = ".env"
@@ -1,27 +1,48 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+from typing import AsyncGenerator, Optional
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
 from sqlalchemy.orm import DeclarativeBase
 from app.config import get_settings
+from app.services.metrics import instrument_engine
+from app.services.query_profiler import query_profiler
 
-settings = get_settings()
-
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.environment == "development",
-)
-
+# Bound to the engine by `get_engine()`; importing this module connects nothing
 async_session_maker = async_sessionmaker(
-    engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+_engine: Optional[AsyncEngine] = None
+
+
+def get_engine() -> AsyncEngine:
+    """Create, instrument and bind the engine on first use."""
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        _engine = create_async_engine(settings.database_url, echo=settings.sql_echo)
+        instrument_engine(_engine)
+        query_profiler.configure(
+            sample_rate=settings.query_profile_sample_rate,
+            slow_seconds=settings.slow_query_threshold,
+            n_plus_one_threshold=settings.n_plus_one_threshold,
+        )
+        query_profiler.instrument(_engine)
+        async_session_maker.configure(bind=_engine)
+    return _engine
+
 
 class Base(DeclarativeBase):
     pass
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    get_engine()
     async with async_session_maker() as session:
         try:
             yield session
@@ -29,6 +50,32 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def _create_missing_indexes(conn):
+    """create_all skips existing tables, so add indexes defined since they were made."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
 async def init_db():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
+
+
+async def warm_up_pool():
+    """
+    Open every pooled connection at once and run a trivial query on each,
+    so the first requests after startup don't pay for connecting.
+    """
+    engine = get_engine()
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+
+    async def connect():
+        conn = await engine.connect()
+        await conn.exec_driver_sql("SELECT 1")
+        return conn
+
+    connections = await asyncio.gather(*(connect() for _ in range(size)))
+    for conn in connections:
+        await conn.close()
@@ -2,5 +2,6 @@ from app.models.zone import Zone
 from app.models.device import Device
 from app.models.sensor import SensorReading
 from app.models.prediction import Prediction
+from app.models.energy import EnergyCounter
 
-__all__ = ["Zone", "Device", "SensorReading", "Prediction"]
+__all__ = ["Zone", "Device", "SensorReading", "Prediction", "EnergyCounter"]
@@ -1,4 +1,4 @@
-from sqlalchemy import String, DateTime, JSON, ForeignKey, func
+from sqlalchemy import String, DateTime, JSON, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from typing import Optional
@@ -7,6 +7,11 @@ from app.database import Base
 
 class Device(Base):
     __tablename__ = "devices"
+    __table_args__ = (
+        # Keyset pagination on id within a zone or type
+        Index("ix_devices_zone_id_id", "zone_id", "id"),
+        Index("ix_devices_type_id", "type", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(50), primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
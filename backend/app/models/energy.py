@@ -0,0 +1,26 @@
+from sqlalchemy import Integer, String, Float, DateTime, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.database import Base
+
+# zone_id of the building-wide counters
+BUILDING = "*"
+
+
+class EnergyCounter(Base):
+    """Energy used by a zone (or the whole building) in one hour or day."""
+
+    __tablename__ = "energy_counters"
+    __table_args__ = (
+        # Every zone's counter for one period, without scanning the others
+        Index("ix_energy_counters_period_start", "period", "period_start"),
+    )
+
+    zone_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    period: Mapped[str] = mapped_column(String(10), primary_key=True)  # 'hour' or 'day'
+    period_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    kwh: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
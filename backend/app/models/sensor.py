@@ -1,4 +1,5 @@
-from sqlalchemy import Integer, String, Float, DateTime, ForeignKey, func
+from sqlalchemy import Integer, String, Float, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from typing import Optional
@@ -7,6 +8,12 @@ from app.database import Base
 
 class SensorReading(Base):
     __tablename__ = "sensor_readings"
+    __table_args__ = (
+        # Keyset pagination and time-range scans, overall and per zone/device
+        Index("ix_sensor_readings_timestamp_id", "timestamp", "id"),
+        Index("ix_sensor_readings_zone_timestamp_id", "zone_id", "timestamp", "id"),
+        Index("ix_sensor_readings_device_timestamp_id", "device_id", "timestamp", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     device_id: Mapped[str] = mapped_column(
@@ -15,7 +22,12 @@ class SensorReading(Base):
     zone_id: Mapped[str] = mapped_column(
         String(50), ForeignKey("zones.id"), nullable=False
     )
-    timestamp: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Bound values use the same second-precision text as the server default,
+    # so equality on a timestamp (as keyset cursors need) matches on SQLite
+    timestamp: Mapped[datetime] = mapped_column(
+        DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"),
+        server_default=func.now(),
+    )
     temperature: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     humidity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     co2_level: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
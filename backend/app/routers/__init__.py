@@ -3,6 +3,11 @@ from app.routers.devices import router as devices_router
 from app.routers.sensors import router as sensors_router
 from app.routers.predictions import router as predictions_router
 from app.routers.websocket import router as websocket_router
+from app.routers.metrics import router as metrics_router
+from app.routers.diagnostics import router as diagnostics_router
+from app.routers.energy import router as energy_router
+from app.routers.alerts import router as alerts_router
+from app.routers.control import router as control_router
 
 __all__ = [
     "zones_router",
@@ -10,4 +15,9 @@ __all__ = [
     "sensors_router",
     "predictions_router",
     "websocket_router",
+    "metrics_router",
+    "diagnostics_router",
+    "energy_router",
+    "alerts_router",
+    "control_router",
 ]
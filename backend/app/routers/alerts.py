@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+
+from app.config import get_settings
+from app.schemas import ActiveAlert
+from app.services.alerts import alert_engine
+
+router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+
+
+@router.get("", response_model=List[ActiveAlert])
+async def get_active_alerts(
+    zone_id: Optional[str] = Query(default=None),
+    severity: Optional[str] = Query(default=None),
+):
+    """Alerts currently raised, most recent first. Transitions are pushed on /ws/sensors."""
+    return [
+        alert
+        for alert in alert_engine.active()
+        if (zone_id is None or alert["zone_id"] == zone_id)
+        and (severity is None or alert["severity"] == severity)
+    ]
+
+
+@router.get("/rules")
+async def get_alert_rules():
+    """The compiled rule set."""
+    return alert_engine.rule_specs()
+
+
+@router.get("/status")
+async def get_alert_status():
+    """
+    Rule and zone counts and the per-tick evaluation cost. In external
+    simulation mode the rules run in the simulation process, so only the
+    rule count and the mirrored active count are known here.
+    """
+    report = alert_engine.report()
+    if get_settings().simulation_mode == "external":
+        return {"rules": report["rules"], "active": report["active"]}
+    return report
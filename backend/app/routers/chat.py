@@ -1,9 +1,13 @@
-from typing import List
+import json
+from typing import AsyncIterator, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.config import get_settings
+from app.services.chat_context import ResponseCache, ZoneContext
+from app.services.chat_provider import ChatBusyError, ChatGateway, create_chat_provider
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -25,7 +29,7 @@ You can help with:
 - Energy efficiency tips
 - Explaining what FCUs are and how they work
 
-Keep responses concise and helpful. If asked about specific system data, remind users to check the dashboard for real-time information."""
+Keep responses concise and helpful. If asked about specific system data that isn't in the current system state below, remind users to check the dashboard for real-time information."""
 
 
 class ChatMessage(BaseModel):
@@ -42,56 +46,92 @@ class ChatResponse(BaseModel):
     error: str | None = None
 
 
+settings = get_settings()
+
+# One long-lived provider client shared by every request
+chat_gateway = ChatGateway(
+    create_chat_provider(
+        settings.chat_provider, api_key=settings.gemini_api_key, model=settings.chat_model
+    ),
+    max_concurrency=settings.chat_max_concurrency,
+    queue_timeout=settings.chat_queue_timeout,
+    timeout=settings.chat_timeout,
+    cache=ResponseCache(max_entries=settings.chat_cache_size, ttl=settings.chat_cache_ttl),
+)
+
+# Live zone summary appended to the system prompt; refreshed in the background
+zone_context = ZoneContext(horizon_minutes=settings.prediction_horizon_minutes)
+
+NOT_CONFIGURED = "Gemini API key not configured. Please set GEMINI_API_KEY environment variable."
+TIMED_OUT = "The assistant took too long to respond, please try again"
+
+
+def _messages(request: ChatRequest) -> List[dict]:
+    return [{"role": msg.role, "content": msg.content} for msg in request.messages]
+
+
 @router.post("", response_model=ChatResponse)
 async def chat(request: ChatRequest) -> ChatResponse:
     """Send a message to the AI assistant and get a response."""
-    settings = get_settings()
-
-    if not settings.gemini_api_key:
-        return ChatResponse(
-            response="",
-            error="Gemini API key not configured. Please set GEMINI_API_KEY environment variable.",
-        )
+    if not chat_gateway.provider.available:
+        return ChatResponse(response="", error=NOT_CONFIGURED)
 
     try:
-        from google import genai
-
-        client = genai.Client(api_key=settings.gemini_api_key)
-
-        # Build conversation history
-        contents = []
-        for msg in request.messages:
-            contents.append(
-                {
-                    "role": "user" if msg.role == "user" else "model",
-                    "parts": [{"text": msg.content}],
-                }
-            )
-
-        # Call Gemini API
-        response = client.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=contents,
-            config={
-                "system_instruction": SYSTEM_PROMPT,
-                "temperature": 0.7,
-                "max_output_tokens": 500,
-            },
+        answer = await chat_gateway.complete(
+            _messages(request), zone_context.prompt(SYSTEM_PROMPT), zone_context.version
         )
-
-        return ChatResponse(response=response.text)
-
+        return ChatResponse(response=answer)
+    except ChatBusyError as e:
+        return ChatResponse(response="", error=str(e))
+    except TimeoutError:
+        return ChatResponse(response="", error=TIMED_OUT)
     except Exception as e:
-        print(f"Gemini API error: {e}")
+        print(f"Chat provider error: {e}")
         return ChatResponse(response="", error=f"Failed to get response: {str(e)}")
 
 
+def _event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Stream the assistant's answer as server-sent events: a `token` event per
+    chunk of text, then `done`, or a single `error` event.
+    """
+    messages = _messages(request)
+    system_prompt = zone_context.prompt(SYSTEM_PROMPT)
+    context = zone_context.version
+
+    async def events() -> AsyncIterator[str]:
+        if not chat_gateway.provider.available:
+            yield _event("error", {"error": NOT_CONFIGURED})
+            return
+        try:
+            async for chunk in chat_gateway.stream(messages, system_prompt, context):
+                yield _event("token", {"text": chunk})
+            yield _event("done", {})
+        except ChatBusyError as e:
+            yield _event("error", {"error": str(e)})
+        except TimeoutError:
+            yield _event("error", {"error": TIMED_OUT})
+        except Exception as e:
+            print(f"Chat provider error: {e}")
+            yield _event("error", {"error": f"Failed to get response: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/status")
 async def chat_status():
     """Check if chat is available (API key configured)."""
-    settings = get_settings()
-    has_key = bool(settings.gemini_api_key and settings.gemini_api_key.strip())
     return {
-        "available": has_key,
-        "model": "gemini-3-flash-preview",
+        "available": chat_gateway.provider.available,
+        "model": chat_gateway.provider.model,
+        "provider": chat_gateway.provider.name,
     }
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+
+from app.config import get_settings
+from app.services.setpoint_optimizer import setpoint_optimizer
+
+router = APIRouter(prefix="/api/control", tags=["control"])
+
+
+@router.get("")
+async def get_control_status():
+    """
+    Setpoints currently applied to adaptive zones, with the temperature and
+    power expected at them, and the optimizer's last per-tick cost. In
+    external simulation mode the zones are mirrored from the simulation's
+    `setpoint` events and the optimizer's cost is not known here.
+    """
+    report = setpoint_optimizer.report()
+    if get_settings().simulation_mode == "external":
+        return {"zones": report["zones"]}
+    return report
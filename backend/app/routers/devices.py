@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
@@ -7,26 +7,46 @@ from datetime import datetime
 from app.database import get_db
 from app.models import Device
 from app.schemas import DeviceResponse, DeviceStatusUpdate
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/api/devices", tags=["devices"])
 
 
 @router.get("", response_model=List[DeviceResponse])
 async def get_devices(
+    response: Response,
     zone_id: Optional[str] = Query(default=None),
     device_type: Optional[str] = Query(default=None),
+    cursor: Optional[str] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get all devices, optionally filtered by zone or type."""
-    query = select(Device)
+    """
+    Get devices ordered by id, optionally filtered by zone or type.
+
+    Without `limit` every matching device is returned. With it, results
+    are paged on id and X-Next-Cursor holds the `cursor` for the next page.
+    """
+    query = select(Device).order_by(Device.id)
 
     if zone_id:
         query = query.where(Device.zone_id == zone_id)
     if device_type:
         query = query.where(Device.type == device_type)
+    if cursor:
+        try:
+            (after,) = decode_cursor(cursor, 1)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(Device.id > str(after))
+    if limit:
+        query = query.limit(limit)
 
     result = await db.execute(query)
     devices = result.scalars().all()
+
+    if limit and len(devices) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(devices[-1].id)
     return devices
 
 
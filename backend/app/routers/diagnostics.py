@@ -0,0 +1,150 @@
+import asyncio
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import get_settings
+from app.services.loop_monitor import LoopMonitor
+from app.services.profiling import MemoryTracker, ProfilerBusyError, SamplingProfiler
+from app.services.query_profiler import query_profiler
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Diagnostics expose internals: disabled unless ADMIN_TOKEN is set, and callers must send it."""
+    token = get_settings().admin_token
+    if not token:
+        raise HTTPException(status_code=404, detail="Diagnostics are disabled; set ADMIN_TOKEN")
+    if not secrets.compare_digest(x_admin_token or "", token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+settings = get_settings()
+
+# Started by the application lifespan when LOOP_MONITOR_ENABLED is set
+loop_monitor = LoopMonitor(
+    interval=settings.loop_lag_interval,
+    block_threshold=settings.blocking_threshold,
+)
+
+cpu_profiler = SamplingProfiler()
+memory_tracker = MemoryTracker()
+
+router = APIRouter(
+    prefix="/api/diagnostics",
+    tags=["diagnostics"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/queries")
+async def get_query_profiles(
+    kind: Optional[str] = Query(None, pattern="^(request|tick)$"),
+    limit: int = Query(20, ge=1, le=50),
+):
+    """
+    Per-request and per-tick SQL profiles: query counts, SQL time, the
+    slowest statements and suspected N+1 patterns.
+    """
+    return query_profiler.report(kind=kind, limit=limit)
+
+
+@router.get("/loop")
+async def get_loop_health(limit: int = Query(20, ge=1, le=100)):
+    """
+    Event loop lag percentiles and recent stalls, each with the stack that
+    held the loop and the totals per culprit.
+    """
+    if not settings.loop_monitor_enabled:
+        raise HTTPException(status_code=404, detail="Loop monitor is disabled")
+    return loop_monitor.report(limit=limit)
+
+
+@router.get("/profile")
+async def get_cpu_profile(
+    seconds: float = Query(10.0, gt=0, le=60),
+    hz: float = Query(100.0, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+):
+    """
+    Sample every thread's stack for `seconds` while the service keeps
+    running. `collapsed` returns flamegraph.pl / speedscope input; `json`
+    returns the hottest functions.
+    """
+    try:
+        stacks = await asyncio.to_thread(cpu_profiler.sample, seconds, hz)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "collapsed":
+        return PlainTextResponse(SamplingProfiler.collapsed(stacks))
+    return {
+        "seconds": seconds,
+        "hz": hz,
+        "samples": sum(stacks.values()),
+        "functions": SamplingProfiler.top_functions(stacks),
+    }
+
+
+GROUP_BY = Query("lineno", pattern="^(lineno|filename|traceback)$")
+
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot(
+    frames: int = Query(10, ge=1, le=50),
+    group_by: str = GROUP_BY,
+    limit: int = Query(25, ge=1, le=200),
+):
+    """
+    Take a tracemalloc snapshot, starting tracing on first use. Allocations
+    made before tracing started are not seen, so diff against a snapshot
+    taken after it.
+    """
+    snapshot_id = await asyncio.to_thread(memory_tracker.snapshot, frames)
+    top = await asyncio.to_thread(memory_tracker.top, snapshot_id, group_by, limit)
+    return {"id": snapshot_id, "top": top}
+
+
+@router.get("/memory/snapshots")
+async def list_memory_snapshots():
+    return {"tracing": memory_tracker.tracing, "snapshots": memory_tracker.snapshots()}
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+async def get_memory_snapshot(
+    snapshot_id: int,
+    group_by: str = GROUP_BY,
+    limit: int = Query(25, ge=1, le=200),
+):
+    try:
+        top = await asyncio.to_thread(memory_tracker.top, snapshot_id, group_by, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {"id": snapshot_id, "top": top}
+
+
+@router.get("/memory/diff")
+async def diff_memory_snapshots(
+    base: int,
+    target: Optional[int] = None,
+    group_by: str = GROUP_BY,
+    limit: int = Query(25, ge=1, le=200),
+):
+    """Allocation growth from `base` to `target` (default: a new snapshot)."""
+    if memory_tracker.get(base) is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    if target is None:
+        # Taking it must not evict the snapshot being compared against
+        target = await asyncio.to_thread(memory_tracker.snapshot, keep=base)
+    try:
+        diff = await asyncio.to_thread(memory_tracker.diff, base, target, group_by, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return {"base": base, "target": target, "diff": diff}
+
+
+@router.delete("/memory")
+async def stop_memory_tracing():
+    """Stop tracemalloc and drop stored snapshots."""
+    memory_tracker.stop()
+    return {"tracing": False}
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Literal, Optional
+from datetime import datetime
+
+from app.database import get_db
+from app.models import EnergyCounter
+from app.models.energy import BUILDING
+from app.schemas import EnergyUsage, ZoneEnergyUsage
+from app.services.energy import energy_meter, period_start
+
+router = APIRouter(prefix="/api/energy", tags=["energy"])
+
+
+@router.get("", response_model=EnergyUsage)
+async def get_energy(
+    period: Literal["hour", "day"] = Query(default="day"),
+    at: Optional[datetime] = Query(default=None, description="Any time in the period; defaults to now"),
+    zone_id: Optional[str] = Query(default=None, description="Omit for the whole building"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    kWh used in one hour or day, building-wide or by one zone.
+
+    Counters are integrated from power readings as they are ingested, so
+    this is one primary key lookup plus the increments not yet flushed.
+    """
+    start = period_start(at or datetime.now(), period)
+    key = zone_id or BUILDING
+    counter = await db.get(EnergyCounter, (key, period, start))
+    kwh = (counter.kwh if counter else 0.0) + energy_meter.pending_kwh(key, period, start)
+    return {"zone_id": zone_id, "period": period, "period_start": start, "kwh": round(kwh, 4)}
+
+
+@router.get("/zones", response_model=ZoneEnergyUsage)
+async def get_zone_energy(
+    period: Literal["hour", "day"] = Query(default="day"),
+    at: Optional[datetime] = Query(default=None, description="Any time in the period; defaults to now"),
+    db: AsyncSession = Depends(get_db),
+):
+    """kWh per zone in one hour or day, largest consumers first."""
+    start = period_start(at or datetime.now(), period)
+    result = await db.execute(
+        select(EnergyCounter.zone_id, EnergyCounter.kwh).where(
+            EnergyCounter.period == period, EnergyCounter.period_start == start
+        )
+    )
+    kwh = {zone_id: value for zone_id, value in result.all()}
+    for zone_id, pending in energy_meter.pending_zones(period, start).items():
+        kwh[zone_id] = kwh.get(zone_id, 0.0) + pending
+    total = kwh.pop(BUILDING, 0.0) + energy_meter.pending_kwh(BUILDING, period, start)
+    zones = sorted(kwh.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "period": period,
+        "period_start": start,
+        "total_kwh": round(total, 4),
+        "zones": [
+            {"zone_id": zone_id, "period": period, "period_start": start, "kwh": round(value, 4)}
+            for zone_id, value in zones
+        ],
+    }
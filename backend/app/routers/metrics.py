@@ -0,0 +1,46 @@
+import asyncio
+import math
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select, func
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models import Zone, Device, SensorReading, Prediction
+from app.services.metrics import metrics, TABLE_ROWS
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+settings = get_settings()
+
+# Counting scans the whole table, sensor_readings included, so scrapes in
+# between reuse the last counts
+_table_rows_lock = asyncio.Lock()
+_table_rows_counted_at = -math.inf
+
+
+async def collect_table_rows():
+    """Refresh row counts per table, at most every `table_rows_interval` seconds."""
+    global _table_rows_counted_at
+    async with _table_rows_lock:
+        if time.monotonic() - _table_rows_counted_at < settings.table_rows_interval:
+            return
+        async with async_session_maker() as db:
+            for model in (Zone, Device, SensorReading, Prediction):
+                result = await db.execute(select(func.count()).select_from(model))
+                TABLE_ROWS.set(result.scalar_one(), table=model.__tablename__)
+        _table_rows_counted_at = time.monotonic()
+
+
+metrics.add_collector(collect_table_rows)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint."""
+    await metrics.collect()
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -6,8 +6,10 @@ from typing import List
 
 from app.database import get_db
 from app.models import SensorReading, Zone, Prediction
-from app.schemas import ZonePrediction, PredictionHistory, PredictionDataPoint
+from app.schemas import ZonePrediction, PredictionHistory
 from app.services import prediction_engine
+from app.services.metrics import PREDICTION_DURATION
+from app.utils.fast_json import FastJSONResponse
 
 router = APIRouter(prefix="/api/predictions", tags=["predictions"])
 
@@ -51,7 +53,8 @@ async def get_zone_prediction(zone_id: str, db: AsyncSession = Depends(get_db)):
         )
 
     current_temp = temps[-1]
-    predicted_temp, confidence, trend = prediction_engine.predict(temps)
+    with PREDICTION_DURATION.time():
+        predicted_temp, confidence, trend = prediction_engine.predict(temps)
 
     return ZonePrediction(
         zone_id=zone_id,
@@ -78,23 +81,17 @@ async def get_prediction_history(
 
     # Get stored predictions
     cutoff = datetime.now() - timedelta(minutes=minutes)
+    # Column tuples encoded straight to the PredictionHistory shape
     query = (
-        select(Prediction)
+        select(Prediction.timestamp, Prediction.current_temp, Prediction.predicted_temp)
         .where(Prediction.zone_id == zone_id)
         .where(Prediction.timestamp >= cutoff)
         .order_by(Prediction.timestamp)
     )
 
     result = await db.execute(query)
-    predictions = result.scalars().all()
-
-    data_points = [
-        PredictionDataPoint(
-            timestamp=p.timestamp,
-            current_temp=p.current_temp,
-            predicted_temp=p.predicted_temp,
-        )
-        for p in predictions
+    data = [
+        {"timestamp": timestamp, "current_temp": current, "predicted_temp": predicted}
+        for timestamp, current, predicted in result.all()
     ]
-
-    return PredictionHistory(zone_id=zone_id, data=data_points)
+    return FastJSONResponse({"zone_id": zone_id, "data": data})
@@ -1,34 +1,92 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, tuple_
 from typing import List, Optional
 from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models import SensorReading, Zone
-from app.schemas import SensorReadingResponse, ZoneSensorHistory, SensorDataPoint
+from app.schemas import (
+    SensorReadingResponse,
+    ZoneSensorHistory,
+    SensorDataPoint,
+    ZoneRollingStats,
+)
+from app.services.rolling_stats import WINDOW_MINUTES, rolling_stats
+from app.utils.fast_json import FastJSONResponse
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/api/sensors", tags=["sensors"])
 
+# Columns of SensorReadingResponse / SensorDataPoint, in schema field order.
+# List endpoints select these as plain tuples and encode them directly,
+# skipping ORM entities and per-row Pydantic models; `response_model`
+# still documents the schema.
+METRIC_COLUMNS = (
+    SensorReading.temperature,
+    SensorReading.humidity,
+    SensorReading.co2_level,
+    SensorReading.power_kw,
+    SensorReading.occupancy,
+)
+READING_COLUMNS = METRIC_COLUMNS + (
+    SensorReading.id,
+    SensorReading.device_id,
+    SensorReading.zone_id,
+    SensorReading.timestamp,
+)
+DATA_POINT_COLUMNS = (SensorReading.timestamp,) + METRIC_COLUMNS
+
 
 @router.get("/readings", response_model=List[SensorReadingResponse])
 async def get_readings(
     zone_id: Optional[str] = Query(default=None),
     device_id: Optional[str] = Query(default=None),
-    limit: int = Query(default=100, le=1000),
+    since: Optional[datetime] = Query(default=None),
+    until: Optional[datetime] = Query(default=None),
+    cursor: Optional[str] = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get sensor readings, optionally filtered by zone or device."""
-    query = select(SensorReading).order_by(desc(SensorReading.timestamp)).limit(limit)
+    """
+    Get sensor readings, newest first, optionally filtered by zone, device
+    and time range (`since` inclusive, `until` exclusive).
+
+    Pages are keyed on (timestamp, id): when more rows remain, the
+    X-Next-Cursor header holds the `cursor` for the next page, so every
+    page costs one index range scan however deep it is.
+    """
+    query = (
+        select(*READING_COLUMNS)
+        .order_by(desc(SensorReading.timestamp), desc(SensorReading.id))
+        .limit(limit)
+    )
 
     if zone_id:
         query = query.where(SensorReading.zone_id == zone_id)
     if device_id:
         query = query.where(SensorReading.device_id == device_id)
+    if since:
+        query = query.where(SensorReading.timestamp >= since)
+    if until:
+        query = query.where(SensorReading.timestamp < until)
+    if cursor:
+        try:
+            timestamp, reading_id = decode_cursor(cursor, 2)
+            after = (datetime.fromisoformat(timestamp), int(reading_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(SensorReading.timestamp, SensorReading.id) < after)
 
     result = await db.execute(query)
-    readings = result.scalars().all()
-    return readings
+    rows = result.all()
+
+    keys = [column.key for column in READING_COLUMNS]
+    response = FastJSONResponse([dict(zip(keys, row)) for row in rows])
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.timestamp, last.id)
+    return response
 
 
 @router.get("/zones/{zone_id}/history", response_model=ZoneSensorHistory)
@@ -49,29 +107,18 @@ async def get_zone_sensor_history(
     cutoff = datetime.now() - timedelta(minutes=minutes)
 
     query = (
-        select(SensorReading)
+        select(*DATA_POINT_COLUMNS)
         .where(SensorReading.zone_id == zone_id)
         .where(SensorReading.timestamp >= cutoff)
         .order_by(SensorReading.timestamp)
     )
 
     result = await db.execute(query)
-    readings = result.scalars().all()
-
-    # Convert to data points
-    data_points = [
-        SensorDataPoint(
-            timestamp=r.timestamp,
-            temperature=r.temperature,
-            humidity=r.humidity,
-            co2_level=r.co2_level,
-            power_kw=r.power_kw,
-            occupancy=r.occupancy,
-        )
-        for r in readings
-    ]
 
-    return ZoneSensorHistory(zone_id=zone_id, readings=data_points)
+    # Encode the rows straight to the ZoneSensorHistory shape
+    keys = [column.key for column in DATA_POINT_COLUMNS]
+    readings = [dict(zip(keys, row)) for row in result.all()]
+    return FastJSONResponse({"zone_id": zone_id, "readings": readings})
 
 
 @router.get("/zones/{zone_id}/latest", response_model=SensorDataPoint)
@@ -98,3 +145,36 @@ async def get_zone_latest_reading(zone_id: str, db: AsyncSession = Depends(get_d
         power_kw=reading.power_kw,
         occupancy=reading.occupancy,
     )
+
+
+def _window(window: Optional[int]) -> Optional[int]:
+    if window is not None and window not in WINDOW_MINUTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"window must be one of {', '.join(map(str, WINDOW_MINUTES))} minutes",
+        )
+    return window
+
+
+@router.get("/stats", response_model=List[ZoneRollingStats])
+async def get_rolling_stats(window: Optional[int] = Query(default=None)):
+    """
+    Rolling mean/min/max/stddev of every zone's metrics over the 1, 5, 15
+    and 60 minute windows (or only `window`). Served from memory, kept up
+    to date as readings are ingested.
+    """
+    window = _window(window)
+    now = datetime.now()
+    return [
+        {"zone_id": zone_id, "windows": rolling_stats.zone(zone_id, now, window)}
+        for zone_id in rolling_stats.zone_ids()
+    ]
+
+
+@router.get("/zones/{zone_id}/stats", response_model=ZoneRollingStats)
+async def get_zone_rolling_stats(zone_id: str, window: Optional[int] = Query(default=None)):
+    """Rolling statistics for one zone."""
+    windows = rolling_stats.zone(zone_id, window_minutes=_window(window))
+    if windows is None:
+        raise HTTPException(status_code=404, detail="No readings found for zone")
+    return {"zone_id": zone_id, "windows": windows}
@@ -3,6 +3,8 @@ from typing import List
 import json
 import asyncio
 
+from app.services.metrics import BROADCAST_DURATION, WEBSOCKET_CONNECTIONS
+
 router = APIRouter(tags=["websocket"])
 
 
@@ -23,11 +25,12 @@ class ConnectionManager:
     async def broadcast(self, message: dict):
         """Send message to all connected clients."""
         disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.append(connection)
+        with BROADCAST_DURATION.time(type=message.get("type", "unknown")):
+            for connection in self.active_connections:
+                try:
+                    await connection.send_json(message)
+                except Exception:
+                    disconnected.append(connection)
 
         # Clean up disconnected clients
         for conn in disconnected:
@@ -43,6 +46,7 @@ class ConnectionManager:
 
 # Global connection manager
 manager = ConnectionManager()
+WEBSOCKET_CONNECTIONS.set_function(lambda: len(manager.active_connections))
 
 
 @router.websocket("/ws/sensors")
@@ -55,6 +59,9 @@ async def websocket_endpoint(websocket: WebSocket):
     - prediction: Updated prediction
     - device_discovered: New device detected
     - device_status: Device status change
+    - alert: Alert rule raised or cleared for a zone, or `active` when a
+      standing alert is restated after reconnecting to an external simulator
+    - setpoint: Setpoint applied to an adaptive zone changed
     """
     await manager.connect(websocket)
 
@@ -20,6 +20,8 @@ from app.schemas.sensor import (
     SensorDataPoint,
     ZoneSensorHistory,
     RealtimeSensorEvent,
+    MetricStats,
+    ZoneRollingStats,
 )
 from app.schemas.prediction import (
     PredictionBase,
@@ -29,6 +31,8 @@ from app.schemas.prediction import (
     PredictionHistory,
     RealtimePredictionEvent,
 )
+from app.schemas.energy import EnergyUsage, ZoneEnergyUsage
+from app.schemas.alert import ActiveAlert
 
 __all__ = [
     "ZoneBase",
@@ -48,10 +52,15 @@ __all__ = [
     "SensorDataPoint",
     "ZoneSensorHistory",
     "RealtimeSensorEvent",
+    "MetricStats",
+    "ZoneRollingStats",
     "PredictionBase",
     "PredictionResponse",
     "ZonePrediction",
     "PredictionDataPoint",
     "PredictionHistory",
     "RealtimePredictionEvent",
+    "EnergyUsage",
+    "ZoneEnergyUsage",
+    "ActiveAlert",
 ]
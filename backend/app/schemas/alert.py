@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ActiveAlert(BaseModel):
+    rule: str
+    zone_id: str
+    severity: str
+    message: str
+    since: datetime
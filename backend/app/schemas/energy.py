@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Literal, Optional
+
+
+class EnergyUsage(BaseModel):
+    zone_id: Optional[str] = None  # None for the whole building
+    period: Literal["hour", "day"]
+    period_start: datetime
+    kwh: float
+
+
+class ZoneEnergyUsage(BaseModel):
+    period: Literal["hour", "day"]
+    period_start: datetime
+    total_kwh: float
+    zones: List[EnergyUsage]
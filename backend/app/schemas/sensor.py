@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 class SensorReadingBase(BaseModel):
@@ -46,3 +46,17 @@ class RealtimeSensorEvent(BaseModel):
     device_id: str
     data: SensorReadingBase
     timestamp: datetime
+
+
+class MetricStats(BaseModel):
+    count: int
+    mean: float
+    min: float
+    max: float
+    stddev: float
+
+
+class ZoneRollingStats(BaseModel):
+    zone_id: str
+    # Window ("1m", "5m", ...) -> metric -> stats, None if no samples in the window
+    windows: Dict[str, Dict[str, Optional[MetricStats]]]
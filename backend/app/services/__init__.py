@@ -1,12 +1,26 @@
-from app.services.simulator import MockDataGenerator, mock_generator
+from app.services.simulator import MockDataGenerator, mock_generator, create_simulator
 from app.services.prediction_engine import PredictionEngine, prediction_engine
 from app.services.device_discovery import DeviceDiscoverySimulator, discovery_simulator
+from app.services.metrics import MetricsRegistry, metrics
+from app.services.scheduler import TickScheduler
+from app.services.load_shedder import LoadShedder
+from app.services.sharded_simulator import ShardedSimulator, ShardBatch
+from app.services.event_bus import EventBus, event_bus
 
 __all__ = [
     "MockDataGenerator",
     "mock_generator",
+    "create_simulator",
     "PredictionEngine",
     "prediction_engine",
     "DeviceDiscoverySimulator",
     "discovery_simulator",
+    "MetricsRegistry",
+    "metrics",
+    "TickScheduler",
+    "LoadShedder",
+    "ShardedSimulator",
+    "ShardBatch",
+    "EventBus",
+    "event_bus",
 ]
@@ -0,0 +1,343 @@
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.metrics import ACTIVE_ALERTS, ALERT_EVALUATION_DURATION, ALERT_TRANSITIONS
+
+# Values a rule can test, one column each in the engine's zone table
+COLUMNS: Tuple[str, ...] = (
+    "temperature",
+    "humidity",
+    "co2_level",
+    "power_kw",
+    "occupancy",
+    "predicted_temp",
+)
+_COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+
+@dataclass
+class AlertRule:
+    """
+    One threshold check, applied to every zone in `zones` (all if None).
+
+    The alert raises once the value is past `threshold` for `for_ticks`
+    consecutive ticks and clears once it is back past `clear_threshold`
+    (hysteresis; defaults to `threshold`) for `clear_ticks` ticks. With
+    `deviation`, the value tested is |metric - setpoint| instead of the
+    metric itself.
+    """
+
+    name: str
+    metric: str
+    threshold: float
+    op: str = ">"
+    clear_threshold: Optional[float] = None
+    deviation: bool = False
+    for_ticks: int = 1
+    clear_ticks: int = 1
+    zones: Optional[List[str]] = None
+    severity: str = "warning"
+    description: str = ""
+
+    def __post_init__(self):
+        if self.metric not in _COLUMN_INDEX:
+            raise ValueError(f"Rule {self.name}: unknown metric {self.metric!r}")
+        if self.op not in (">", "<"):
+            raise ValueError(f"Rule {self.name}: op must be '>' or '<'")
+        if self.clear_threshold is None:
+            self.clear_threshold = self.threshold
+        sign = 1 if self.op == ">" else -1
+        if sign * self.clear_threshold > sign * self.threshold:
+            raise ValueError(
+                f"Rule {self.name}: clear_threshold must not be past the threshold"
+            )
+        if self.for_ticks < 1 or self.clear_ticks < 1:
+            raise ValueError(f"Rule {self.name}: for_ticks and clear_ticks must be >= 1")
+
+
+DEFAULT_RULES: Tuple[AlertRule, ...] = (
+    AlertRule(
+        name="co2_high",
+        metric="co2_level",
+        threshold=1000.0,
+        clear_threshold=900.0,
+        for_ticks=3,
+        clear_ticks=3,
+        description="CO2 above 1000 ppm",
+    ),
+    AlertRule(
+        name="server_room_drift",
+        metric="temperature",
+        threshold=2.0,
+        clear_threshold=1.0,
+        deviation=True,
+        for_ticks=3,
+        clear_ticks=3,
+        zones=["server-room"],
+        severity="critical",
+        description="Server room more than 2 °C from setpoint",
+    ),
+    AlertRule(
+        name="predicted_breach",
+        metric="predicted_temp",
+        threshold=3.0,
+        clear_threshold=2.0,
+        deviation=True,
+        for_ticks=2,
+        clear_ticks=2,
+        description="Forecast more than 3 °C from setpoint within the horizon",
+    ),
+)
+
+
+def load_rules(path: str) -> List[AlertRule]:
+    """Rules from a JSON file holding a list of AlertRule fields."""
+    with open(path) as f:
+        return [AlertRule(**spec) for spec in json.load(f)]
+
+
+class AlertEngine:
+    """
+    Threshold alerts over every zone, evaluated once per tick.
+
+    The ingest path writes each zone's latest reading, forecast and
+    setpoint into a zone x column table. Rules are compiled into
+    parallel arrays (column, sign, thresholds, debounce counts, zone
+    mask), so a tick's evaluation is a handful of numpy operations on a
+    rules x zones matrix rather than a Python loop per rule and zone.
+
+    ">" and "<" rules share one comparison by negating the values and
+    thresholds of "<" rules. Missing values (NaN) neither raise nor
+    clear; they hold the alert's state and its debounce counters. Each
+    evaluation consumes the values observed since the previous one, so a
+    zone that didn't report in between (its pipeline is still running,
+    or a replayed trace lacks it) holds too instead of counting its old
+    reading again.
+
+    A process that doesn't evaluate the rules itself can `follow` the
+    alert events of one that does, to serve the same active set.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule] = DEFAULT_RULES, capacity: int = 64):
+        self._zone_index: Dict[str, int] = {}
+        self._zone_ids: List[str] = []
+        self._values = np.full((capacity, len(COLUMNS)), np.nan)
+        self._setpoints = np.full(capacity, np.nan)
+        self.last_evaluation = 0.0
+        self.evaluations = 0
+        self.total_evaluation = 0.0
+        self.compile(rules)
+        ACTIVE_ALERTS.set_function(lambda: int(self._active.sum()))
+
+    def compile(self, rules: Iterable[AlertRule]):
+        """Replace the rule set; all alert state is reset."""
+        self.rules = list(rules)
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Alert rule names must be unique")
+        self._rule_index = {name: i for i, name in enumerate(names)}
+        sign = np.array([1.0 if rule.op == ">" else -1.0 for rule in self.rules])
+        self._sign = sign[:, None]
+        self._columns = np.array([_COLUMN_INDEX[rule.metric] for rule in self.rules], dtype=int)
+        self._deviation = np.array([rule.deviation for rule in self.rules], dtype=bool)[:, None]
+        self._trigger = (sign * [rule.threshold for rule in self.rules])[:, None]
+        self._clear = (sign * [rule.clear_threshold for rule in self.rules])[:, None]
+        self._for_ticks = np.array([rule.for_ticks for rule in self.rules])[:, None]
+        self._clear_ticks = np.array([rule.clear_ticks for rule in self.rules])[:, None]
+        self._scoped = [
+            (i, set(rule.zones)) for i, rule in enumerate(self.rules) if rule.zones is not None
+        ]
+        self._reset_state()
+
+    def _reset_state(self):
+        shape = (len(self.rules), self._values.shape[0])
+        self._active = np.zeros(shape, dtype=bool)
+        self._breach_streak = np.zeros(shape, dtype=np.int32)
+        self._clear_streak = np.zeros(shape, dtype=np.int32)
+        self._since = np.zeros(shape)
+        self._build_mask()
+
+    def _build_mask(self):
+        self._mask = np.ones((len(self.rules), self._values.shape[0]), dtype=bool)
+        for i, zones in self._scoped:
+            self._mask[i] = False
+            for zone_id in zones:
+                index = self._zone_index.get(zone_id)
+                if index is not None:
+                    self._mask[i, index] = True
+
+    def _index(self, zone_id: str) -> int:
+        index = self._zone_index.get(zone_id)
+        if index is not None:
+            return index
+        index = self._zone_index[zone_id] = len(self._zone_ids)
+        self._zone_ids.append(zone_id)
+        capacity = self._values.shape[0]
+        if index >= capacity:
+            grow = capacity
+            self._values = np.vstack([self._values, np.full((grow, len(COLUMNS)), np.nan)])
+            self._setpoints = np.concatenate([self._setpoints, np.full(grow, np.nan)])
+            pad = ((0, 0), (0, grow))
+            self._active = np.pad(self._active, pad)
+            self._breach_streak = np.pad(self._breach_streak, pad)
+            self._clear_streak = np.pad(self._clear_streak, pad)
+            self._since = np.pad(self._since, pad)
+            self._mask = np.pad(self._mask, pad)
+        self._mask[:, index] = True
+        for i, zones in self._scoped:
+            self._mask[i, index] = zone_id in zones
+        return index
+
+    def set_setpoints(self, zones: Iterable[Tuple[str, float]]):
+        for zone_id, setpoint in zones:
+            index = self._index(zone_id)
+            self._setpoints[index] = setpoint
+
+    def observe(self, zone_id: str, reading: dict):
+        """Record a zone's latest reading."""
+        index = self._index(zone_id)  # may grow the table
+        row = self._values[index]
+        for i, name in enumerate(COLUMNS[:-1]):
+            value = reading.get(name)
+            row[i] = np.nan if value is None else value
+
+    def observe_prediction(self, zone_id: str, predicted_temp: Optional[float]):
+        index = self._index(zone_id)
+        self._values[index, -1] = np.nan if predicted_temp is None else predicted_temp
+
+    def evaluate(self, now: Optional[datetime] = None) -> List[dict]:
+        """Advance every rule by one tick; returns the raised and cleared alert events."""
+        started = time.perf_counter()
+        n = len(self._zone_ids)
+        if not self.rules or not n:
+            return []
+        now = now or datetime.now()
+
+        values = self._values[:n, self._columns].T
+        values = np.where(
+            self._deviation, np.abs(values - self._setpoints[:n]), values
+        ) * self._sign
+        valid = ~np.isnan(values) & self._mask[:, :n]
+        with np.errstate(invalid="ignore"):
+            breach = valid & (values > self._trigger)
+            clear = valid & (values < self._clear)
+
+        active = self._active[:, :n]
+        breach_streak = self._breach_streak[:, :n]
+        clear_streak = self._clear_streak[:, :n]
+        breach_streak[:] = np.where(breach, breach_streak + 1, np.where(valid, 0, breach_streak))
+        clear_streak[:] = np.where(clear, clear_streak + 1, np.where(valid, 0, clear_streak))
+
+        raised = ~active & (breach_streak >= self._for_ticks)
+        cleared = active & (clear_streak >= self._clear_ticks)
+        active |= raised
+        active &= ~cleared
+        self._since[:, :n][raised] = now.timestamp()
+        # Consumed: a zone without a new reading by next tick holds
+        self._values[:n] = np.nan
+
+        events = self._events(raised, "raised", values, now) + self._events(
+            cleared, "cleared", values, now
+        )
+
+        elapsed = time.perf_counter() - started
+        self.last_evaluation = elapsed
+        self.evaluations += 1
+        self.total_evaluation += elapsed
+        ALERT_EVALUATION_DURATION.observe(elapsed)
+        return events
+
+    def _events(self, transitions: np.ndarray, state: str, values: np.ndarray, now: datetime) -> List[dict]:
+        events = []
+        timestamp = now.isoformat()
+        for r, z in zip(*np.nonzero(transitions)):
+            rule = self.rules[r]
+            ALERT_TRANSITIONS.inc(severity=rule.severity, state=state)
+            events.append(
+                {
+                    "type": "alert",
+                    "state": state,
+                    "rule": rule.name,
+                    "zone_id": self._zone_ids[z],
+                    "severity": rule.severity,
+                    "metric": rule.metric,
+                    "value": round(float(values[r, z] * self._sign[r, 0]), 3),
+                    "threshold": rule.threshold if state == "raised" else rule.clear_threshold,
+                    "message": rule.description,
+                    "timestamp": timestamp,
+                }
+            )
+        return events
+
+    def snapshot(self) -> List[dict]:
+        """An `active` alert event per raised alert, for subscribers joining late."""
+        n = len(self._zone_ids)
+        return [
+            {
+                "type": "alert",
+                "state": "active",
+                "rule": self.rules[r].name,
+                "zone_id": self._zone_ids[z],
+                "severity": self.rules[r].severity,
+                "metric": self.rules[r].metric,
+                "message": self.rules[r].description,
+                "timestamp": datetime.fromtimestamp(self._since[r, z]).isoformat(),
+            }
+            for r, z in zip(*np.nonzero(self._active[:, :n]))
+        ]
+
+    async def follow(self, event: dict):
+        """Event bus handler mirroring the alert transitions published elsewhere."""
+        if event.get("type") != "alert":
+            return
+        r = self._rule_index.get(event["rule"])
+        if r is None:
+            return
+        z = self._index(event["zone_id"])
+        if event["state"] == "cleared":
+            self._active[r, z] = False
+        else:
+            self._active[r, z] = True
+            self._since[r, z] = datetime.fromisoformat(event["timestamp"]).timestamp()
+
+    def active(self) -> List[dict]:
+        """Currently raised alerts, most recent first."""
+        n = len(self._zone_ids)
+        alerts = [
+            {
+                "rule": self.rules[r].name,
+                "zone_id": self._zone_ids[z],
+                "severity": self.rules[r].severity,
+                "message": self.rules[r].description,
+                "since": datetime.fromtimestamp(self._since[r, z]),
+            }
+            for r, z in zip(*np.nonzero(self._active[:, :n]))
+        ]
+        alerts.sort(key=lambda alert: alert["since"], reverse=True)
+        return alerts
+
+    def report(self) -> dict:
+        return {
+            "rules": len(self.rules),
+            "zones": len(self._zone_ids),
+            "active": int(self._active.sum()),
+            "evaluations": self.evaluations,
+            "last_evaluation_ms": round(self.last_evaluation * 1000, 3),
+            "mean_evaluation_ms": (
+                round(self.total_evaluation / self.evaluations * 1000, 3)
+                if self.evaluations
+                else 0.0
+            ),
+        }
+
+    def rule_specs(self) -> List[dict]:
+        return [asdict(rule) for rule in self.rules]
+
+
+# Fed by the simulation's ingest path; rules are loaded by the simulation
+alert_engine = AlertEngine()
@@ -0,0 +1,224 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.models import Zone
+from app.services.metrics import BACKGROUND_EXCEPTIONS
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,;:!?¿¡\"'`"
+
+# How far a live reading may move before answers grounded in the summary
+# are stale. Smaller moves are mostly sensor noise; they still show up in the
+# summary but keep its version, so cached answers outlive routine refreshes.
+# Forecasts extrapolate those readings and swing by degrees between
+# refreshes, so only the cache TTL bounds them.
+STALE_AFTER = {
+    "temperature": 1.0,
+    "humidity": 5.0,
+    "co2_level": 150.0,
+    "power_kw": 1.5,
+    "occupancy": 5,
+}
+
+
+def normalize_prompt(text: str) -> str:
+    """Case, whitespace and trailing punctuation don't make a question different."""
+    return _WHITESPACE.sub(" ", text.casefold()).strip(_EDGE_PUNCTUATION)
+
+
+class ResponseCache:
+    """
+    LRU cache of chat answers keyed by the normalized conversation and the
+    `ZoneContext.version` the answer was grounded in, so an answer is only
+    reused while the live context hasn't materially changed. Entries also
+    expire `ttl` seconds after they were stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(messages: List[dict], context: int = 0) -> str:
+        return f"{context}\n" + "\n".join(
+            f"{message['role']}:{normalize_prompt(message['content'])}" for message in messages
+        )
+
+    def get(self, messages: List[dict], context: int = 0) -> Optional[str]:
+        key = self.key(messages, context)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, answer = entry
+        if self._clock() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return answer
+
+    def put(self, messages: List[dict], answer: str, context: int = 0):
+        if not answer or self.max_entries <= 0:
+            return
+        key = self.key(messages, context)
+        self._entries[key] = (self._clock(), answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class ZoneContext:
+    """
+    Compact text summary of live zone state for grounding chat answers.
+
+    Latest readings and predictions are taken from bus events as they are
+    published; zone names and setpoints are re-read every refresh. The
+    summary is rebuilt on that schedule, so building a prompt is a string
+    concatenation rather than a round of queries.
+
+    `version` goes up when the zones, their setpoints or modes, or which
+    readings and forecasts are available change, or when a reading has moved
+    more than `STALE_AFTER` since the last version. Readings jitter every
+    tick, so versioning on the rendered text would expire cached answers at
+    every refresh.
+    """
+
+    def __init__(self, horizon_minutes: int = 15, max_zones: int = 50):
+        self.horizon_minutes = horizon_minutes
+        self.max_zones = max_zones
+        self.summary = ""
+        self.version = 0
+        self.updated_at: Optional[datetime] = None
+        self._zones: List[Tuple[str, str, float, bool]] = []
+        # Structure and live values as of the current version
+        self._versioned: Optional[Tuple[tuple, Dict[Tuple[str, str], float]]] = None
+        self._readings: Dict[str, dict] = {}
+        self._predictions: Dict[str, dict] = {}
+        self._running = False
+
+    async def observe(self, event: dict):
+        """Event bus handler keeping the latest reading and prediction per zone."""
+        if event.get("type") == "reading":
+            self._readings[event["zone_id"]] = event["data"]
+        elif event.get("type") == "prediction":
+            self._predictions[event["zone_id"]] = event
+
+    def _zone_line(self, zone_id: str, name: str, setpoint: float, adaptive: bool) -> str:
+        line = f"- {name} ({zone_id}): setpoint {setpoint:.1f}°C"
+        if adaptive:
+            line += ", adaptive"
+        reading = self._readings.get(zone_id)
+        if reading:
+            parts = []
+            if reading.get("temperature") is not None:
+                parts.append(f"{reading['temperature']:.1f}°C")
+            if reading.get("humidity") is not None:
+                parts.append(f"{reading['humidity']:.0f}% RH")
+            if reading.get("co2_level") is not None:
+                parts.append(f"{reading['co2_level']:.0f} ppm CO2")
+            if reading.get("power_kw") is not None:
+                parts.append(f"{reading['power_kw']:.1f} kW")
+            if reading.get("occupancy") is not None:
+                parts.append(f"{reading['occupancy']} occupants")
+            if parts:
+                line += "; now " + ", ".join(parts)
+        prediction = self._predictions.get(zone_id)
+        if prediction:
+            line += (
+                f"; {prediction['predicted_temp']:.1f}°C predicted in "
+                f"{self.horizon_minutes} min ({prediction['trend']}, "
+                f"{prediction['confidence']:.0%} confidence)"
+            )
+        return line
+
+    def render(self) -> str:
+        lines = [self._zone_line(*zone) for zone in self._zones[: self.max_zones]]
+        if len(self._zones) > self.max_zones:
+            lines.append(f"- ... and {len(self._zones) - self.max_zones} more zones")
+        return "\n".join(lines)
+
+    def _state(self) -> Tuple[tuple, Dict[Tuple[str, str], float]]:
+        """What the summary says: its structure, and the live values by (zone, field)."""
+        zones = self._zones[: self.max_zones]
+        values = {}
+        for zone_id, *_ in zones:
+            reading = self._readings.get(zone_id) or {}
+            for field in STALE_AFTER:
+                if reading.get(field) is not None:
+                    values[zone_id, field] = reading[field]
+        forecasts = frozenset(zone[0] for zone in zones if zone[0] in self._predictions)
+        structure = (tuple(zones), len(self._zones), frozenset(values), forecasts)
+        return structure, values
+
+    def _stale(self, structure: tuple, values: Dict[Tuple[str, str], float]) -> bool:
+        if self._versioned is None:
+            return True
+        versioned_structure, versioned_values = self._versioned
+        if structure != versioned_structure:
+            return True
+        return any(
+            abs(value - versioned_values[key]) > STALE_AFTER[key[1]]
+            for key, value in values.items()
+        )
+
+    def update(self, zones: List[Tuple[str, str, float, bool]]):
+        """Rebuild the summary for (id, name, setpoint, adaptive) zone rows."""
+        self._zones = list(zones)
+        # Forget zones that were deleted
+        known = {zone[0] for zone in self._zones}
+        for cache in (self._readings, self._predictions):
+            for zone_id in [z for z in cache if z not in known]:
+                del cache[zone_id]
+        self.summary = self.render()
+        structure, values = self._state()
+        if self._stale(structure, values):
+            self._versioned = (structure, values)
+            self.version += 1
+        self.updated_at = datetime.now()
+
+    async def refresh(self, session_maker):
+        async with session_maker() as db:
+            result = await db.execute(
+                select(Zone.id, Zone.name, Zone.setpoint, Zone.adaptive_mode).order_by(Zone.id)
+            )
+            zones = [tuple(row) for row in result.all()]
+        self.update(zones)
+
+    def prompt(self, system_prompt: str) -> str:
+        """The system prompt with the current summary appended, if there is one."""
+        if not self.summary:
+            return system_prompt
+        return (
+            f"{system_prompt}\n\n"
+            f"Current system state as of {self.updated_at:%H:%M:%S} "
+            f"(use it for questions about live conditions):\n{self.summary}"
+        )
+
+    async def run(self, session_maker, interval: float = 10.0):
+        """Rebuild the summary every `interval` seconds until `stop()`."""
+        self._running = True
+        while self._running:
+            try:
+                await self.refresh(session_maker)
+            except Exception as e:
+                BACKGROUND_EXCEPTIONS.inc(loop="chat_context")
+                print(f"Error refreshing chat context: {e}")
+            await asyncio.sleep(interval)
+
+    def stop(self):
+        self._running = False
@@ -0,0 +1,249 @@
+import asyncio
+import re
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from app.services.chat_context import ResponseCache
+from app.services.metrics import CHAT_CACHE_LOOKUPS, CHAT_DURATION, CHAT_REJECTED, QUEUE_DEPTH
+
+# Messages are {"role": "user" | "assistant", "content": str}
+Messages = List[dict]
+
+
+class ChatBusyError(Exception):
+    """Every chat slot stayed busy for the whole queue timeout."""
+
+
+class ChatProvider:
+    """
+    A language model backend. Implementations must never block the event
+    loop: `stream` yields text chunks as they arrive and `generate` returns
+    the whole answer.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def stream(self, messages: Messages, system_prompt: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def generate(self, messages: Messages, system_prompt: str) -> str:
+        return "".join([chunk async for chunk in self.stream(messages, system_prompt)])
+
+    async def aclose(self):
+        pass
+
+
+class GeminiProvider(ChatProvider):
+    """
+    Google Gemini through the SDK's native async client. The client and its
+    connection pool are created on first use and kept for the process
+    lifetime, so requests reuse warm connections instead of a fresh client
+    (and TLS handshake) each.
+    """
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str = "gemini-3-flash-preview",
+        temperature: float = 0.7,
+        max_output_tokens: int = 500,
+    ):
+        super().__init__(model)
+        self._api_key = api_key
+        self._config = {"temperature": temperature, "max_output_tokens": max_output_tokens}
+        self._client = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self._api_key and self._api_key.strip())
+
+    def _aio(self):
+        if self._client is None:
+            # Imported here: the SDK is slow to import and only chat needs it
+            from google import genai
+
+            self._client = genai.Client(api_key=self._api_key)
+        return self._client.aio
+
+    def _request(self, messages: Messages, system_prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "contents": [
+                {
+                    "role": "user" if message["role"] == "user" else "model",
+                    "parts": [{"text": message["content"]}],
+                }
+                for message in messages
+            ],
+            "config": {"system_instruction": system_prompt, **self._config},
+        }
+
+    async def generate(self, messages: Messages, system_prompt: str) -> str:
+        response = await self._aio().models.generate_content(
+            **self._request(messages, system_prompt)
+        )
+        return response.text or ""
+
+    async def stream(self, messages: Messages, system_prompt: str) -> AsyncIterator[str]:
+        chunks = await self._aio().models.generate_content_stream(
+            **self._request(messages, system_prompt)
+        )
+        async for chunk in chunks:
+            if chunk.text:
+                yield chunk.text
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aio.aclose()
+            self._client.close()
+            self._client = None
+
+
+class FakeChatProvider(ChatProvider):
+    """
+    Offline provider for tests and load runs: answers instantly with a
+    canned reply built from the last user message, streamed word by word
+    with an optional delay so clients see realistic token pacing.
+    """
+
+    name = "fake"
+
+    def __init__(self, model: str = "fake", token_delay: float = 0.0, latency: float = 0.0):
+        super().__init__(model)
+        self.token_delay = token_delay
+        self.latency = latency
+
+    def reply(self, messages: Messages) -> str:
+        question = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        )
+        return f"This is a simulated answer to: {question.strip()}"
+
+    async def stream(self, messages: Messages, system_prompt: str) -> AsyncIterator[str]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for token in re.findall(r"\S+\s*", self.reply(messages)):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+CHAT_PROVIDERS = ("gemini", "fake")
+
+
+def create_chat_provider(
+    provider: str = "gemini",
+    api_key: Optional[str] = None,
+    model: str = "gemini-3-flash-preview",
+) -> ChatProvider:
+    if provider == "gemini":
+        return GeminiProvider(api_key=api_key, model=model)
+    if provider == "fake":
+        return FakeChatProvider()
+    raise ValueError(f"Unknown chat provider {provider!r}; expected one of {CHAT_PROVIDERS}")
+
+
+class ChatGateway:
+    """
+    Admission control in front of a provider. At most `max_concurrency`
+    model calls run at once; further requests wait up to `queue_timeout`
+    seconds for a slot and are then rejected with `ChatBusyError`, so a
+    burst of chat traffic queues briefly instead of piling up. Each call
+    is cut off with `TimeoutError` after `timeout` seconds of waiting on
+    the provider.
+
+    With a `cache`, a conversation already answered under the same
+    `context` version is served from it without taking a slot.
+    """
+
+    def __init__(
+        self,
+        provider: ChatProvider,
+        max_concurrency: int = 4,
+        queue_timeout: float = 5.0,
+        timeout: float = 60.0,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.provider = provider
+        self.cache = cache
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        QUEUE_DEPTH.set_function(lambda: self._waiting, queue="chat")
+
+    @asynccontextmanager
+    async def _slot(self):
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            CHAT_REJECTED.inc()
+            raise ChatBusyError("The assistant is busy, please try again shortly") from None
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _cached(self, messages: Messages, context: int) -> Optional[str]:
+        if self.cache is None:
+            return None
+        answer = self.cache.get(messages, context)
+        CHAT_CACHE_LOOKUPS.inc(result="miss" if answer is None else "hit")
+        return answer
+
+    async def complete(self, messages: Messages, system_prompt: str, context: int = 0) -> str:
+        answer = self._cached(messages, context)
+        if answer is not None:
+            return answer
+        async with self._slot():
+            with CHAT_DURATION.time(provider=self.provider.name, mode="complete"):
+                answer = await asyncio.wait_for(
+                    self.provider.generate(messages, system_prompt), self.timeout
+                )
+        if self.cache is not None:
+            self.cache.put(messages, answer, context)
+        return answer
+
+    async def stream(
+        self, messages: Messages, system_prompt: str, context: int = 0
+    ) -> AsyncIterator[str]:
+        answer = self._cached(messages, context)
+        if answer is not None:
+            yield answer
+            return
+        chunks = []
+        loop = asyncio.get_running_loop()
+        # Only waits on the provider count towards the timeout, not time the
+        # consumer spends sending chunks on. Nothing is yielded inside a
+        # timeout scope, so the consumer gets TimeoutError, not cancellation.
+        remaining = self.timeout
+        async with self._slot():
+            with CHAT_DURATION.time(provider=self.provider.name, mode="stream"):
+                async with aclosing(self.provider.stream(messages, system_prompt)) as stream:
+                    while True:
+                        started = loop.time()
+                        try:
+                            chunk = await asyncio.wait_for(anext(stream), max(remaining, 0))
+                        except StopAsyncIteration:
+                            break
+                        remaining -= loop.time() - started
+                        chunks.append(chunk)
+                        yield chunk
+        # Only complete answers are cached; a dropped stream never gets here
+        if self.cache is not None:
+            self.cache.put(messages, "".join(chunks), context)
+
+    async def aclose(self):
+        await self.provider.aclose()
@@ -3,6 +3,7 @@ import asyncio
 from datetime import datetime
 from typing import Optional, Callable, Awaitable
 from app.schemas import DeviceCreate, DeviceResponse
+from app.services.metrics import BACKGROUND_EXCEPTIONS
 
 
 class DeviceDiscoverySimulator:
@@ -28,7 +29,13 @@ class DeviceDiscoverySimulator:
 
     ZONES = ["server-room", "open-office"]
 
-    def __init__(self):
+    def __init__(
+        self,
+        rng: Optional[random.Random] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+    ):
+        self._random = rng if rng is not None else random.Random()
+        self._clock = clock or datetime.now
         self._device_counter = 0
         self._running = False
         self._callback: Optional[Callable[[dict], Awaitable[None]]] = None
@@ -41,10 +48,10 @@ class DeviceDiscoverySimulator:
 
     def _generate_random_device(self) -> DeviceCreate:
         """Generate a random new device."""
-        template = random.choice(self.DEVICE_TEMPLATES)
-        zone_id = random.choice(self.ZONES)
+        template = self._random.choice(self.DEVICE_TEMPLATES)
+        zone_id = self._random.choice(self.ZONES)
         device_id = self._generate_device_id(template["prefix"], zone_id)
-        name = f"{random.choice(template['names'])} {self._device_counter}"
+        name = f"{self._random.choice(template['names'])} {self._device_counter}"
 
         return DeviceCreate(
             id=device_id,
@@ -61,7 +68,7 @@ class DeviceDiscoverySimulator:
         - 20%: New device discovered
         - 10%: Existing device goes offline (handled separately)
         """
-        roll = random.random()
+        roll = self._random.random()
 
         if roll > 0.3:  # 70% - no event
             return None
@@ -71,14 +78,16 @@ class DeviceDiscoverySimulator:
             return {
                 "type": "device_discovered",
                 "device": device.model_dump(),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self._clock().isoformat(),
             }
 
-        # 10% - device status change (will be handled by the caller)
+        # 10% - device status change (will be handled by the caller).
+        # `selector` in [0, 1) picks the device so the event replays exactly.
         return {
             "type": "device_status_change",
-            "status": random.choice(["offline", "syncing"]),
-            "timestamp": datetime.now().isoformat(),
+            "status": self._random.choice(["offline", "syncing"]),
+            "selector": self._random.random(),
+            "timestamp": self._clock().isoformat(),
         }
 
     async def start_discovery_loop(
@@ -89,11 +98,15 @@ class DeviceDiscoverySimulator:
         self._callback = callback
 
         while self._running:
-            await asyncio.sleep(interval + random.uniform(-5, 10))
-
-            event = await self.simulate_discovery_event()
-            if event and self._callback:
-                await self._callback(event)
+            await asyncio.sleep(interval + self._random.uniform(-5, 10))
+
+            try:
+                event = await self.simulate_discovery_event()
+                if event and self._callback:
+                    await self._callback(event)
+            except Exception as e:
+                BACKGROUND_EXCEPTIONS.inc(loop="discovery")
+                print(f"Error in discovery loop: {e}")
 
     def stop(self):
         """Stop the discovery loop."""
@@ -0,0 +1,335 @@
+import asyncio
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select, update
+
+from app.models import Device
+from app.services.metrics import BACKGROUND_EXCEPTIONS, DEVICES_TIMED_OUT, QUEUE_DEPTH
+
+Publish = Callable[[dict], Awaitable[None]]
+
+
+@dataclass
+class DeviceRecord:
+    id: str
+    type: str
+    zone_id: Optional[str]
+    status: str
+    last_seen: Optional[datetime] = None
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel: O(1) schedule, reschedule and cancel, and expiry
+    work proportional to the timers that fall due rather than to the total.
+
+    Time is measured in whole ticks of `resolution` seconds. Delays must be
+    shorter than the wheel, so each slot only holds timers for its current
+    revolution.
+    """
+
+    def __init__(self, max_delay: float, resolution: float = 1.0):
+        self.resolution = resolution
+        self._size = math.ceil(max_delay / resolution) + 1
+        self._slots: List[Set[str]] = [set() for _ in range(self._size)]
+        self._deadlines: Dict[str, int] = {}
+        self.tick = 0
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: str, delay: float):
+        """(Re)arm the timer for `key` to fire `delay` seconds from now."""
+        ticks = min(self._size - 1, max(1, math.ceil(delay / self.resolution)))
+        self.cancel(key)
+        deadline = self.tick + ticks
+        self._deadlines[key] = deadline
+        self._slots[deadline % self._size].add(key)
+
+    def cancel(self, key: str):
+        deadline = self._deadlines.pop(key, None)
+        if deadline is not None:
+            self._slots[deadline % self._size].discard(key)
+
+    def advance(self) -> List[str]:
+        """Move forward one tick and return the keys that expired."""
+        self.tick += 1
+        slot = self._slots[self.tick % self._size]
+        expired = [key for key in slot if self._deadlines.get(key) == self.tick]
+        for key in expired:
+            slot.discard(key)
+            del self._deadlines[key]
+        return expired
+
+
+class DeviceRegistry:
+    """
+    In-memory device table indexed by id, zone, type and status.
+
+    The simulation reads devices from here instead of querying per zone,
+    and records heartbeats in memory. Heartbeats and status changes are
+    written back in one batched UPDATE every flush interval. Each zone's
+    reporting sensor holds a timer in a `TimerWheel` while it is online; if
+    it stays silent for `offline_timeout` seconds it is marked offline and
+    the change broadcast. FCUs and spare sensors never heartbeat, so their
+    silence says nothing and they have no timer.
+    """
+
+    def __init__(self, offline_timeout: float = 30.0, resolution: float = 1.0):
+        self.offline_timeout = offline_timeout
+        self._devices: Dict[str, DeviceRecord] = {}
+        self._by_zone: Dict[Optional[str], Set[str]] = {}
+        self._by_type: Dict[str, Set[str]] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+        # Devices with an unflushed heartbeat, and the subset whose status changed
+        self._dirty: Set[str] = set()
+        self._status_dirty: Set[str] = set()
+        self._wheel = TimerWheel(offline_timeout, resolution)
+        self._running = False
+        QUEUE_DEPTH.set_function(lambda: len(self._dirty), queue="device_heartbeats")
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._devices
+
+    # Index maintenance
+
+    def _index(self, record: DeviceRecord):
+        self._by_zone.setdefault(record.zone_id, set()).add(record.id)
+        self._by_type.setdefault(record.type, set()).add(record.id)
+        self._by_status.setdefault(record.status, set()).add(record.id)
+
+    def _unindex(self, record: DeviceRecord):
+        self._by_zone.get(record.zone_id, set()).discard(record.id)
+        self._by_type.get(record.type, set()).discard(record.id)
+        self._by_status.get(record.status, set()).discard(record.id)
+
+    def _arm(self, zone_id: Optional[str]):
+        """Keep a timer on the zone's reporting sensor while online, and on no other sensor."""
+        reporting = self.sensor_for_zone(zone_id)
+        for device_id in self._by_zone.get(zone_id, set()) & self._by_type.get("sensor", set()):
+            if device_id == reporting and self._devices[device_id].status == "online":
+                if device_id not in self._wheel:
+                    self._wheel.schedule(device_id, self.offline_timeout)
+            else:
+                self._wheel.cancel(device_id)
+
+    def add(self, record: DeviceRecord):
+        """Insert or replace a device. A reporting sensor that stays online keeps its timer."""
+        existing = self._devices.get(record.id)
+        if existing is not None:
+            self._unindex(existing)
+        self._devices[record.id] = record
+        self._index(record)
+        if record.type != "sensor":
+            self._wheel.cancel(record.id)
+        if existing is not None and existing.zone_id != record.zone_id:
+            self._arm(existing.zone_id)
+        self._arm(record.zone_id)
+
+    def remove(self, device_id: str):
+        record = self._devices.pop(device_id, None)
+        if record is not None:
+            self._unindex(record)
+            self._wheel.cancel(device_id)
+            self._dirty.discard(device_id)
+            self._status_dirty.discard(device_id)
+            # Another sensor may report for the zone now
+            self._arm(record.zone_id)
+
+    def set_status(self, device_id: str, status: str, persist: bool = False):
+        """
+        Change a device's status in memory. `persist` queues the change for
+        the next flush; leave it off when the caller already wrote it.
+        """
+        record = self._devices.get(device_id)
+        if record is None or record.status == status:
+            return
+        self._by_status.get(record.status, set()).discard(device_id)
+        record.status = status
+        self._by_status.setdefault(status, set()).add(device_id)
+        if record.type == "sensor":
+            self._arm(record.zone_id)
+        if persist:
+            self._dirty.add(device_id)
+            self._status_dirty.add(device_id)
+
+    # Lookups
+
+    def get(self, device_id: str) -> Optional[DeviceRecord]:
+        return self._devices.get(device_id)
+
+    def find(
+        self,
+        zone_id: Optional[str] = None,
+        device_type: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> List[DeviceRecord]:
+        """Devices matching every given filter, by intersecting the indexes."""
+        candidates: Optional[Set[str]] = None
+        for index, key in (
+            (self._by_zone, zone_id),
+            (self._by_type, device_type),
+            (self._by_status, status),
+        ):
+            if key is None:
+                continue
+            ids = index.get(key, set())
+            candidates = ids if candidates is None else candidates & ids
+        if candidates is None:
+            candidates = set(self._devices)
+        return [self._devices[device_id] for device_id in sorted(candidates)]
+
+    def sensor_for_zone(self, zone_id: str) -> Optional[str]:
+        """The zone's reporting sensor: its lowest sensor id, any status."""
+        sensors = self._by_zone.get(zone_id, set()) & self._by_type.get("sensor", set())
+        return min(sensors) if sensors else None
+
+    # Heartbeats
+
+    def heartbeat(self, device_ids: Iterable[str], now: Optional[datetime] = None):
+        """
+        Record that devices reported; offline and syncing devices are ignored.
+        Only devices with a timer (reporting sensors) have it re-armed.
+        """
+        now = now or datetime.now()
+        for device_id in device_ids:
+            record = self._devices.get(device_id)
+            if record is None or record.status != "online":
+                continue
+            record.last_seen = now
+            self._dirty.add(device_id)
+            if device_id in self._wheel:
+                self._wheel.schedule(device_id, self.offline_timeout)
+
+    # Persistence
+
+    async def load(self, session_maker):
+        """
+        Reconcile with the devices table, picking up rows added, changed or
+        deleted by other writers (the API, or a second process). Devices
+        with unflushed changes keep their in-memory state.
+        """
+        async with session_maker() as db:
+            result = await db.execute(
+                select(Device.id, Device.type, Device.zone_id, Device.status, Device.last_seen)
+            )
+            rows = result.all()
+
+        seen = set()
+        for row in rows:
+            seen.add(row.id)
+            if row.id in self._dirty:
+                continue
+            existing = self._devices.get(row.id)
+            last_seen = row.last_seen
+            if existing is not None and existing.last_seen and (
+                last_seen is None or existing.last_seen > last_seen
+            ):
+                last_seen = existing.last_seen
+            self.add(DeviceRecord(row.id, row.type, row.zone_id, row.status, last_seen))
+        for device_id in list(self._devices):
+            if device_id not in seen and device_id not in self._dirty:
+                self.remove(device_id)
+
+    async def flush(self, session_maker) -> int:
+        """
+        Write pending heartbeats and status changes in one transaction.
+        Heartbeat-only rows update `last_seen` alone, so they never overwrite
+        a status another writer changed in the meantime.
+        """
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, set()
+        status_dirty, self._status_dirty = self._status_dirty, set()
+        heartbeats, statuses = [], []
+        for device_id in dirty:
+            record = self._devices.get(device_id)
+            if record is None:
+                continue
+            if device_id in status_dirty:
+                statuses.append(
+                    {"id": device_id, "status": record.status, "last_seen": record.last_seen}
+                )
+            else:
+                heartbeats.append({"id": device_id, "last_seen": record.last_seen})
+        try:
+            async with session_maker() as db:
+                if heartbeats:
+                    await db.execute(update(Device), heartbeats)
+                if statuses:
+                    await db.execute(update(Device), statuses)
+                await db.commit()
+        except Exception:
+            # Keep the rows for the next attempt
+            self._dirty |= dirty
+            self._status_dirty |= status_dirty
+            raise
+        return len(heartbeats) + len(statuses)
+
+    # Background loops
+
+    def expire(self) -> List[DeviceRecord]:
+        """Advance the timer wheel one tick and mark timed-out devices offline."""
+        expired = []
+        for device_id in self._wheel.advance():
+            record = self._devices.get(device_id)
+            if record is None or record.status != "online":
+                continue
+            self.set_status(device_id, "offline", persist=True)
+            expired.append(record)
+        return expired
+
+    async def run(
+        self,
+        session_maker,
+        publish: Publish,
+        flush_interval: float = 10.0,
+        resync_interval: float = 60.0,
+    ):
+        """Drive the timer wheel, periodic flushes and resyncs until `stop()`."""
+        self._running = True
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        next_flush = started + flush_interval
+        next_resync = started + resync_interval
+
+        while self._running:
+            await asyncio.sleep(self._wheel.resolution)
+            now = loop.time()
+            try:
+                # Catch up on every tick that elapsed, even if the loop was late
+                due = int((now - started) / self._wheel.resolution)
+                while self._wheel.tick < due:
+                    for record in self.expire():
+                        DEVICES_TIMED_OUT.inc()
+                        await publish(
+                            {
+                                "type": "device_status",
+                                "device_id": record.id,
+                                "status": "offline",
+                                "timestamp": datetime.now().isoformat(),
+                            }
+                        )
+                if now >= next_flush:
+                    next_flush = now + flush_interval
+                    await self.flush(session_maker)
+                if now >= next_resync:
+                    next_resync = now + resync_interval
+                    await self.load(session_maker)
+            except Exception as e:
+                BACKGROUND_EXCEPTIONS.inc(loop="device_registry")
+                print(f"Error in device registry loop: {e}")
+
+    def stop(self):
+        """Stop the loop; call `flush` afterwards to keep the last heartbeats."""
+        self._running = False
+
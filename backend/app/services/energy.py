@@ -0,0 +1,165 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models.energy import BUILDING, EnergyCounter
+from app.services.metrics import BACKGROUND_EXCEPTIONS, QUEUE_DEPTH
+
+PERIODS = ("hour", "day")
+
+# (zone_id, period, period_start)
+CounterKey = Tuple[str, str, datetime]
+
+
+def period_start(timestamp: datetime, period: str) -> datetime:
+    """Start of the hour or day containing `timestamp`."""
+    if period == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown energy period {period!r}; expected one of {PERIODS}")
+
+
+class EnergyMeter:
+    """
+    Running energy integrals per zone and for the whole building, by hour
+    and by day.
+
+    Each power reading closes a trapezoid with the zone's previous one; an
+    interval that crosses an hour boundary is split there, with the power
+    at the boundary interpolated, so every kWh lands in the right period.
+    Gaps longer than `max_gap` seconds (the zone stopped reporting) are not
+    integrated.
+
+    Increments accumulate in memory and are added to the `energy_counters`
+    rows by `flush`, so any hour or day is a single primary key lookup plus
+    whatever is still pending here.
+    """
+
+    def __init__(self, max_gap: float = 60.0):
+        self.max_gap = max_gap
+        self._last: Dict[str, Tuple[datetime, float]] = {}
+        # Unflushed increments: key -> [kWh, intervals]
+        self._pending: Dict[CounterKey, List[float]] = {}
+        # Increments a flush is writing; still pending until it commits
+        self._flushing: Dict[CounterKey, List[float]] = {}
+        self._running = False
+        QUEUE_DEPTH.set_function(lambda: len(self._pending), queue="energy_counters")
+
+    def add(self, zone_id: str, power_kw: Optional[float], timestamp: datetime):
+        """Integrate a zone's power from its previous reading up to this one."""
+        if power_kw is None:
+            return
+        previous = self._last.get(zone_id)
+        self._last[zone_id] = (timestamp, power_kw)
+        if previous is None:
+            return
+        t0, p0 = previous
+        span = (timestamp - t0).total_seconds()
+        if span <= 0 or span > self.max_gap:
+            return
+
+        start, p_start = t0, p0
+        while start < timestamp:
+            end = min(period_start(start, "hour") + timedelta(hours=1), timestamp)
+            p_end = p0 + (power_kw - p0) * (end - t0).total_seconds() / span
+            kwh = (p_start + p_end) / 2 * (end - start).total_seconds() / 3600
+            self._credit(zone_id, start, kwh)
+            start, p_start = end, p_end
+
+    def _credit(self, zone_id: str, at: datetime, kwh: float):
+        for zone in (zone_id, BUILDING):
+            for period in PERIODS:
+                key = (zone, period, period_start(at, period))
+                counter = self._pending.get(key)
+                if counter is None:
+                    self._pending[key] = [kwh, 1]
+                else:
+                    counter[0] += kwh
+                    counter[1] += 1
+
+    def pending_kwh(self, zone_id: str, period: str, start: datetime) -> float:
+        key = (zone_id, period, start)
+        return sum(pending[key][0] for pending in (self._pending, self._flushing) if key in pending)
+
+    def pending_zones(self, period: str, start: datetime) -> Dict[str, float]:
+        kwh: Dict[str, float] = {}
+        for pending in (self._pending, self._flushing):
+            for (zone, p, s), counter in pending.items():
+                if p == period and s == start and zone != BUILDING:
+                    kwh[zone] = kwh.get(zone, 0.0) + counter[0]
+        return kwh
+
+    async def flush(self, session_maker) -> int:
+        """
+        Add pending increments to their counter rows in one upsert. They
+        still count as pending until it commits, so a read made during the
+        write finds them in one place or the other.
+        """
+        if not self._pending or self._flushing:
+            return 0
+        pending = self._flushing = self._pending
+        self._pending = {}
+        rows = [
+            {
+                "zone_id": zone_id,
+                "period": period,
+                "period_start": start,
+                "kwh": kwh,
+                "samples": samples,
+            }
+            for (zone_id, period, start), (kwh, samples) in pending.items()
+        ]
+        statement = sqlite_insert(EnergyCounter)
+        statement = statement.on_conflict_do_update(
+            index_elements=["zone_id", "period", "period_start"],
+            set_={
+                "kwh": EnergyCounter.kwh + statement.excluded.kwh,
+                "samples": EnergyCounter.samples + statement.excluded.samples,
+                "updated_at": func.now(),
+            },
+        )
+        committed = False
+        try:
+            async with session_maker() as db:
+                await db.execute(statement, rows)
+                await db.commit()
+                committed = True
+                self._flushing = {}
+        except BaseException:
+            # Fold the increments back in for the next attempt, also when
+            # the flush loop is cancelled mid-write
+            self._flushing = {}
+            if not committed:
+                for key, (kwh, samples) in pending.items():
+                    counter = self._pending.setdefault(key, [0.0, 0])
+                    counter[0] += kwh
+                    counter[1] += samples
+            raise
+        return len(rows)
+
+    async def run(self, session_maker, flush_interval: float = 30.0):
+        """Flush every `flush_interval` seconds until `stop()`."""
+        self._running = True
+        while self._running:
+            await asyncio.sleep(flush_interval)
+            try:
+                await self.flush(session_maker)
+            except Exception as e:
+                BACKGROUND_EXCEPTIONS.inc(loop="energy")
+                print(f"Error flushing energy counters: {e}")
+
+    def stop(self):
+        """Stop the loop; call `flush` afterwards to keep the last increments."""
+        self._running = False
+
+    def configure(self, max_gap: Optional[float] = None):
+        if max_gap is not None:
+            self.max_gap = max_gap
+
+
+# Shared by the simulation's ingest path and the energy API
+energy_meter = EnergyMeter()
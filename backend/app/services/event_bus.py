@@ -0,0 +1,164 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, List, Optional, Set
+
+from app.services.metrics import BACKGROUND_EXCEPTIONS, EVENT_BUS_CLIENTS, EVENT_BUS_DROPPED
+
+EventHandler = Callable[[dict], Awaitable[None]]
+
+# Subscribers whose unsent output exceeds this are disconnected
+MAX_CLIENT_BUFFER = 4 * 1024 * 1024
+MAX_LINE_BYTES = 16 * 1024 * 1024
+
+
+class EventBus:
+    """In-process publish/subscribe for simulation events."""
+
+    def __init__(self):
+        self._handlers: List[EventHandler] = []
+
+    def subscribe(self, handler: EventHandler):
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def unsubscribe(self, handler: EventHandler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def publish(self, event: dict):
+        """Deliver an event to every subscriber; one failing handler doesn't stop the rest."""
+        for handler in list(self._handlers):
+            try:
+                await handler(event)
+            except Exception as e:
+                BACKGROUND_EXCEPTIONS.inc(loop="event_bus")
+                print(f"Event handler error: {e}")
+
+
+def _encode(event: dict) -> bytes:
+    return json.dumps(event, separators=(",", ":")).encode() + b"\n"
+
+
+class EventBusServer:
+    """
+    Publishes bus events to local subscribers over TCP as newline-delimited
+    JSON. Used by the standalone simulator so API processes can fan events
+    out to their WebSocket clients.
+
+    A subscriber that connects late has missed earlier events; it is first
+    sent the events returned by `snapshot`, which restate current state.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        snapshot: Optional[Callable[[], List[dict]]] = None,
+    ):
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self.snapshot = snapshot
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.bus.subscribe(self._forward)
+        EVENT_BUS_CLIENTS.set_function(lambda: len(self._clients))
+        print(f"Event bus listening on {self.host}:{self.port}")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Written before any await, so no live event can overtake the snapshot
+        if self.snapshot is not None:
+            for event in self.snapshot():
+                writer.write(_encode(event))
+        self._clients.add(writer)
+        try:
+            # Subscribers never send anything; wait for them to hang up
+            await reader.read()
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _forward(self, event: dict):
+        if not self._clients:
+            return
+        line = _encode(event)
+        for writer in list(self._clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                # Slow consumer: drop it rather than buffer without bound
+                EVENT_BUS_DROPPED.inc()
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+    async def stop(self):
+        self.bus.unsubscribe(self._forward)
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class EventBusClient:
+    """Subscribes to an `EventBusServer` and republishes into a local bus."""
+
+    def __init__(
+        self,
+        bus: EventBus,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        reconnect_delay: float = 1.0,
+    ):
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self._running = False
+
+    async def run(self):
+        """Consume events until `stop()`, reconnecting whenever the link drops."""
+        self._running = True
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                reader, writer = await asyncio.open_connection(
+                    self.host, self.port, limit=MAX_LINE_BYTES
+                )
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+
+            self.connected = True
+            delay = self.reconnect_delay
+            print(f"Connected to simulator event bus at {self.host}:{self.port}")
+            try:
+                while self._running:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    await self.bus.publish(json.loads(line))
+            except (OSError, ValueError) as e:
+                BACKGROUND_EXCEPTIONS.inc(loop="event_bus")
+                print(f"Event bus connection error: {e}")
+            finally:
+                self.connected = False
+                writer.close()
+
+            if self._running:
+                await asyncio.sleep(delay)
+
+    def stop(self):
+        self._running = False
+
+
+# Global instance
+event_bus = EventBus()
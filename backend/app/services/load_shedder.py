@@ -0,0 +1,126 @@
+from typing import List, Optional
+
+from app.services.metrics import DEGRADATION_LEVEL, WORK_SHED
+
+
+class LoadShedder:
+    """
+    Degrades the sensor pipeline in priority order when ticks fall behind.
+
+    Work is ranked readings persisted > readings broadcast > predictions
+    computed > predictions persisted, and shed from the bottom up:
+
+    - level 0 (normal): everything runs
+    - level 1: predictions are broadcast but no longer persisted
+    - level 2: predictions are not computed at all
+    - level 3: readings are persisted but not broadcast
+
+    Readings are always persisted. The level rises by one on every tick that
+    starts under pressure (scheduler lag, an overrun, or zone backlog) and
+    falls by one after `recovery_ticks` consecutive healthy ticks.
+    """
+
+    LEVELS: List[str] = [
+        "normal",
+        "skip_prediction_persist",
+        "skip_predictions",
+        "skip_reading_broadcast",
+    ]
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        lag_high: float = 0.2,
+        lag_low: float = 0.05,
+        backlog_high: float = 0.1,
+        recovery_ticks: int = 5,
+    ):
+        self.enabled = enabled
+        self.lag_high = lag_high
+        self.lag_low = lag_low
+        self.backlog_high = backlog_high
+        self.recovery_ticks = recovery_ticks
+
+        self.level = 0
+        self._healthy_streak = 0
+        self._last_overruns = 0
+        DEGRADATION_LEVEL.set(0)
+
+    @property
+    def level_name(self) -> str:
+        return self.LEVELS[self.level]
+
+    @property
+    def persist_predictions(self) -> bool:
+        return self.level < 1
+
+    @property
+    def compute_predictions(self) -> bool:
+        return self.level < 2
+
+    @property
+    def broadcast_readings(self) -> bool:
+        return self.level < 3
+
+    def update(
+        self,
+        lag: float,
+        interval: float,
+        overruns: int,
+        backlog: int,
+        zone_count: int,
+    ) -> int:
+        """
+        Re-evaluate the level at the start of a tick.
+
+        Args:
+            lag: How late this tick started relative to its slot (seconds)
+            interval: Tick interval (seconds)
+            overruns: Scheduler's cumulative overrun count
+            backlog: Zone pipelines still running from earlier ticks
+            zone_count: Zones scheduled in this tick
+
+        Returns:
+            The new degradation level
+        """
+        overran = overruns > self._last_overruns
+        self._last_overruns = overruns
+        if not self.enabled:
+            return self.level
+
+        lag_ratio = lag / interval if interval > 0 else 0.0
+        backlog_ratio = backlog / zone_count if zone_count else 0.0
+
+        if overran or lag_ratio > self.lag_high or backlog_ratio > self.backlog_high:
+            self._healthy_streak = 0
+            self._set_level(self.level + 1)
+        elif lag_ratio < self.lag_low and backlog == 0:
+            self._healthy_streak += 1
+            if self._healthy_streak >= self.recovery_ticks:
+                self._healthy_streak = 0
+                self._set_level(self.level - 1)
+        else:
+            self._healthy_streak = 0
+
+        return self.level
+
+    def configure(self, enabled: Optional[bool] = None, recovery_ticks: Optional[int] = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if recovery_ticks is not None:
+            self.recovery_ticks = recovery_ticks
+
+    def _set_level(self, level: int):
+        level = max(0, min(len(self.LEVELS) - 1, level))
+        if level != self.level:
+            print(f"Load shedding level {self.level} -> {level} ({self.LEVELS[level]})")
+            self.level = level
+            DEGRADATION_LEVEL.set(level)
+
+    def record_shed(self, stage: str):
+        """Count a unit of work skipped because of the current level."""
+        WORK_SHED.inc(stage=stage)
+
+
+# Driven by the simulation's tick loop; the API reports its level in /health
+load_shedder = LoadShedder()
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from app.services.metrics import LOOP_BLOCKS, LOOP_LAG
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Frames kept per captured stack, innermost last
+MAX_STACK_DEPTH = 40
+
+
+@dataclass
+class BlockEvent:
+    """One stretch of time the event loop spent running without yielding."""
+
+    started_at: datetime
+    duration: float
+    culprit: str
+    task: Optional[str]
+    stack: List[str] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "culprit": self.culprit,
+            "task": self.task,
+            "stack": self.stack,
+        }
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(APP_DIR):
+        filename = "app" + filename[len(APP_DIR) :]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_qualname} ({filename}:{frame.f_lineno})"
+
+
+def _capture(thread_id: int) -> List[str]:
+    """Stack of another thread, outermost frame first."""
+    frame = sys._current_frames().get(thread_id)
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return [_frame_label(f) for f in stack]
+
+
+def _culprit(stack: List[str]) -> str:
+    """Innermost application frame, or the innermost frame if none is ours."""
+    for label in reversed(stack):
+        if "(app/" in label:
+            return label
+    return stack[-1] if stack else "unknown"
+
+
+class LoopMonitor:
+    """
+    Event loop lag sampler and blocking-call detector.
+
+    A coroutine sleeps `interval` seconds at a time and records how late it
+    wakes up; that lateness is the delay every other callback (WebSocket
+    sends, tick scheduling) suffered at that moment. A watchdog thread
+    checks the sampler's heartbeat: once the loop has gone
+    `block_threshold` seconds without running it, the thread captures the
+    loop thread's stack, which is exactly the code hogging the loop. When
+    the loop comes back the stall is recorded with the most frequently
+    sampled stack, logged, and attributed to its innermost app frame.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        block_threshold: float = 0.1,
+        history: int = 100,
+        lag_window: int = 600,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.blocks: Deque[BlockEvent] = deque(maxlen=history)
+        self._lags: Deque[float] = deque(maxlen=lag_window)
+        self._culprits: Dict[str, List[float]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._heartbeat = 0.0
+        self._samples: List[tuple] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def run(self):
+        """Sample loop lag until `stop()`; starts the watchdog thread."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._running = True
+        self._heartbeat = time.monotonic()
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+        while self._running:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self._lags.append(lag)
+            LOOP_LAG.observe(lag)
+            if lag >= self.block_threshold:
+                self._record_block(lag)
+            else:
+                with self._lock:
+                    self._samples.clear()
+
+    def _watch(self):
+        period = min(self.interval, self.block_threshold) / 2
+        while self._running:
+            time.sleep(period)
+            if time.monotonic() - self._heartbeat < self.interval + self.block_threshold:
+                continue
+            task = None
+            try:
+                current = asyncio.current_task(self._loop)
+                task = current.get_name() if current is not None else None
+            except Exception:
+                pass
+            stack = _capture(self._loop_thread)
+            with self._lock:
+                self._samples.append((tuple(stack), task))
+
+    def _record_block(self, lag: float):
+        with self._lock:
+            samples, self._samples = self._samples, []
+        if samples:
+            (stack, task), _ = Counter(samples).most_common(1)[0]
+            stack = list(stack)
+        else:
+            # Stalled between watchdog checks; the duration is all we know
+            stack, task = [], None
+        culprit = _culprit(stack)
+        event = BlockEvent(
+            started_at=datetime.fromtimestamp(time.time() - lag),
+            duration=lag,
+            culprit=culprit,
+            task=task,
+            stack=stack,
+        )
+        self.blocks.append(event)
+        totals = self._culprits.setdefault(culprit, [0, 0.0])
+        totals[0] += 1
+        totals[1] += lag
+        LOOP_BLOCKS.inc()
+        print(
+            f"Event loop blocked for {lag * 1000:.0f} ms by {culprit}"
+            + (f" in task {task}" if task else "")
+        )
+
+    def report(self, limit: int = 20) -> dict:
+        lags = sorted(self._lags)
+
+        def pct(p: float) -> float:
+            if not lags:
+                return 0.0
+            index = min(len(lags) - 1, int(round(p / 100 * (len(lags) - 1))))
+            return round(lags[index] * 1000, 3)
+
+        return {
+            "interval_ms": self.interval * 1000,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "lag_ms": {
+                "samples": len(lags),
+                "mean": round(sum(lags) / len(lags) * 1000, 3) if lags else 0.0,
+                "p50": pct(50),
+                "p99": pct(99),
+                "max": pct(100),
+            },
+            "culprits": [
+                {"culprit": culprit, "blocks": count, "total_ms": round(total * 1000, 3)}
+                for culprit, (count, total) in sorted(
+                    self._culprits.items(), key=lambda item: item[1][1], reverse=True
+                )
+            ],
+            "recent_blocks": [event.summary() for event in reversed(list(self.blocks)[-limit:])],
+        }
+
+    def stop(self):
+        self._running = False
@@ -0,0 +1,429 @@
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for a metric family with optional labels."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, LabelValues, float, Sequence[str]]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, values, value, names in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        if not self.labelnames:
+            self._values[()] = 0
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield "", key, value, self.labelnames
+
+
+class Gauge(Metric):
+    """Value that can go up and down, or be computed on scrape."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels: str):
+        """Compute the value lazily each time metrics are rendered."""
+        self._functions[self._key(labels)] = fn
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return float(self._functions[key]())
+        return self._values.get(key, 0.0)
+
+    def samples(self):
+        values = dict(self._values)
+        for key, fn in self._functions.items():
+            try:
+                values[key] = float(fn())
+            except Exception:
+                continue
+        for key, value in sorted(values.items()):
+            yield "", key, value, self.labelnames
+
+
+class Histogram(Metric):
+    """Cumulative bucketed distribution of observed values."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * len(self.buckets)
+            self._sums[key] = 0.0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the wall-clock duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def samples(self):
+        bucket_names = self.labelnames + ("le",)
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._counts[key]):
+                cumulative += count
+                yield "_bucket", key + (_format_value(bound),), cumulative, bucket_names
+            yield "_sum", key, self._sums[key], self.labelnames
+            yield "_count", key, cumulative, self.labelnames
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Awaitable[None]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]):
+        """Register an async callback run before each scrape (e.g. DB counts)."""
+        self._collectors.append(collector)
+
+    async def collect(self):
+        for collector in self._collectors:
+            try:
+                await collector()
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry
+metrics = MetricsRegistry()
+
+# Hot-path instrumentation
+TICK_DURATION = metrics.histogram(
+    "fcu_sensor_tick_duration_seconds",
+    "Wall-clock time of one sensor loop tick, including phase-stagger waits",
+)
+TICK_LAG = metrics.histogram(
+    "fcu_sensor_tick_lag_seconds",
+    "Delay between a tick's scheduled slot and when it actually started",
+)
+TICK_OVERRUNS = metrics.counter(
+    "fcu_sensor_tick_overruns_total",
+    "Ticks that ran past the start of the next slot",
+)
+TICKS_SKIPPED = metrics.counter(
+    "fcu_sensor_ticks_skipped_total",
+    "Tick slots dropped or merged after an overrun",
+    ("policy",),
+)
+ZONE_PIPELINE_DURATION = metrics.histogram(
+    "fcu_zone_pipeline_duration_seconds",
+    "Time to generate, persist, broadcast and predict for one zone",
+)
+ZONES_SKIPPED = metrics.counter(
+    "fcu_zones_skipped_total",
+    "Zones not processed in a tick",
+    ("reason",),
+)
+ZONE_PIPELINES_LATE = metrics.counter(
+    "fcu_zone_pipelines_late_total",
+    "Zone pipelines still running when their tick's interval ended",
+)
+DEGRADATION_LEVEL = metrics.gauge(
+    "fcu_degradation_level",
+    "Load shedding level (0 = normal, 3 = readings only persisted)",
+)
+WORK_SHED = metrics.counter(
+    "fcu_work_shed_total",
+    "Pipeline stages skipped by load shedding",
+    ("stage",),
+)
+DB_QUERY_DURATION = metrics.histogram(
+    "fcu_db_query_duration_seconds",
+    "Latency of individual SQL statements",
+    ("operation", "table"),
+)
+SCOPE_QUERIES = metrics.histogram(
+    "fcu_scope_queries",
+    "SQL statements per profiled HTTP request or simulation tick",
+    ("kind",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+SCOPE_SQL_TIME = metrics.histogram(
+    "fcu_scope_sql_seconds",
+    "Total SQL time per profiled HTTP request or simulation tick",
+    ("kind",),
+)
+N_PLUS_ONE_QUERIES = metrics.counter(
+    "fcu_n_plus_one_queries_total",
+    "Profiled scopes that repeated one SELECT past the N+1 threshold",
+    ("kind",),
+)
+PREDICTION_DURATION = metrics.histogram(
+    "fcu_prediction_duration_seconds",
+    "Latency of PredictionEngine.predict",
+)
+BROADCAST_DURATION = metrics.histogram(
+    "fcu_broadcast_duration_seconds",
+    "Time to fan a message out to all WebSocket clients",
+    ("type",),
+)
+WEBSOCKET_CONNECTIONS = metrics.gauge(
+    "fcu_websocket_connections",
+    "Currently connected WebSocket clients",
+)
+QUEUE_DEPTH = metrics.gauge(
+    "fcu_queue_depth",
+    "Items waiting in internal work queues",
+    ("queue",),
+)
+TABLE_ROWS = metrics.gauge(
+    "fcu_table_rows",
+    "Row count per database table",
+    ("table",),
+)
+BACKGROUND_EXCEPTIONS = metrics.counter(
+    "fcu_background_exceptions_total",
+    "Exceptions caught and swallowed by background loops",
+    ("loop",),
+)
+EVENT_BUS_CLIENTS = metrics.gauge(
+    "fcu_event_bus_clients",
+    "API processes subscribed to the simulator event bus",
+)
+EVENT_BUS_DROPPED = metrics.counter(
+    "fcu_event_bus_dropped_clients_total",
+    "Event bus subscribers disconnected for falling too far behind",
+)
+DEVICES_TIMED_OUT = metrics.counter(
+    "fcu_devices_timed_out_total",
+    "Devices marked offline after missing heartbeats",
+)
+LOOP_LAG = metrics.histogram(
+    "fcu_event_loop_lag_seconds",
+    "How late the loop monitor's periodic wake-up ran",
+)
+LOOP_BLOCKS = metrics.counter(
+    "fcu_event_loop_blocks_total",
+    "Stretches where one callback held the event loop past the blocking threshold",
+)
+CHAT_DURATION = metrics.histogram(
+    "fcu_chat_duration_seconds",
+    "Time from acquiring a chat slot to the last token of the answer",
+    ("provider", "mode"),
+)
+CHAT_REJECTED = metrics.counter(
+    "fcu_chat_rejected_total",
+    "Chat requests turned away because every slot stayed busy",
+)
+CHAT_CACHE_LOOKUPS = metrics.counter(
+    "fcu_chat_cache_lookups_total",
+    "Chat answer cache lookups",
+    ("result",),
+)
+ALERT_EVALUATION_DURATION = metrics.histogram(
+    "fcu_alert_evaluation_seconds",
+    "Time to evaluate every alert rule against every zone for one tick",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+ALERT_TRANSITIONS = metrics.counter(
+    "fcu_alert_transitions_total",
+    "Alerts raised and cleared",
+    ("severity", "state"),
+)
+ACTIVE_ALERTS = metrics.gauge(
+    "fcu_active_alerts",
+    "Alerts currently raised",
+)
+SETPOINT_OPTIMIZER_DURATION = metrics.histogram(
+    "fcu_setpoint_optimizer_seconds",
+    "Time to optimize the setpoints of all adaptive zones for one tick",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+ADAPTIVE_ZONES_DEFERRED = metrics.counter(
+    "fcu_adaptive_zones_deferred_total",
+    "Adaptive zones left at their previous setpoint because the tick's optimizer budget ran out",
+)
+for _loop in ("sensor_data", "zone_pipeline", "discovery", "event_bus", "device_registry", "chat_context", "energy"):
+    BACKGROUND_EXCEPTIONS.inc(0, loop=_loop)
+
+_STATEMENT_TABLE = re.compile(
+    r'\b(?:FROM|INTO|UPDATE|JOIN)\s+["`]?(\w+)', re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=512)
+def _statement_labels(statement: str) -> Tuple[str, str]:
+    """Extract (operation, table) labels from a SQL statement."""
+    parts = statement.lstrip().split(None, 1)
+    operation = parts[0].upper() if parts else "UNKNOWN"
+    match = _STATEMENT_TABLE.search(statement)
+    return operation, match.group(1) if match else ""
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Record per-statement latency for every query run through the engine."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts: Optional[list] = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        operation, table = _statement_labels(statement)
+        DB_QUERY_DURATION.observe(elapsed, operation=operation, table=table)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
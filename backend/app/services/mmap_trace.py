@@ -0,0 +1,278 @@
+import argparse
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.trace import METRICS, TraceReader
+
+# File layout, all little-endian and 8-byte aligned:
+#
+#   header   MAGIC, version (u32), zone count (u32), padded to HEADER_SIZE
+#   index    one INDEX_DTYPE record per zone
+#   blocks   per zone: timestamps (f64 x rows), then one f32 x rows column
+#            per name in COLUMNS (NaN = missing)
+#
+# Every block is fixed width once the row counts are known, so any slice
+# of any zone is a zero-copy view into the mapped file.
+MAGIC = b"FCUMMAP1"
+VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<8sII")
+
+COLUMNS: Tuple[str, ...] = tuple(name for name, _ in METRICS) + ("occupancy",)
+INDEX_DTYPE = np.dtype(
+    [
+        ("zone_id", "S64"),
+        ("offset", "<u8"),
+        ("rows", "<u8"),
+        ("start", "<f8"),
+        ("end", "<f8"),
+    ]
+)
+# Zone ids are stored NUL-padded in a fixed-width index field
+ZONE_ID_BYTES = INDEX_DTYPE["zone_id"].itemsize
+_ROUNDING = dict(METRICS)
+
+# Samples this close after a step boundary still count towards that step
+TIME_TOLERANCE = 1e-3  # seconds
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _block_size(rows: int) -> int:
+    return _align(rows * 8 + len(COLUMNS) * rows * 4)
+
+
+class MmapTraceWriter:
+    """
+    Lays out a memory-mapped trace for known per-zone row counts and fills
+    it in place. Rows must be appended in timestamp order per zone.
+
+    Zone ids longer than `ZONE_ID_BYTES` once encoded are rejected: the
+    index would truncate them and replay them under a different id.
+    """
+
+    def __init__(self, path: str, zone_rows: Dict[str, int]):
+        for zone_id in zone_rows:
+            if len(zone_id.encode()) > ZONE_ID_BYTES:
+                raise ValueError(
+                    f"Zone id {zone_id!r} is longer than the {ZONE_ID_BYTES} bytes "
+                    "a memory-mapped trace can store"
+                )
+        self.path = path
+        data_start = _align(HEADER_SIZE + len(zone_rows) * INDEX_DTYPE.itemsize)
+        size = data_start + sum(_block_size(rows) for rows in zone_rows.values())
+
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(zone_rows)).ljust(HEADER_SIZE, b"\0"))
+            f.truncate(max(size, HEADER_SIZE))
+
+        self._map = np.memmap(path, dtype=np.uint8, mode="r+")
+        self._index = self._map[
+            HEADER_SIZE : HEADER_SIZE + len(zone_rows) * INDEX_DTYPE.itemsize
+        ].view(INDEX_DTYPE)
+        self._blocks: Dict[str, Tuple[int, np.ndarray, Dict[str, np.ndarray]]] = {}
+        self._cursor: Dict[str, int] = {}
+
+        offset = data_start
+        for i, (zone_id, rows) in enumerate(zone_rows.items()):
+            self._index[i] = (zone_id.encode(), offset, rows, np.nan, np.nan)
+            self._blocks[zone_id] = (i, *_block_views(self._map, offset, rows))
+            self._cursor[zone_id] = 0
+            offset += _block_size(rows)
+
+    def append(self, zone_id: str, timestamp: float, reading: dict):
+        """Write the next row for a zone."""
+        i, timestamps, columns = self._blocks[zone_id]
+        row = self._cursor[zone_id]
+        timestamps[row] = timestamp
+        for name in COLUMNS:
+            value = reading.get(name)
+            columns[name][row] = np.nan if value is None else value
+        self._cursor[zone_id] = row + 1
+        if row == 0:
+            self._index["start"][i] = timestamp
+        self._index["end"][i] = timestamp
+
+    def close(self):
+        self._map.flush()
+        del self._map
+
+
+def _block_views(
+    buffer: np.ndarray, offset: int, rows: int
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Timestamp and column views over one zone block of the mapped file."""
+    timestamps = buffer[offset : offset + rows * 8].view("<f8")
+    columns = {}
+    position = offset + rows * 8
+    for name in COLUMNS:
+        columns[name] = buffer[position : position + rows * 4].view("<f4")
+        position += rows * 4
+    return timestamps, columns
+
+
+class MmapTrace:
+    """
+    Read-only view of a memory-mapped trace. Nothing is loaded up front:
+    pages are faulted in by the OS as slices are touched, so memory stays
+    flat however large the file is.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, zone_count = _HEADER.unpack(bytes(self._map[: _HEADER.size]))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a memory-mapped trace")
+        if version != VERSION:
+            raise ValueError(f"Unsupported trace version {version} in {path}")
+        self.index = self._map[
+            HEADER_SIZE : HEADER_SIZE + zone_count * INDEX_DTYPE.itemsize
+        ].view(INDEX_DTYPE)
+        self._zones = {
+            entry["zone_id"].decode(): i for i, entry in enumerate(self.index)
+        }
+        # Views are a few small objects per zone; the data stays in the file
+        self._views: Dict[str, Tuple[np.ndarray, Dict[str, np.ndarray]]] = {}
+
+    def __contains__(self, zone_id: str) -> bool:
+        return zone_id in self._zones
+
+    @property
+    def zone_ids(self) -> List[str]:
+        return list(self._zones)
+
+    @property
+    def start(self) -> float:
+        return float(np.nanmin(self.index["start"])) if len(self.index) else 0.0
+
+    @property
+    def end(self) -> float:
+        return float(np.nanmax(self.index["end"])) if len(self.index) else 0.0
+
+    def zone(self, zone_id: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Zero-copy (timestamps, columns) views for one zone."""
+        views = self._views.get(zone_id)
+        if views is None:
+            entry = self.index[self._zones[zone_id]]
+            views = _block_views(self._map, int(entry["offset"]), int(entry["rows"]))
+            self._views[zone_id] = views
+        return views
+
+
+class MmapReplaySource:
+    """
+    Reading source that replays a memory-mapped trace by trace time.
+
+    Each call to `generate_batch` advances the replay clock by
+    `step_seconds` and returns, for every zone with a sample in that step,
+    its latest sample. Zones are located with a binary search over their
+    timestamp column, so a tick touches only a handful of pages per zone.
+    """
+
+    def __init__(self, path: str, step_seconds: float = 5.0, loop: bool = False):
+        self.trace = MmapTrace(path)
+        self.step_seconds = step_seconds
+        self.loop = loop
+        self.finished = False
+        self.ticks_replayed = 0
+        self._step = -1
+        self._time = self.trace.start
+        self._cursor: Dict[str, int] = {}
+
+    def now(self) -> datetime:
+        """Trace time of the tick most recently replayed."""
+        return datetime.fromtimestamp(self._time)
+
+    def generate_batch(self, zones: List[Tuple[str, float]]) -> Dict[str, dict]:
+        """Return each requested zone's latest recorded sample for the next step."""
+        self._step += 1
+        # Computed from the step count so long replays don't accumulate drift
+        self._time = self.trace.start + self._step * self.step_seconds
+        if self._time > self.trace.end + TIME_TOLERANCE:
+            if not self.loop or self.ticks_replayed == 0:
+                self.finished = True
+                return {}
+            self._step = 0
+            self._time = self.trace.start
+            self._cursor.clear()
+        self.ticks_replayed += 1
+        until = self._time + TIME_TOLERANCE
+
+        readings = {}
+        for zone_id, _ in zones:
+            if zone_id not in self.trace:
+                continue
+            timestamps, columns = self.trace.zone(zone_id)
+            start = self._cursor.get(zone_id, 0)
+            stop = start + int(np.searchsorted(timestamps[start:], until, side="right"))
+            if stop == start:
+                continue
+            self._cursor[zone_id] = stop
+            readings[zone_id] = _reading(columns, stop - 1)
+        return readings
+
+    def take_events(self) -> List[dict]:
+        """Memory-mapped traces carry readings only."""
+        return []
+
+
+def _reading(columns: Dict[str, np.ndarray], row: int) -> dict:
+    reading = {}
+    for name in COLUMNS:
+        value = float(columns[name][row])
+        if np.isnan(value):
+            continue
+        if name == "occupancy":
+            reading[name] = int(value)
+        else:
+            reading[name] = round(value, _ROUNDING[name])
+    return reading
+
+
+def convert_trace(source: str, destination: str) -> Dict[str, int]:
+    """
+    Convert an append-only simulation trace into a memory-mapped one.
+
+    Streams the source twice (once to size the blocks, once to fill them),
+    so memory use doesn't grow with the trace.
+    """
+    zone_rows: Dict[str, int] = {}
+    for tick in TraceReader(source).ticks():
+        for zone_id in tick.readings:
+            zone_rows[zone_id] = zone_rows.get(zone_id, 0) + 1
+
+    writer = MmapTraceWriter(destination, zone_rows)
+    for tick in TraceReader(source).ticks():
+        timestamp = tick.timestamp.timestamp()
+        for zone_id, reading in tick.readings.items():
+            writer.append(zone_id, timestamp, reading)
+    writer.close()
+    return zone_rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Convert a simulation trace into a memory-mapped replay trace."
+    )
+    parser.add_argument("source", help="trace written with TRACE_RECORD_PATH")
+    parser.add_argument("destination", help="memory-mapped trace to create")
+    args = parser.parse_args(argv)
+
+    try:
+        zone_rows = convert_trace(args.source, args.destination)
+    except ValueError as e:
+        parser.error(str(e))
+    print(
+        f"Wrote {sum(zone_rows.values())} rows for {len(zone_rows)} zones "
+        f"to {args.destination}"
+    )
+
+
+if __name__ == "__main__":
+    main()
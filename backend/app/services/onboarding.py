@@ -0,0 +1,218 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, select, update
+
+from app.models import Device
+from app.services.device_registry import DeviceRecord, DeviceRegistry
+from app.services.metrics import BACKGROUND_EXCEPTIONS, QUEUE_DEPTH
+
+Publish = Callable[[dict], Awaitable[None]]
+
+# Onboarding states; a device leaves the pipeline once it is online
+DISCOVERED = "discovered"
+SYNCING = "syncing"
+ONLINE = "online"
+
+
+class _DeviceWriter:
+    """
+    Coalesces device inserts and status updates issued within `window`
+    seconds into one transaction, so a burst of hundreds of onboarding
+    tasks costs a handful of commits instead of one each.
+    """
+
+    def __init__(self, session_maker, window: float = 0.05):
+        self._session_maker = session_maker
+        self.window = window
+        self._inserts: List[Tuple[dict, asyncio.Future]] = []
+        self._updates: List[Tuple[dict, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _enqueue(self, queue: List, row: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        queue.append((row, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+        return future
+
+    def insert(self, row: dict) -> Awaitable[bool]:
+        """Insert a device row; resolves False if the id already exists."""
+        return self._enqueue(self._inserts, row)
+
+    def update(self, row: dict) -> Awaitable[bool]:
+        """Apply a partial update to a device row keyed by `id`."""
+        return self._enqueue(self._updates, row)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        inserts, self._inserts = self._inserts, []
+        updates, self._updates = self._updates, []
+        self._flush_task = None
+
+        try:
+            async with self._session_maker() as db:
+                inserted = set()
+                if inserts:
+                    ids = [row["id"] for row, _ in inserts]
+                    result = await db.execute(select(Device.id).where(Device.id.in_(ids)))
+                    existing = set(result.scalars().all())
+                    rows = {}
+                    for row, _ in inserts:
+                        if row["id"] not in existing:
+                            rows.setdefault(row["id"], row)
+                    if rows:
+                        await db.execute(insert(Device), list(rows.values()))
+                    inserted = set(rows)
+                if updates:
+                    await db.execute(update(Device), [row for row, _ in updates])
+                await db.commit()
+        except Exception as e:
+            for _, future in inserts + updates:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for row, future in inserts:
+            if not future.done():
+                future.set_result(row["id"] in inserted)
+        for _, future in updates:
+            if not future.done():
+                future.set_result(True)
+
+
+class DeviceOnboarding:
+    """
+    Onboarding state machine for discovered devices.
+
+    Each device runs discovered -> syncing -> online as its own task, so
+    the discovery loop never waits on a sync and any number of devices
+    can be in flight at once. Database writes from all tasks are batched
+    by `_DeviceWriter`. When given a registry, it is kept in step with
+    every transition.
+    """
+
+    def __init__(
+        self,
+        session_maker,
+        publish: Publish,
+        sync_seconds: float = 3.0,
+        clock: Callable[[], datetime] = datetime.now,
+        registry: Optional[DeviceRegistry] = None,
+    ):
+        self._session_maker = session_maker
+        self._publish = publish
+        self.sync_seconds = sync_seconds
+        self._clock = clock
+        self._registry = registry
+        self._writer = _DeviceWriter(session_maker)
+        self._tasks: Set[asyncio.Task] = set()
+        self.states: Dict[str, str] = {}
+        QUEUE_DEPTH.set_function(lambda: len(self.states), queue="onboarding")
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def discover(self, event: dict) -> asyncio.Task:
+        """Start onboarding the device in a `device_discovered` event."""
+        return self._spawn(self._onboard(event))
+
+    def change_status(self, event: dict) -> asyncio.Task:
+        """Apply a `device_status_change` event to one sampled online device."""
+        return self._spawn(self._change_status(event))
+
+    async def _onboard(self, event: dict):
+        device = event["device"]
+        device_id = device["id"]
+        if device_id in self.states:
+            return
+        self.states[device_id] = DISCOVERED
+        try:
+            created = await self._writer.insert(
+                {
+                    "id": device_id,
+                    "name": device["name"],
+                    "type": device["type"],
+                    "zone_id": device["zone_id"],
+                    "status": SYNCING,
+                }
+            )
+            if not created:
+                print(f"Ignoring rediscovered device {device_id}")
+                return
+            self.states[device_id] = SYNCING
+            if self._registry is not None:
+                self._registry.add(
+                    DeviceRecord(device_id, device["type"], device["zone_id"], SYNCING)
+                )
+            await self._publish(event)
+
+            # Simulate the sync handshake
+            await asyncio.sleep(self.sync_seconds)
+
+            now = self._clock()
+            await self._writer.update({"id": device_id, "status": ONLINE, "last_seen": now})
+            self.states[device_id] = ONLINE
+            if self._registry is not None:
+                self._registry.set_status(device_id, ONLINE)
+                self._registry.heartbeat([device_id], now)
+            await self._publish(
+                {
+                    "type": "device_status",
+                    "device_id": device_id,
+                    "status": ONLINE,
+                    "timestamp": now.isoformat(),
+                }
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            BACKGROUND_EXCEPTIONS.inc(loop="discovery")
+            print(f"Error onboarding device {device_id}: {e}")
+        finally:
+            self.states.pop(device_id, None)
+
+    async def _change_status(self, event: dict):
+        try:
+            async with self._session_maker() as db:
+                online = select(Device.id).where(Device.status == ONLINE)
+                count = await db.scalar(select(func.count()).select_from(online.subquery()))
+                if not count:
+                    return
+
+                # Fetch only the sampled row instead of every online device
+                offset = min(int(event["selector"] * count), count - 1)
+                device_id = await db.scalar(online.order_by(Device.id).offset(offset).limit(1))
+                if device_id is None:
+                    return
+
+                new_status = event["status"]
+                await db.execute(
+                    update(Device).where(Device.id == device_id).values(status=new_status)
+                )
+                await db.commit()
+            if self._registry is not None:
+                self._registry.set_status(device_id, new_status)
+
+            await self._publish(
+                {
+                    "type": "device_status",
+                    "device_id": device_id,
+                    "status": new_status,
+                    "timestamp": self._clock().isoformat(),
+                }
+            )
+        except Exception as e:
+            BACKGROUND_EXCEPTIONS.inc(loop="discovery")
+            print(f"Error changing device status: {e}")
+
+    async def stop(self):
+        """Cancel in-flight onboarding; devices mid-sync stay `syncing`."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
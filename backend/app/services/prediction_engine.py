@@ -1,15 +1,27 @@
 import numpy as np
-from sklearn.linear_model import LinearRegression
 from typing import List, Tuple
 from datetime import datetime
 
 
+def fit_line(y: np.ndarray) -> Tuple[float, float]:
+    """
+    Ordinary least squares fit of `y` against 0, 1, ..., n-1.
+
+    Closed form for a single evenly spaced regressor; gives the same
+    coefficients as a general linear regression without importing one.
+    Returns (slope, intercept).
+    """
+    x = np.arange(len(y), dtype=float)
+    x_centered = x - x.mean()
+    slope = float(np.dot(x_centered, y - y.mean()) / np.dot(x_centered, x_centered))
+    return slope, float(y.mean() - slope * x.mean())
+
+
 class PredictionEngine:
     """Simple linear regression-based temperature prediction."""
 
     def __init__(self, horizon_minutes: int = 15):
         self.horizon_minutes = horizon_minutes
-        self.model = LinearRegression()
         self._min_samples = 5
 
     def predict(
@@ -30,12 +42,9 @@ class PredictionEngine:
             current = readings[-1] if readings else 22.0
             return current, 0.5, "stable"
 
-        # Prepare data for linear regression
-        X = np.array(range(len(readings))).reshape(-1, 1)
-        y = np.array(readings)
-
-        # Fit model
-        self.model.fit(X, y)
+        # Fit a line through the readings
+        y = np.array(readings, dtype=float)
+        slope, intercept = fit_line(y)
 
         # Calculate how many intervals into the future
         intervals_per_minute = 60 / interval_seconds
@@ -43,13 +52,13 @@ class PredictionEngine:
         future_x = len(readings) + future_intervals
 
         # Predict
-        predicted = self.model.predict([[future_x]])[0]
+        predicted = intercept + slope * future_x
 
         # Clamp to reasonable range
         predicted = max(15.0, min(30.0, predicted))
 
         # Calculate confidence based on R² score and data consistency
-        y_pred = self.model.predict(X)
+        y_pred = intercept + slope * np.arange(len(y))
         ss_res = np.sum((y - y_pred) ** 2)
         ss_tot = np.sum((y - np.mean(y)) ** 2)
 
@@ -62,7 +71,6 @@ class PredictionEngine:
         confidence = max(0.3, min(0.95, r2 * 0.9))
 
         # Determine trend based on slope
-        slope = self.model.coef_[0]
         if slope > 0.01:
             trend = "rising"
         elif slope < -0.01:
@@ -87,9 +95,7 @@ class PredictionEngine:
         if len(readings) < self._min_samples:
             return []
 
-        X = np.array(range(len(readings))).reshape(-1, 1)
-        y = np.array(readings)
-        self.model.fit(X, y)
+        slope, intercept = fit_line(np.array(readings, dtype=float))
 
         results = []
         intervals_per_minute = 60 / interval_seconds
@@ -99,7 +105,7 @@ class PredictionEngine:
             future_intervals = int(future_minutes * intervals_per_minute)
             future_x = len(readings) + future_intervals
 
-            predicted = self.model.predict([[future_x]])[0]
+            predicted = intercept + slope * future_x
             predicted = max(15.0, min(30.0, predicted))
 
             # Calculate future timestamp
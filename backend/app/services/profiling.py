@@ -0,0 +1,210 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from app.services.loop_monitor import APP_DIR
+
+
+class ProfilerBusyError(Exception):
+    """A profile is already running; only one may run at a time."""
+
+
+def _short_path(filename: str) -> str:
+    """App files relative to the package, others by their last two components."""
+    if filename.startswith(APP_DIR):
+        return "app" + filename[len(APP_DIR) :]
+    parent, name = os.path.split(filename)
+    return os.path.join(os.path.basename(parent), name) if parent else name
+
+
+def _function_label(code) -> str:
+    # Semicolons separate frames in collapsed stacks
+    return f"{code.co_qualname} ({_short_path(code.co_filename)})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler for the running process.
+
+    A thread wakes `hz` times a second and records the stack of every
+    other thread, so the event loop, its background loops and any executor
+    threads are all covered without instrumenting them. Stacks are
+    aggregated into collapsed form ("thread;outer;...;inner count"), the
+    input format of flamegraph.pl, speedscope and similar tools.
+
+    Sampling costs one stack walk per thread per sample, so a profile can
+    be taken from a loaded production process.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+
+    def _stack(self, frame) -> Tuple[str, ...]:
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(_function_label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return tuple(labels)
+
+    def sample(self, seconds: float, hz: float = 100.0) -> Counter:
+        """Blocking: sample all threads for `seconds`. Run it off the event loop."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            me = threading.get_ident()
+            period = 1.0 / hz
+            stacks: Counter = Counter()
+            deadline = time.monotonic() + seconds
+            next_sample = time.monotonic()
+            while next_sample < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me:
+                        continue
+                    thread = names.get(thread_id, str(thread_id)).replace(";", ":")
+                    stacks[(thread,) + self._stack(frame)] += 1
+                next_sample += period
+                time.sleep(max(0.0, next_sample - time.monotonic()))
+            return stacks
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapsed(stacks: Counter) -> str:
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common()
+        )
+
+    @staticmethod
+    def top_functions(stacks: Counter, limit: int = 30) -> List[dict]:
+        """Per-function sample counts: `self` where it was running, `total` anywhere on the stack."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in stacks.items():
+            frames = stack[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        samples = sum(stacks.values()) or 1
+        return [
+            {
+                "function": label,
+                "self": own[label],
+                "total": total[label],
+                "self_pct": round(own[label] / samples * 100, 2),
+                "total_pct": round(total[label] / samples * 100, 2),
+            }
+            for label, _ in own.most_common(limit)
+        ]
+
+
+class MemoryTracker:
+    """
+    Named tracemalloc snapshots and diffs between them.
+
+    Tracing starts with the first snapshot and slows allocation-heavy code
+    while it is on, so stop it once the investigation is done. Only the
+    last `max_snapshots` snapshots are kept.
+    """
+
+    def __init__(self, max_snapshots: int = 5):
+        self.max_snapshots = max_snapshots
+        # id -> (taken at, traced bytes, snapshot)
+        self._snapshots: "OrderedDict[int, Tuple[datetime, int, tracemalloc.Snapshot]]" = (
+            OrderedDict()
+        )
+        self._next_id = 1
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self):
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+
+    def snapshot(self, frames: int = 10, keep: Optional[int] = None) -> int:
+        """
+        Blocking: take and store a snapshot, starting tracing if needed.
+        Snapshot `keep` is not evicted to make room for it.
+        """
+        self.start(frames)
+        snapshot_id = self._next_id
+        self._next_id += 1
+        snapshot = self._take()
+        size = sum(trace.size for trace in snapshot.traces)
+        self._snapshots[snapshot_id] = (datetime.now(), size, snapshot)
+        evictable = [i for i in self._snapshots if i not in (keep, snapshot_id)]
+        for evicted in evictable[: max(len(self._snapshots) - self.max_snapshots, 0)]:
+            del self._snapshots[evicted]
+        return snapshot_id
+
+    def snapshots(self) -> List[dict]:
+        return [
+            {
+                "id": snapshot_id,
+                "taken_at": taken_at.isoformat(),
+                "traced_kb": round(size / 1024, 1),
+            }
+            for snapshot_id, (taken_at, size, _) in self._snapshots.items()
+        ]
+
+    def get(self, snapshot_id: int) -> Optional[tracemalloc.Snapshot]:
+        entry = self._snapshots.get(snapshot_id)
+        return entry[2] if entry else None
+
+    @staticmethod
+    def _where(traceback: tracemalloc.Traceback) -> List[str]:
+        return [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in traceback]
+
+    def top(self, snapshot_id: int, group_by: str = "lineno", limit: int = 25) -> List[dict]:
+        snapshot = self.get(snapshot_id)
+        if snapshot is None:
+            raise KeyError(snapshot_id)
+        return [
+            {
+                "where": self._where(stat.traceback),
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def diff(
+        self, base_id: int, target_id: int, group_by: str = "lineno", limit: int = 25
+    ) -> List[dict]:
+        """Allocation growth from `base_id` to `target_id`, largest first."""
+        base, target = self.get(base_id), self.get(target_id)
+        if base is None or target is None:
+            raise KeyError(base_id if base is None else target_id)
+        return [
+            {
+                "where": self._where(stat.traceback),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "size_kb": round(stat.size / 1024, 1),
+                "count_diff": stat.count_diff,
+            }
+            for stat in target.compare_to(base, group_by)[:limit]
+        ]
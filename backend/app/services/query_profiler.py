@@ -0,0 +1,264 @@
+import random
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.metrics import N_PLUS_ONE_QUERIES, SCOPE_QUERIES, SCOPE_SQL_TIME
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Statements shown in reports are cut to this length
+MAX_STATEMENT_LENGTH = 300
+
+
+@dataclass
+class StatementStats:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+@dataclass
+class QueryProfile:
+    """SQL issued within one scope: an HTTP request or a simulation tick."""
+
+    kind: str
+    name: str
+    started_at: datetime = field(default_factory=datetime.now)
+    queries: int = 0
+    sql_seconds: float = 0.0
+    duration: float = 0.0
+    statements: Dict[str, StatementStats] = field(default_factory=dict)
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.sql_seconds += seconds
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = StatementStats()
+        stats.count += 1
+        stats.seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+
+    def repeated_selects(self, threshold: int) -> List[str]:
+        """SELECTs run at least `threshold` times: one query per item instead of one per batch."""
+        return [
+            statement
+            for statement, stats in self.statements.items()
+            if stats.count >= threshold and statement.lstrip()[:6].upper() == "SELECT"
+        ]
+
+    def summary(self, n_plus_one_threshold: int, top: int = 5) -> dict:
+        """Totals, slowest statements and SELECTs repeated `n_plus_one_threshold` or more times."""
+        slowest = sorted(
+            self.statements.items(), key=lambda item: item[1].max_seconds, reverse=True
+        )[:top]
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "queries": self.queries,
+            "sql_ms": round(self.sql_seconds * 1000, 3),
+            "slowest": [
+                {
+                    "statement": _shorten(statement),
+                    "count": stats.count,
+                    "max_ms": round(stats.max_seconds * 1000, 3),
+                    "total_ms": round(stats.seconds * 1000, 3),
+                }
+                for statement, stats in slowest
+            ],
+            "n_plus_one": [
+                {"statement": _shorten(statement), "count": self.statements[statement].count}
+                for statement in self.repeated_selects(n_plus_one_threshold)
+            ],
+        }
+
+
+def _shorten(statement: str) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    if len(statement) > MAX_STATEMENT_LENGTH:
+        return statement[: MAX_STATEMENT_LENGTH - 3] + "..."
+    return statement
+
+
+# Profile of the scope the current task runs in. Tasks copy their context
+# when created, so zone pipelines spawned by a tick report into its profile.
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+class QueryProfiler:
+    """
+    Per-scope SQL accounting from SQLAlchemy cursor events.
+
+    `profile()` opens a scope; every statement executed inside it, on any
+    task spawned from it, is counted and timed against that scope. Closed
+    scopes are kept in a short per-kind history. A scope that runs a SELECT
+    `n_plus_one_threshold` or more times, or a statement slower than
+    `slow_seconds`, is logged.
+
+    Only a `sample_rate` fraction of scopes is profiled; outside a sampled
+    scope the event hooks return after one context variable lookup.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        slow_seconds: float = 0.1,
+        n_plus_one_threshold: int = 10,
+        history: int = 50,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._rng = rng
+        self._history_size = history
+        self._history: Dict[str, Deque[QueryProfile]] = {}
+        self._flagged: Dict[str, Dict[str, int]] = {}
+
+    def configure(
+        self,
+        sample_rate: Optional[float] = None,
+        slow_seconds: Optional[float] = None,
+        n_plus_one_threshold: Optional[int] = None,
+    ):
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_seconds is not None:
+            self.slow_seconds = slow_seconds
+        if n_plus_one_threshold is not None:
+            self.n_plus_one_threshold = n_plus_one_threshold
+
+    def instrument(self, engine: AsyncEngine):
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if _current.get() is not None:
+                conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            profile = _current.get()
+            starts = conn.info.get("profile_start")
+            if profile is None or not starts:
+                return
+            elapsed = time.perf_counter() - starts.pop()
+            profile.record(statement, elapsed)
+            if elapsed >= self.slow_seconds:
+                print(
+                    f"Slow query ({elapsed * 1000:.1f} ms) in {profile.kind} "
+                    f"{profile.name}: {_shorten(statement)}"
+                )
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("profile_start"):
+                conn.info["profile_start"].pop()
+
+    @contextmanager
+    def profile(self, kind: str, name: str) -> Iterator[Optional[QueryProfile]]:
+        """Profile the enclosed block if it is sampled; yields None if not."""
+        if _current.get() is not None or self._rng() >= self.sample_rate:
+            yield None
+            return
+        profile = QueryProfile(kind=kind, name=name)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.duration = time.perf_counter() - start
+            _current.reset(token)
+            self._finish(profile)
+
+    def _finish(self, profile: QueryProfile):
+        SCOPE_QUERIES.observe(profile.queries, kind=profile.kind)
+        SCOPE_SQL_TIME.observe(profile.sql_seconds, kind=profile.kind)
+        history = self._history.get(profile.kind)
+        if history is None:
+            history = self._history[profile.kind] = deque(maxlen=self._history_size)
+        history.append(profile)
+
+        repeated = profile.repeated_selects(self.n_plus_one_threshold)
+        if not repeated:
+            return
+        flagged = self._flagged.setdefault(profile.name, {})
+        for statement in repeated:
+            count = profile.statements[statement].count
+            N_PLUS_ONE_QUERIES.inc(kind=profile.kind)
+            if statement not in flagged:
+                print(
+                    f"Possible N+1: {profile.kind} {profile.name} ran the same SELECT "
+                    f"{count} times: {_shorten(statement)}"
+                )
+            flagged[statement] = max(flagged.get(statement, 0), count)
+
+    def report(self, kind: Optional[str] = None, limit: int = 20) -> dict:
+        """Aggregates, recent scopes and N+1 suspects, newest first."""
+        kinds = [kind] if kind else sorted(self._history)
+        scopes = {}
+        for name in kinds:
+            profiles = list(self._history.get(name, ()))
+            scopes[name] = {
+                "profiled": len(profiles),
+                "avg_queries": (
+                    round(sum(p.queries for p in profiles) / len(profiles), 2) if profiles else 0
+                ),
+                "avg_sql_ms": (
+                    round(sum(p.sql_seconds for p in profiles) / len(profiles) * 1000, 3)
+                    if profiles
+                    else 0
+                ),
+                "recent": [
+                    p.summary(self.n_plus_one_threshold)
+                    for p in reversed(profiles[-limit:])
+                ],
+            }
+        return {
+            "sample_rate": self.sample_rate,
+            "slow_query_ms": self.slow_seconds * 1000,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "scopes": scopes,
+            "n_plus_one": [
+                {"scope": name, "statement": _shorten(statement), "max_count": count}
+                for name, statements in sorted(self._flagged.items())
+                for statement, count in statements.items()
+            ],
+        }
+
+
+class QueryProfilingMiddleware:
+    """ASGI middleware opening a query profile around each HTTP request."""
+
+    def __init__(self, app, profiler: QueryProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with self.profiler.profile("request", f"{scope['method']} {scope['path']}") as profile:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # Group by route template rather than by concrete path
+                route = scope.get("route")
+                if profile is not None and route is not None:
+                    profile.name = f"{scope['method']} {route.path}"
+
+
+# Global profiler, configured and attached to the engine in app.database
+query_profiler = QueryProfiler()
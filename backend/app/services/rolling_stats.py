@@ -0,0 +1,197 @@
+import math
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+WINDOW_MINUTES: Tuple[int, ...] = (1, 5, 15, 60)
+METRICS: Tuple[str, ...] = ("temperature", "humidity", "co2_level", "power_kw")
+
+
+class RollingWindow:
+    """
+    Mean, min, max and standard deviation of the samples in the last
+    `seconds`, in amortized O(1) per sample.
+
+    The samples themselves live in the `RollingSeries` the window belongs
+    to; the window only tracks `head`, the series position of its oldest
+    sample. The mean and variance use Welford's update, run in reverse when
+    a sample leaves the window. Min and max come from monotonic deques,
+    whose fronts always hold the extreme of the samples still in the window.
+    """
+
+    __slots__ = ("seconds", "head", "count", "mean", "_m2", "_min", "_max")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.head = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._min: Deque[Tuple[float, float]] = deque()
+        self._max: Deque[Tuple[float, float]] = deque()
+
+    def add(self, timestamp: float, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+    def expire(self, series: "RollingSeries", now: float):
+        """Move `head` past the series samples older than the window as of `now`."""
+        cutoff = now - self.seconds
+        samples, offset = series.samples, series.dropped
+        while self.count and samples[self.head - offset][0] <= cutoff:
+            value = samples[self.head - offset][1]
+            self.head += 1
+            self.count -= 1
+            if self.count == 0:
+                self.mean = self._m2 = 0.0
+            else:
+                delta = value - self.mean
+                self.mean -= delta / self.count
+                self._m2 -= delta * (value - self.mean)
+        while self._min and self._min[0][0] <= cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= cutoff:
+            self._max.popleft()
+
+    @property
+    def stddev(self) -> float:
+        """Sample standard deviation; 0 until there are two samples."""
+        if self.count < 2:
+            return 0.0
+        # Rounding can push the running sum of squares slightly negative
+        return math.sqrt(max(self._m2, 0.0) / (self.count - 1))
+
+    def stats(self) -> Optional[dict]:
+        if not self.count:
+            return None
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 3),
+            "min": self._min[0][1],
+            "max": self._max[0][1],
+            "stddev": round(self.stddev, 3),
+        }
+
+
+class RollingSeries:
+    """
+    One metric's timestamped samples, shared by nested windows of
+    different lengths. Each sample is stored once, for as long as the
+    window that reaches furthest back still holds it.
+    """
+
+    __slots__ = ("samples", "dropped", "windows")
+
+    def __init__(self, window_seconds: Iterable[float]):
+        self.samples: Deque[Tuple[float, float]] = deque()
+        # Samples popped off the front; series position = deque index + dropped
+        self.dropped = 0
+        self.windows = [RollingWindow(seconds) for seconds in window_seconds]
+
+    def add(self, timestamp: float, value: float):
+        self.samples.append((timestamp, value))
+        for window in self.windows:
+            window.add(timestamp, value)
+        self.expire(timestamp)
+
+    def expire(self, now: float, index: Optional[int] = None):
+        """Expire every window, or just window `index`, as of `now`."""
+        windows = self.windows if index is None else (self.windows[index],)
+        for window in windows:
+            window.expire(self, now)
+        head = min(window.head for window in self.windows)
+        while self.dropped < head:
+            self.samples.popleft()
+            self.dropped += 1
+
+
+class RollingStats:
+    """
+    Rolling statistics per zone, metric and window, fed one reading at a
+    time from the ingest path so no query ever scans raw history.
+    """
+
+    def __init__(
+        self,
+        window_minutes: Iterable[int] = WINDOW_MINUTES,
+        metrics: Iterable[str] = METRICS,
+    ):
+        self.window_minutes = tuple(window_minutes)
+        self.metrics = tuple(metrics)
+        # zone -> metric -> series with one window per entry in window_minutes
+        self._zones: Dict[str, Dict[str, RollingSeries]] = {}
+
+    def __contains__(self, zone_id: str) -> bool:
+        return zone_id in self._zones
+
+    def zone_ids(self) -> List[str]:
+        return sorted(self._zones)
+
+    def _series(self, zone_id: str) -> Dict[str, RollingSeries]:
+        series = self._zones.get(zone_id)
+        if series is None:
+            seconds = [minutes * 60 for minutes in self.window_minutes]
+            series = self._zones[zone_id] = {
+                metric: RollingSeries(seconds) for metric in self.metrics
+            }
+        return series
+
+    def add(self, zone_id: str, reading: dict, timestamp: datetime):
+        """Fold one reading into every window of its zone."""
+        ts = timestamp.timestamp()
+        for metric, series in self._series(zone_id).items():
+            value = reading.get(metric)
+            if value is not None:
+                series.add(ts, value)
+
+    def zone(
+        self,
+        zone_id: str,
+        now: Optional[datetime] = None,
+        window_minutes: Optional[int] = None,
+    ) -> Optional[Dict[str, Dict[str, Optional[dict]]]]:
+        """
+        {"5m": {"temperature": {...}, ...}, ...} for one zone, or None if
+        it has never reported. Samples are expired as of `now` first, so a
+        zone that stopped reporting empties out instead of going stale.
+        """
+        zone = self._zones.get(zone_id)
+        if zone is None:
+            return None
+        ts = (now or datetime.now()).timestamp()
+        result: Dict[str, Dict[str, Optional[dict]]] = {}
+        for i, minutes in enumerate(self.window_minutes):
+            if window_minutes is not None and minutes != window_minutes:
+                continue
+            per_metric = {}
+            for metric, series in zone.items():
+                series.expire(ts, i)
+                per_metric[metric] = series.windows[i].stats()
+            result[f"{minutes}m"] = per_metric
+        return result
+
+    def window_stats(self, zone_id: str, window_minutes: int) -> Dict[str, Optional[dict]]:
+        """One window's stats per metric, as last updated; for compact messages."""
+        zone = self._zones.get(zone_id)
+        if zone is None or window_minutes not in self.window_minutes:
+            return {}
+        i = self.window_minutes.index(window_minutes)
+        return {metric: series.windows[i].stats() for metric, series in zone.items()}
+
+    async def observe(self, event: dict):
+        """Event bus handler, for processes that only receive published readings."""
+        if event.get("type") == "reading":
+            self.add(event["zone_id"], event["data"], datetime.fromisoformat(event["timestamp"]))
+
+
+# Fed by the simulation's ingest path, or from bus events in external mode
+rolling_stats = RollingStats()
@@ -0,0 +1,130 @@
+import asyncio
+import math
+from typing import Awaitable, Callable, Iterable, List, Set
+
+from app.services.metrics import TICK_LAG, TICK_OVERRUNS, TICKS_SKIPPED
+
+OVERRUN_POLICIES = ("skip", "merge")
+
+
+class TickScheduler:
+    """
+    Fixed-rate tick scheduler with drift compensation.
+
+    Ticks are scheduled on an absolute clock (start + n * interval) instead of
+    sleeping `interval` after the work finishes, so the period stays constant
+    as per-tick work grows. A tick that runs past the next deadline is counted
+    as an overrun and the missed slots are handled by the overrun policy:
+
+    - skip: drop every slot that already passed and stay on the original grid
+    - merge: fire one catch-up tick immediately, then continue from there
+
+    Work that fans out within a tick waits on it with `wait_for`, which
+    gives up `deadline_margin` of the interval before the next slot, so a
+    slow item runs on in the background instead of making the tick overrun.
+    """
+
+    # Share of the interval left after `wait_for` for the tick's own wrap-up
+    deadline_margin = 0.1
+
+    def __init__(
+        self,
+        interval: float,
+        overrun_policy: str = "skip",
+        stagger_fraction: float = 0.8,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if overrun_policy not in OVERRUN_POLICIES:
+            raise ValueError(f"overrun_policy must be one of {OVERRUN_POLICIES}")
+        self.interval = interval
+        self.overrun_policy = overrun_policy
+        self.stagger_fraction = max(0.0, min(1.0, stagger_fraction))
+        self._running = False
+
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.last_tick_duration = 0.0
+        self.last_lag = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def phase_offsets(self, count: int) -> List[float]:
+        """
+        Spread `count` work items evenly across the staggered part of the
+        interval, flattening DB and CPU spikes at the start of each tick.
+        """
+        if count <= 0:
+            return []
+        window = self.interval * self.stagger_fraction
+        return [window * i / count for i in range(count)]
+
+    async def wait_until(self, deadline: float):
+        """Sleep until the given event loop time (no-op if already past)."""
+        delay = deadline - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def deadline(self, scheduled_start: float) -> float:
+        """Event loop time at which a tick stops waiting on its work."""
+        return scheduled_start + self.interval * (1 - self.deadline_margin)
+
+    async def wait_for(
+        self, tasks: Iterable[asyncio.Task], scheduled_start: float
+    ) -> Set[asyncio.Task]:
+        """
+        Wait for a tick's tasks until its deadline and return those still
+        running. They are not cancelled; stragglers finish in the background.
+        """
+        timeout = max(0.0, self.deadline(scheduled_start) - asyncio.get_running_loop().time())
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        return pending
+
+    async def run(self, tick: Callable[[float], Awaitable[None]]):
+        """
+        Call `tick(scheduled_start)` at a fixed rate until `stop()` is called.
+
+        `scheduled_start` is in event loop time so callers can align phase
+        offsets to the tick's slot rather than to when it actually started.
+        """
+        loop = asyncio.get_running_loop()
+        self._running = True
+        next_tick = loop.time()
+
+        while self._running:
+            await self.wait_until(next_tick)
+            if not self._running:
+                break
+
+            started = loop.time()
+            self.last_lag = started - next_tick
+            TICK_LAG.observe(self.last_lag)
+
+            await tick(next_tick)
+
+            finished = loop.time()
+            self.last_tick_duration = finished - started
+            self.ticks += 1
+            next_tick += self.interval
+
+            if finished > next_tick:
+                self.overruns += 1
+                TICK_OVERRUNS.inc()
+                behind = finished - next_tick
+                if self.overrun_policy == "skip":
+                    missed = math.floor(behind / self.interval) + 1
+                    next_tick += missed * self.interval
+                else:
+                    # One immediate tick absorbs every missed slot
+                    missed = math.floor(behind / self.interval)
+                    next_tick = finished
+                if missed:
+                    self.skipped_ticks += missed
+                    TICKS_SKIPPED.inc(missed, policy=self.overrun_policy)
+
+    def stop(self):
+        """Stop scheduling new ticks; a tick in progress runs to completion."""
+        self._running = False
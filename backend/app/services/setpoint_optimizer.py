@@ -0,0 +1,341 @@
+import math
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.metrics import SETPOINT_OPTIMIZER_DURATION, ADAPTIVE_ZONES_DEFERRED
+
+# Setpoints the simulators accept
+MIN_SETPOINT = 15.0
+MAX_SETPOINT = 30.0
+
+
+class SetpointOptimizer:
+    """
+    Picks the setpoint actually applied to each adaptive zone, every tick,
+    trading forecast comfort against power.
+
+    A zone's stored setpoint is the occupants' target. The applied
+    setpoint ramps at most `max_step` per tick and stays within
+    `max_offset` of the target; candidates spread over that step are
+    scored on:
+
+    - discomfort: squared distance of the expected temperature from the
+      target beyond `comfort_band`, weighted down in unoccupied zones.
+      The expected temperature is the PredictionEngine forecast, which
+      already reflects the current setpoint, moved `tracking` of the
+      way towards the candidate's change over the horizon.
+    - power: linear in the setpoint around the zone's recent operating
+      point, fitted per zone from observed power_kw by exponentially
+      weighted least squares. The slope is shrunk towards zero until
+      the setpoint has moved enough to estimate it.
+    - a small penalty on moving the setpoint, against chatter.
+
+    Cost is evaluated for all candidates of a chunk of zones as one
+    zones x candidates matrix. Chunks run until the per-tick `budget`
+    (seconds) would be exceeded; zones left over keep their last setpoint
+    and are first in line next tick.
+
+    Applied setpoints are published as `setpoint` events when they change
+    (`changes`); another process can `follow` them to report the same
+    zones without running the optimizer.
+    """
+
+    def __init__(
+        self,
+        max_offset: float = 2.0,
+        max_step: float = 0.1,
+        candidates: int = 9,
+        comfort_band: float = 0.5,
+        comfort_weight: float = 1.0,
+        energy_weight: float = 0.5,
+        move_weight: float = 0.1,
+        unoccupied_weight: float = 0.2,
+        horizon_minutes: float = 15.0,
+        time_constant_minutes: float = 10.0,
+        budget: float = 0.005,
+        chunk_size: int = 256,
+        decay: float = 0.99,
+        ridge: float = 0.05,
+        capacity: int = 64,
+    ):
+        self.max_offset = max_offset
+        self.steps = np.linspace(-max_step, max_step, candidates)
+        self.comfort_band = comfort_band
+        self.comfort_weight = comfort_weight
+        self.energy_weight = energy_weight
+        self.move_weight = move_weight
+        self.unoccupied_weight = unoccupied_weight
+        self.horizon_minutes = horizon_minutes
+        self.time_constant_minutes = time_constant_minutes
+        self.budget = budget
+        self.chunk_size = chunk_size
+        self.decay = decay
+        self.ridge = ridge
+
+        self._zone_index: Dict[str, int] = {}
+        self._zone_ids: List[str] = []
+        self._temperature = np.full(capacity, np.nan)
+        self._predicted = np.full(capacity, np.nan)
+        self._occupied = np.ones(capacity, dtype=bool)
+        self._target = np.full(capacity, np.nan)
+        self._applied = np.full(capacity, np.nan)
+        self._adaptive = np.zeros(capacity, dtype=bool)
+        self._expected_temp = np.full(capacity, np.nan)
+        self._expected_power = np.full(capacity, np.nan)
+        # Applied setpoint last published per zone; NaN while not adaptive
+        self._published = np.full(capacity, np.nan)
+        # Weighted power-fit moments per zone: weight, sx, sy, sxx, sxy
+        self._moments = np.zeros((capacity, 5))
+        self._cursor = 0
+
+        self.last_duration = 0.0
+        self.last_optimized = 0
+        self.last_deferred = 0
+
+    @property
+    def tracking(self) -> float:
+        """First-order response: fraction of a setpoint change reached by the horizon."""
+        return 1 - math.exp(-self.horizon_minutes / self.time_constant_minutes)
+
+    def configure(
+        self,
+        max_offset: Optional[float] = None,
+        comfort_band: Optional[float] = None,
+        energy_weight: Optional[float] = None,
+        horizon_minutes: Optional[float] = None,
+        budget: Optional[float] = None,
+    ):
+        if max_offset is not None:
+            self.max_offset = max_offset
+        if comfort_band is not None:
+            self.comfort_band = comfort_band
+        if energy_weight is not None:
+            self.energy_weight = energy_weight
+        if horizon_minutes is not None:
+            self.horizon_minutes = horizon_minutes
+        if budget is not None:
+            self.budget = budget
+
+    def _index(self, zone_id: str) -> int:
+        index = self._zone_index.get(zone_id)
+        if index is not None:
+            return index
+        index = self._zone_index[zone_id] = len(self._zone_ids)
+        self._zone_ids.append(zone_id)
+        capacity = len(self._temperature)
+        if index >= capacity:
+            for name in (
+                "_temperature",
+                "_predicted",
+                "_target",
+                "_applied",
+                "_expected_temp",
+                "_expected_power",
+                "_published",
+            ):
+                setattr(self, name, np.concatenate([getattr(self, name), np.full(capacity, np.nan)]))
+            self._occupied = np.concatenate([self._occupied, np.ones(capacity, dtype=bool)])
+            self._adaptive = np.concatenate([self._adaptive, np.zeros(capacity, dtype=bool)])
+            self._moments = np.vstack([self._moments, np.zeros((capacity, 5))])
+        return index
+
+    def observe(self, zone_id: str, reading: dict):
+        """Record a zone's reading, taken under the setpoint applied this tick."""
+        index = self._index(zone_id)
+        temperature = reading.get("temperature")
+        if temperature is None:
+            return
+        self._temperature[index] = temperature
+        occupancy = reading.get("occupancy")
+        self._occupied[index] = occupancy is None or occupancy > 0
+
+        power = reading.get("power_kw")
+        applied = self._applied[index]
+        if power is None or np.isnan(applied):
+            return
+        moments = self._moments[index]
+        moments *= self.decay
+        moments += (1.0, applied, power, applied * applied, applied * power)
+
+    def observe_prediction(self, zone_id: str, predicted_temp: Optional[float]):
+        index = self._index(zone_id)
+        self._predicted[index] = np.nan if predicted_temp is None else predicted_temp
+
+    def optimize(self, zones: Iterable[Tuple[str, float, bool]]) -> List[Tuple[str, float]]:
+        """
+        Setpoint to apply per (zone_id, target, adaptive) zone this tick:
+        the optimized one for adaptive zones, the target for the rest.
+        """
+        started = time.perf_counter()
+        zones = list(zones)
+        if not zones:
+            return []
+        count = len(zones)
+        zone_ids = [zone_id for zone_id, _, _ in zones]
+        index = np.fromiter(map(self._index, zone_ids), dtype=np.intp, count=count)
+        targets = np.fromiter((setpoint for _, setpoint, _ in zones), dtype=float, count=count)
+        adaptive = np.fromiter((bool(flag) for _, _, flag in zones), dtype=bool, count=count)
+
+        # Zones just switched to adaptive start from their target
+        start = adaptive & ~self._adaptive[index]
+        self._applied[index[start]] = targets[start]
+        self._target[index] = targets
+        self._adaptive[index] = adaptive
+        self._applied[index[~adaptive]] = targets[~adaptive]
+
+        # Only zones with a reading can be forecast
+        pending = index[adaptive & ~np.isnan(self._temperature[index])]
+        if len(pending):
+            pending = np.roll(pending, -(self._cursor % len(pending)))
+
+        # The budget covers the cost evaluation; bookkeeping above is linear
+        # in zones like the rest of the tick
+        solve_started = time.perf_counter()
+        optimized = 0
+        chunk_seconds = 0.0
+        while optimized < len(pending):
+            elapsed = time.perf_counter() - solve_started
+            if optimized and elapsed + chunk_seconds > self.budget:
+                break
+            chunk_started = time.perf_counter()
+            self._solve(pending[optimized : optimized + self.chunk_size])
+            chunk_seconds = time.perf_counter() - chunk_started
+            optimized += self.chunk_size
+        optimized = min(optimized, len(pending))
+        deferred = len(pending) - optimized
+        self._cursor += optimized
+        if deferred:
+            ADAPTIVE_ZONES_DEFERRED.inc(deferred)
+
+        self.last_duration = time.perf_counter() - started
+        self.last_optimized = optimized
+        self.last_deferred = deferred
+        SETPOINT_OPTIMIZER_DURATION.observe(self.last_duration)
+
+        applied = np.where(np.isnan(self._applied[index]), targets, self._applied[index])
+        return list(zip(zone_ids, applied.tolist()))
+
+    def _power_model(self, index: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-zone mean setpoint, mean power_kw and slope of power against setpoint."""
+        weight, sx, sy, sxx, sxy = self._moments[index].T
+        weight = np.maximum(weight, 1e-9)
+        mean_x, mean_y = sx / weight, sy / weight
+        variance = np.maximum(sxx / weight - mean_x * mean_x, 0.0)
+        covariance = sxy / weight - mean_x * mean_y
+        # Shrunk towards zero until the setpoint has moved enough to tell
+        return mean_x, mean_y, covariance / (variance + self.ridge)
+
+    def _solve(self, index: np.ndarray):
+        target = self._target[index][:, None]
+        current = self._applied[index][:, None]
+        forecast = np.where(
+            np.isnan(self._predicted[index]), self._temperature[index], self._predicted[index]
+        )[:, None]
+        low = np.maximum(target - self.max_offset, MIN_SETPOINT)
+        high = np.minimum(target + self.max_offset, MAX_SETPOINT)
+        candidates = np.clip(current + self.steps, low, high)
+
+        expected = forecast + self.tracking * (candidates - current)
+        excess = np.maximum(np.abs(expected - target) - self.comfort_band, 0.0)
+        weight = np.where(self._occupied[index], 1.0, self.unoccupied_weight)[:, None]
+        mean_setpoint, mean_power, slope = self._power_model(index)
+        power = np.maximum(
+            mean_power[:, None] + slope[:, None] * (candidates - mean_setpoint[:, None]), 0.0
+        )
+
+        cost = (
+            self.comfort_weight * weight * excess * excess
+            + self.energy_weight * power
+            + self.move_weight * (candidates - current) ** 2
+        )
+        best = np.argmin(cost, axis=1)
+        rows = np.arange(len(index))
+        self._applied[index] = candidates[rows, best]
+        self._expected_temp[index] = expected[rows, best]
+        self._expected_power[index] = power[rows, best]
+
+    def _event(self, index: int, timestamp: str) -> dict:
+        adaptive = bool(self._adaptive[index])
+        return {
+            "type": "setpoint",
+            "zone_id": self._zone_ids[index],
+            "adaptive": adaptive,
+            "target": float(self._target[index]),
+            "applied": round(float(self._applied[index]), 2),
+            "expected_temp": (
+                None
+                if not adaptive or np.isnan(self._expected_temp[index])
+                else round(float(self._expected_temp[index]), 2)
+            ),
+            "expected_power_kw": (
+                None
+                if not adaptive or np.isnan(self._expected_power[index])
+                else round(float(self._expected_power[index]), 3)
+            ),
+            "timestamp": timestamp,
+        }
+
+    def changes(self, now: Optional[datetime] = None) -> List[dict]:
+        """
+        `setpoint` events for adaptive zones whose applied setpoint moved
+        since it was last published, and for zones that left adaptive mode.
+        """
+        n = len(self._zone_ids)
+        applied = np.round(self._applied[:n], 2)
+        published = self._published[:n]
+        adaptive = self._adaptive[:n]
+        changed = adaptive & (applied != published)
+        left = ~adaptive & ~np.isnan(published)
+        published[changed] = applied[changed]
+        published[left] = np.nan
+        timestamp = (now or datetime.now()).isoformat()
+        return [self._event(i, timestamp) for i in np.flatnonzero(changed | left)]
+
+    def snapshot(self) -> List[dict]:
+        """A `setpoint` event per adaptive zone, for subscribers joining late."""
+        n = len(self._zone_ids)
+        timestamp = datetime.now().isoformat()
+        return [self._event(i, timestamp) for i in np.flatnonzero(self._adaptive[:n])]
+
+    async def follow(self, event: dict):
+        """Event bus handler mirroring the setpoints published by the optimizing process."""
+        if event.get("type") != "setpoint":
+            return
+        index = self._index(event["zone_id"])
+        self._adaptive[index] = event["adaptive"]
+        self._target[index] = event["target"]
+        self._applied[index] = event["applied"]
+        for name, key in (("_expected_temp", "expected_temp"), ("_expected_power", "expected_power_kw")):
+            value = event.get(key)
+            getattr(self, name)[index] = np.nan if value is None else value
+
+    def report(self) -> dict:
+        zones = [
+            {
+                "zone_id": zone_id,
+                "target": float(self._target[i]),
+                "applied": round(float(self._applied[i]), 2),
+                "expected_temp": (
+                    None if np.isnan(self._expected_temp[i]) else round(float(self._expected_temp[i]), 2)
+                ),
+                "expected_power_kw": (
+                    None if np.isnan(self._expected_power[i]) else round(float(self._expected_power[i]), 3)
+                ),
+            }
+            for zone_id, i in self._zone_index.items()
+            if self._adaptive[i]
+        ]
+        return {
+            "budget_ms": self.budget * 1000,
+            "last_duration_ms": round(self.last_duration * 1000, 3),
+            "last_optimized": self.last_optimized,
+            "last_deferred": self.last_deferred,
+            "zones": zones,
+        }
+
+
+# Shared by the sensor loop and the control API; configured by the simulation
+setpoint_optimizer = SetpointOptimizer()
@@ -0,0 +1,335 @@
+import asyncio
+import multiprocessing as mp
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.metrics import ZONES_SKIPPED
+
+READING_COLUMNS = ("temperature", "humidity", "co2_level", "power_kw")
+TRENDS = ("stable", "rising", "falling")
+STARTUP_TIMEOUT = 60.0  # seconds
+REPLY_TIMEOUT = 10.0  # seconds a shard may take to answer one tick
+
+
+@dataclass
+class ShardBatch:
+    """
+    Columnar results for one tick, aligned by position with `zone_ids`.
+
+    Missing float values are NaN and missing occupancy is -1, mirroring the
+    optional keys of a reading dict from `MockDataGenerator`.
+    """
+
+    zone_ids: List[str]
+    columns: Dict[str, np.ndarray]
+    predictions: Optional[Dict[str, np.ndarray]] = None
+
+    def reading(self, index: int) -> dict:
+        """Rebuild the reading dict for one zone."""
+        data = {}
+        for name in READING_COLUMNS:
+            value = self.columns[name][index]
+            if not np.isnan(value):
+                data[name] = float(value)
+        occupancy = int(self.columns["occupancy"][index])
+        if occupancy >= 0:
+            data["occupancy"] = occupancy
+        return data
+
+    def prediction(self, index: int) -> Optional[Tuple[float, float, float, str]]:
+        """Return (current_temp, predicted_temp, confidence, trend) for a zone."""
+        if self.predictions is None:
+            return None
+        predicted = self.predictions["predicted_temp"][index]
+        if np.isnan(predicted):
+            return None
+        return (
+            float(self.columns["temperature"][index]),
+            float(predicted),
+            float(self.predictions["confidence"][index]),
+            TRENDS[int(self.predictions["trend"][index])],
+        )
+
+
+def _shard_worker(
+    conn,
+    backend: str,
+    substeps: int,
+    seed: Optional[int],
+    horizon_minutes: int,
+    interval_seconds: float,
+    window: int,
+):
+    """Worker process loop: own generator and predictor state for its zones."""
+    from app.services.simulator import create_simulator
+    from app.services.prediction_engine import PredictionEngine
+
+    # Simulation time comes from the parent with each tick
+    now = [datetime.now()]
+    generator = create_simulator(
+        backend,
+        step_seconds=interval_seconds,
+        substeps=substeps,
+        seed=seed,
+        clock=lambda: now[0],
+    )
+    engine = PredictionEngine(horizon_minutes=horizon_minutes)
+    history: Dict[str, Deque[float]] = {}
+    conn.send("ready")
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        zone_ids, setpoints, compute_predictions, now[0] = message
+
+        count = len(zone_ids)
+        columns = {name: np.full(count, np.nan) for name in READING_COLUMNS}
+        columns["occupancy"] = np.full(count, -1, dtype=np.int32)
+        predictions = None
+        if compute_predictions:
+            predictions = {
+                "predicted_temp": np.full(count, np.nan),
+                "confidence": np.zeros(count),
+                "trend": np.zeros(count, dtype=np.int8),
+            }
+
+        readings = generator.generate_batch(list(zip(zone_ids, setpoints)))
+        for i, zone_id in enumerate(zone_ids):
+            reading = readings[zone_id]
+            for name in READING_COLUMNS:
+                if name in reading:
+                    columns[name][i] = reading[name]
+            if reading.get("occupancy") is not None:
+                columns["occupancy"][i] = reading["occupancy"]
+
+            temps = history.setdefault(zone_id, deque(maxlen=window))
+            temps.append(reading["temperature"])
+
+            if predictions is not None:
+                predicted, confidence, trend = engine.predict(
+                    list(temps), interval_seconds
+                )
+                predictions["predicted_temp"][i] = predicted
+                predictions["confidence"][i] = confidence
+                predictions["trend"][i] = TRENDS.index(trend)
+
+        conn.send((columns, predictions))
+
+    conn.close()
+
+
+class ShardedSimulator:
+    """
+    Partitions zones across worker processes, one generator/predictor shard
+    per process, so simulation throughput scales with cores.
+
+    Zones are assigned to shards by a stable hash of their id so each zone's
+    random-walk and prediction history stay in one worker. Workers keep a
+    rolling window of recent temperatures in memory, which replaces the
+    per-zone history query of the in-process path. Results come back over
+    pipes as compact numpy columns. With the RC network backend each shard
+    steps its own sub-network, so zones only couple within a shard. A
+    `seed` gives every shard its own fixed RNG stream (seed + shard index).
+
+    Starting a worker blocks until it has imported everything, so starts,
+    restarts and the joins in `stop` run in threads. A shard that dies, or doesn't answer a
+    tick within `reply_timeout`, is terminated and restarted in the
+    background; its zones are skipped until it is back.
+    """
+
+    def __init__(
+        self,
+        shards: int,
+        backend: str = "random_walk",
+        substeps: int = 10,
+        seed: Optional[int] = None,
+        horizon_minutes: int = 15,
+        interval_seconds: float = 5.0,
+        window_minutes: float = 5.0,
+        reply_timeout: float = REPLY_TIMEOUT,
+    ):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.shards = shards
+        self.backend = backend
+        self.substeps = substeps
+        self.seed = seed
+        self.horizon_minutes = horizon_minutes
+        self.interval_seconds = interval_seconds
+        self.window = max(1, int(window_minutes * 60 / interval_seconds))
+        self.reply_timeout = reply_timeout
+        self._context = mp.get_context("spawn")
+        self._processes: List[Optional[mp.Process]] = [None] * shards
+        self._connections: List = [None] * shards
+        self._restarting: Set[int] = set()
+        self._restart_tasks: Set[asyncio.Task] = set()
+
+    def shard_for(self, zone_id: str) -> int:
+        return zlib.crc32(zone_id.encode()) % self.shards
+
+    def _start_shard(self, index: int):
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_shard_worker,
+            args=(
+                child,
+                self.backend,
+                self.substeps,
+                None if self.seed is None else self.seed + index,
+                self.horizon_minutes,
+                self.interval_seconds,
+                self.window,
+            ),
+            name=f"fcu-shard-{index}",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+
+        # Wait for imports to finish so the first tick isn't charged for them.
+        # Blocking: only call this from a thread.
+        if not parent.poll(STARTUP_TIMEOUT) or parent.recv() != "ready":
+            process.terminate()
+            raise RuntimeError(f"Simulation shard {index} failed to start")
+        self._connections[index] = parent
+        self._processes[index] = process
+
+    async def start(self):
+        await asyncio.gather(
+            *(asyncio.to_thread(self._start_shard, index) for index in range(self.shards))
+        )
+
+    def _ready(self, index: int) -> bool:
+        process = self._processes[index]
+        return index not in self._restarting and process is not None and process.is_alive()
+
+    def _kill(self, index: int):
+        process, self._processes[index] = self._processes[index], None
+        if process is not None and process.is_alive():
+            # SIGKILL: a stopped or wedged worker may never act on SIGTERM
+            process.kill()
+        # Not closed here: a receive that timed out may still be blocked on
+        # it, and a closed descriptor could be reused by the new shard's
+        # pipe. The killed worker's EOF ends that receive instead.
+        self._connections[index] = None
+
+    def _schedule_restart(self, index: int, reason: str):
+        if index in self._restarting:
+            return
+        print(f"Restarting simulation shard {index}: {reason}")
+        self._restarting.add(index)
+        self._kill(index)
+        task = asyncio.create_task(self._restart(index))
+        self._restart_tasks.add(task)
+        task.add_done_callback(self._restart_tasks.discard)
+
+    async def _restart(self, index: int):
+        try:
+            await asyncio.to_thread(self._start_shard, index)
+        except Exception as e:
+            # Retried on the next tick
+            print(f"Simulation shard {index} failed to restart: {e}")
+        finally:
+            self._restarting.discard(index)
+
+    async def _receive(self, index: int):
+        """One shard's reply, or None if it died or timed out (it is then restarted)."""
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(self._connections[index].recv), self.reply_timeout
+            )
+        except asyncio.TimeoutError:
+            self._schedule_restart(index, f"no reply within {self.reply_timeout:.0f} s")
+        except (EOFError, OSError) as e:
+            self._schedule_restart(index, f"connection lost ({e!r})")
+        return None
+
+    async def step(
+        self,
+        zones: List[Tuple[str, float]],
+        compute_predictions: bool = True,
+        now: Optional[datetime] = None,
+    ) -> ShardBatch:
+        """
+        Advance every zone by one reading, in parallel across shards.
+        Zones of shards that are down are left out of the batch.
+        """
+        for index in range(self.shards):
+            if index not in self._restarting and not self._ready(index):
+                self._schedule_restart(index, "process exited")
+        now = now or datetime.now()
+
+        assignments: List[List[Tuple[str, float]]] = [[] for _ in range(self.shards)]
+        for zone_id, setpoint in zones:
+            assignments[self.shard_for(zone_id)].append((zone_id, setpoint))
+
+        active = []
+        for index, assigned in enumerate(assignments):
+            if not assigned:
+                continue
+            if not self._ready(index):
+                ZONES_SKIPPED.inc(len(assigned), reason="shard_down")
+                continue
+            zone_ids = [zone_id for zone_id, _ in assigned]
+            setpoints = [setpoint for _, setpoint in assigned]
+            try:
+                self._connections[index].send((zone_ids, setpoints, compute_predictions, now))
+            except (BrokenPipeError, OSError) as e:
+                self._schedule_restart(index, f"connection lost ({e!r})")
+                ZONES_SKIPPED.inc(len(assigned), reason="shard_down")
+                continue
+            active.append(index)
+
+        received = await asyncio.gather(*(self._receive(i) for i in active))
+        replies = []
+        answered = []
+        for index, reply in zip(active, received):
+            if reply is None:
+                ZONES_SKIPPED.inc(len(assignments[index]), reason="shard_down")
+            else:
+                replies.append(reply)
+                answered.append(index)
+
+        zone_ids = [zone_id for i in answered for zone_id, _ in assignments[i]]
+        if not answered:
+            return ShardBatch(zone_ids=[], columns={})
+        columns = {
+            name: np.concatenate([reply[0][name] for reply in replies])
+            for name in replies[0][0]
+        }
+        predictions = None
+        if compute_predictions:
+            predictions = {
+                name: np.concatenate([reply[1][name] for reply in replies])
+                for name in replies[0][1]
+            }
+        return ShardBatch(zone_ids=zone_ids, columns=columns, predictions=predictions)
+
+    @staticmethod
+    def _join(process: mp.Process):
+        # Blocking: only call this from a thread
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+    async def stop(self):
+        """Ask every worker to exit and wait for them in threads, all at once."""
+        for task in list(self._restart_tasks):
+            task.cancel()
+        processes = []
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            try:
+                self._connections[index].send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            processes.append(process)
+            self._processes[index] = None
+        await asyncio.gather(*(asyncio.to_thread(self._join, process) for process in processes))
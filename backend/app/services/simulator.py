@@ -1,7 +1,27 @@
 import random
 import math
-from datetime import datetime
-from typing import Dict, Tuple
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+Clock = Callable[[], datetime]
+
+
+class SimulatedClock:
+    """
+    Deterministic clock for seeded runs: starts at a fixed instant and only
+    moves when `advance()` is called, once per simulation tick.
+    """
+
+    def __init__(self, start: datetime, step_seconds: float):
+        self._now = start
+        self._step = timedelta(seconds=step_seconds)
+
+    def __call__(self) -> datetime:
+        return self._now
+
+    def advance(self) -> datetime:
+        self._now += self._step
+        return self._now
 
 
 class MockDataGenerator:
@@ -32,25 +52,28 @@ class MockDataGenerator:
         },
     }
 
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None, clock: Optional[Clock] = None):
+        self._random = rng if rng is not None else random.Random()
+        self._clock = clock or datetime.now
         self._temp_state: Dict[str, float] = {}
         self._humidity_state: Dict[str, float] = {}
         self._trend_direction: Dict[str, int] = {}
 
     def _get_time_factor(self) -> float:
         """Returns a factor based on time of day (simulates daily patterns)."""
-        hour = datetime.now().hour
+        hour = self._clock().hour
         # Peak heat around 2PM, cool in early morning
         return math.sin((hour - 6) * math.pi / 12) * 0.5
 
     def _get_occupancy_factor(self, zone_id: str) -> Tuple[int, float]:
         """Simulates occupancy patterns for office zones."""
-        hour = datetime.now().hour
-        day = datetime.now().weekday()
+        now = self._clock()
+        hour = now.hour
+        day = now.weekday()
 
         # Weekend - minimal occupancy
         if day >= 5:
-            occupancy = random.randint(0, 2)
+            occupancy = self._random.randint(0, 2)
             return occupancy, occupancy * 0.05
 
         # Business hours (8AM - 6PM)
@@ -58,10 +81,10 @@ class MockDataGenerator:
             # Peak at lunch time
             peak_factor = 1 - abs(hour - 13) / 5
             max_occ = self.ZONE_PROFILES.get(zone_id, {}).get("max_occupancy", 10)
-            occupancy = int(max_occ * peak_factor * random.uniform(0.7, 1.0))
+            occupancy = int(max_occ * peak_factor * self._random.uniform(0.7, 1.0))
             return occupancy, occupancy * 0.1  # Body heat contribution
 
-        return random.randint(0, 3), 0.0
+        return self._random.randint(0, 3), 0.0
 
     def generate_reading(self, zone_id: str, setpoint: float) -> dict:
         """Generate a realistic sensor reading for the given zone."""
@@ -71,7 +94,7 @@ class MockDataGenerator:
         if zone_id not in self._temp_state:
             self._temp_state[zone_id] = profile["base_temp"]
             self._humidity_state[zone_id] = profile["base_humidity"]
-            self._trend_direction[zone_id] = random.choice([-1, 1])
+            self._trend_direction[zone_id] = self._random.choice([-1, 1])
 
         # Temperature simulation with momentum
         time_factor = self._get_time_factor()
@@ -87,10 +110,10 @@ class MockDataGenerator:
         setpoint_pull = (setpoint - current_temp) * 0.05
 
         # Random walk with mean reversion
-        noise = random.gauss(0, profile["temp_variance"] * 0.3)
+        noise = self._random.gauss(0, profile["temp_variance"] * 0.3)
 
         # Occasional trend changes
-        if random.random() < 0.1:
+        if self._random.random() < 0.1:
             self._trend_direction[zone_id] *= -1
 
         trend = self._trend_direction[zone_id] * 0.02
@@ -110,7 +133,7 @@ class MockDataGenerator:
         self._temp_state[zone_id] = new_temp
 
         # Humidity simulation
-        humidity_noise = random.gauss(0, profile["humidity_variance"] * 0.2)
+        humidity_noise = self._random.gauss(0, profile["humidity_variance"] * 0.2)
         new_humidity = self._humidity_state[zone_id] + humidity_noise
         new_humidity = max(30.0, min(70.0, new_humidity))
         self._humidity_state[zone_id] = new_humidity
@@ -127,13 +150,13 @@ class MockDataGenerator:
         # Power increases when temp is far from setpoint
         power_factor = 1 + abs(setpoint - new_temp) * 0.1
         reading["power_kw"] = round(
-            power_base * power_factor + random.gauss(0, power_variance), 2
+            power_base * power_factor + self._random.gauss(0, power_variance), 2
         )
 
         # Add CO2 for office
         if profile.get("has_co2"):
             base_co2 = 400  # Outdoor baseline
-            co2 = base_co2 + (occupancy or 0) * 25 + random.gauss(0, 20)
+            co2 = base_co2 + (occupancy or 0) * 25 + self._random.gauss(0, 20)
             reading["co2_level"] = round(max(350, min(1200, co2)), 0)
 
         # Add occupancy
@@ -142,6 +165,44 @@ class MockDataGenerator:
 
         return reading
 
+    def generate_batch(self, zones: List[Tuple[str, float]]) -> Dict[str, dict]:
+        """Generate one reading per (zone_id, setpoint) pair."""
+        return {
+            zone_id: self.generate_reading(zone_id, setpoint)
+            for zone_id, setpoint in zones
+        }
+
 
 # Global instance
 mock_generator = MockDataGenerator()
+
+SIMULATOR_BACKENDS = ("random_walk", "rc_network")
+
+
+def create_simulator(
+    backend: str = "random_walk",
+    step_seconds: float = 5.0,
+    substeps: int = 10,
+    seed: Optional[int] = None,
+    clock: Optional[Clock] = None,
+):
+    """
+    Build a reading source for the given backend. Every backend provides
+    `generate_batch(zones)` and `generate_reading(zone_id, setpoint)`.
+
+    With a `seed` and a deterministic `clock` the generated sequence is
+    identical from run to run.
+    """
+    if backend == "random_walk":
+        return MockDataGenerator(rng=random.Random(seed), clock=clock)
+    if backend == "rc_network":
+        import numpy as np
+        from app.services.thermal_network import ThermalNetworkSimulator
+
+        return ThermalNetworkSimulator(
+            step_seconds=step_seconds,
+            substeps=substeps,
+            rng=np.random.default_rng(seed),
+            clock=clock,
+        )
+    raise ValueError(f"Unknown simulator backend {backend!r}; expected one of {SIMULATOR_BACKENDS}")
@@ -0,0 +1,263 @@
+import math
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Physical parameters per zone profile (SI units: J/K, W/K, W, m^3, m^3/s)
+ZONE_PARAMETERS = {
+    "server-room": {
+        "capacitance": 3.0e6,
+        "ua_outdoor": 100.0,
+        "internal_gain": 8000.0,
+        "fcu_capacity": 15000.0,
+        "base_humidity": 45.0,
+        "max_occupancy": 0,
+        "volume": 300.0,
+        "ventilation": 0.1,
+    },
+    "open-office": {
+        "capacitance": 5.0e6,
+        "ua_outdoor": 200.0,
+        "internal_gain": 1000.0,
+        "fcu_capacity": 10000.0,
+        "base_humidity": 55.0,
+        "max_occupancy": 25,
+        "volume": 600.0,
+        "ventilation": 0.3,
+    },
+}
+
+WATTS_PER_OCCUPANT = 100.0
+CO2_PER_OCCUPANT = 5.0e-6  # m^3/s exhaled
+OUTDOOR_CO2 = 400.0  # ppm
+FCU_COP = 3.5
+FCU_FAN_KW = 0.3
+CONTROLLER_GAIN = 3000.0  # W/K
+CONTROLLER_INTEGRAL_TIME = 600.0  # s
+ADJACENT_CONDUCTANCE = 50.0  # W/K between neighbouring zones
+
+
+class ThermalNetworkSimulator:
+    """
+    Resistor-capacitor (RC) thermal network stepped for all zones at once.
+
+    Each zone is one thermal capacitance connected to outdoors and to its
+    neighbours through conductances (1/R). Heat inputs are outdoor exchange,
+    coupling flows, internal gains (equipment and occupants) and the FCU,
+    modelled as a capacity-limited PI controller tracking the setpoint:
+
+        C_i dT_i/dt = UA_i (T_out - T_i) + sum_j G_ij (T_j - T_i)
+                      + Q_internal_i + Q_fcu_i
+
+    The network is integrated with explicit Euler over `substeps` per call.
+    Coupling is kept as an edge list and applied with `np.bincount`, a
+    sparse matrix-vector product that scales to thousands of zones on one
+    core. Zones are chained to their registration neighbours by default;
+    use `couple` for a custom topology.
+    """
+
+    def __init__(
+        self,
+        step_seconds: float = 5.0,
+        substeps: int = 10,
+        rng: Optional[np.random.Generator] = None,
+        clock: Optional[Callable[[], datetime]] = None,
+    ):
+        self.step_seconds = step_seconds
+        self.substeps = max(1, substeps)
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._clock = clock or datetime.now
+
+        self._index: Dict[str, int] = {}
+        self._zone_ids: List[str] = []
+        self._has_occupancy = np.zeros(0, dtype=bool)
+        self._max_occupancy = np.zeros(0)
+        self._temp = np.zeros(0)
+        self._integral = np.zeros(0)
+        self._setpoint = np.zeros(0)
+        self._capacitance = np.ones(0)
+        self._ua = np.zeros(0)
+        self._gain = np.zeros(0)
+        self._capacity = np.zeros(0)
+        self._humidity = np.zeros(0)
+        self._base_humidity = np.zeros(0)
+        self._co2 = np.zeros(0)
+        self._volume = np.ones(0)
+        self._ventilation = np.zeros(0)
+
+        self._edge_src = np.zeros(0, dtype=np.int64)
+        self._edge_dst = np.zeros(0, dtype=np.int64)
+        self._edge_conductance = np.zeros(0)
+
+        self._batch_key: Optional[Tuple[str, ...]] = None
+        self._batch_index = np.zeros(0, dtype=np.int64)
+
+    @property
+    def zone_count(self) -> int:
+        return len(self._zone_ids)
+
+    def _outdoor_temp(self, now: datetime) -> float:
+        """Daily outdoor cycle: 27°C before dawn, 33°C mid-afternoon."""
+        hour = now.hour + now.minute / 60
+        return 30.0 + 3.0 * math.sin((hour - 9) * math.pi / 12)
+
+    def _occupancy_factor(self, now: datetime) -> float:
+        """Fraction of maximum occupancy, matching MockDataGenerator's schedule."""
+        if now.weekday() >= 5:
+            return 0.05
+        if 8 <= now.hour <= 18:
+            return 1 - abs(now.hour - 13) / 5
+        return 0.05
+
+    def _add_zones(self, zone_ids: List[str], setpoints: List[float]):
+        count = len(zone_ids)
+        params = [
+            ZONE_PARAMETERS.get(zone_id, ZONE_PARAMETERS["open-office"])
+            for zone_id in zone_ids
+        ]
+
+        def column(key: str) -> np.ndarray:
+            return np.array([p[key] for p in params], dtype=float)
+
+        start = self.zone_count
+        for offset, zone_id in enumerate(zone_ids):
+            self._index[zone_id] = start + offset
+        self._zone_ids.extend(zone_ids)
+
+        max_occupancy = column("max_occupancy")
+        self._has_occupancy = np.concatenate([self._has_occupancy, max_occupancy > 0])
+        self._max_occupancy = np.concatenate([self._max_occupancy, max_occupancy])
+        self._temp = np.concatenate([self._temp, np.asarray(setpoints, dtype=float)])
+        self._integral = np.concatenate([self._integral, np.zeros(count)])
+        self._setpoint = np.concatenate([self._setpoint, np.asarray(setpoints, dtype=float)])
+        self._capacitance = np.concatenate([self._capacitance, column("capacitance")])
+        self._ua = np.concatenate([self._ua, column("ua_outdoor")])
+        self._gain = np.concatenate([self._gain, column("internal_gain")])
+        self._capacity = np.concatenate([self._capacity, column("fcu_capacity")])
+        self._humidity = np.concatenate([self._humidity, column("base_humidity")])
+        self._base_humidity = np.concatenate([self._base_humidity, column("base_humidity")])
+        self._co2 = np.concatenate([self._co2, np.full(count, OUTDOOR_CO2)])
+        self._volume = np.concatenate([self._volume, column("volume")])
+        self._ventilation = np.concatenate([self._ventilation, column("ventilation")])
+
+        # Chain new zones to their registration neighbours
+        for index in range(max(1, start), start + count):
+            self._add_edge(index - 1, index, ADJACENT_CONDUCTANCE)
+        self._batch_key = None
+
+    def _add_edge(self, a: int, b: int, conductance: float):
+        self._edge_src = np.append(self._edge_src, a)
+        self._edge_dst = np.append(self._edge_dst, b)
+        self._edge_conductance = np.append(self._edge_conductance, conductance)
+
+    def couple(self, zone_a: str, zone_b: str, conductance: float):
+        """Connect two known zones with an extra conductance (W/K)."""
+        self._add_edge(self._index[zone_a], self._index[zone_b], conductance)
+
+    def _resolve(self, zones: List[Tuple[str, float]]) -> np.ndarray:
+        """Map a batch of zone ids to network indices, registering new zones."""
+        key = tuple(zone_id for zone_id, _ in zones)
+        if key == self._batch_key:
+            return self._batch_index
+
+        new = [(z, sp) for z, sp in zones if z not in self._index]
+        if new:
+            self._add_zones([z for z, _ in new], [sp for _, sp in new])
+        self._batch_key = key
+        self._batch_index = np.fromiter(
+            (self._index[zone_id] for zone_id in key), dtype=np.int64, count=len(key)
+        )
+        return self._batch_index
+
+    def step(self, now: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Advance the whole network by `step_seconds`.
+
+        Returns (fcu_power_kw, occupancy, occupied_mask) for every zone.
+        """
+        now = now or self._clock()
+        n = self.zone_count
+        dt = self.step_seconds / self.substeps
+        outdoor = self._outdoor_temp(now)
+
+        occupancy = np.where(
+            self._has_occupancy,
+            np.floor(
+                self._max_occupancy
+                * self._occupancy_factor(now)
+                * self._rng.uniform(0.7, 1.0, n)
+            ),
+            0.0,
+        )
+        internal = self._gain + occupancy * WATTS_PER_OCCUPANT
+        ki = CONTROLLER_GAIN / CONTROLLER_INTEGRAL_TIME
+
+        q_fcu = np.zeros(n)
+        for _ in range(self.substeps):
+            temp = self._temp
+            error = self._setpoint - temp
+            demand = CONTROLLER_GAIN * error + ki * self._integral
+            q_fcu = np.clip(demand, -self._capacity, self._capacity)
+
+            # Anti-windup: only integrate while the FCU is not saturated
+            unsaturated = q_fcu == demand
+            self._integral += np.where(unsaturated, error * dt, 0.0)
+
+            flow = self._edge_conductance * (temp[self._edge_dst] - temp[self._edge_src])
+            coupling = np.bincount(self._edge_src, weights=flow, minlength=n) - np.bincount(
+                self._edge_dst, weights=flow, minlength=n
+            )
+            heat = self._ua * (outdoor - temp) + coupling + internal + q_fcu
+            self._temp = temp + dt * heat / self._capacitance
+
+        # CO2 mass balance and humidity (cooling dehumidifies)
+        generation = occupancy * CO2_PER_OCCUPANT * 1e6
+        self._co2 += (
+            self.step_seconds
+            * (generation - self._ventilation * (self._co2 - OUTDOOR_CO2))
+            / self._volume
+        )
+        cooling_kw = np.maximum(-q_fcu, 0.0) / 1000
+        humidity_target = self._base_humidity + occupancy * 0.2 - cooling_kw * 0.5
+        self._humidity += 0.05 * (humidity_target - self._humidity) + self._rng.normal(
+            0, 0.2, n
+        )
+        self._humidity = np.clip(self._humidity, 30.0, 70.0)
+
+        power_kw = np.abs(q_fcu) / 1000 / FCU_COP + FCU_FAN_KW
+        return power_kw, occupancy, self._has_occupancy
+
+    def generate_batch(self, zones: List[Tuple[str, float]]) -> Dict[str, dict]:
+        """Apply setpoints, step the network once and return one reading per zone."""
+        if not zones:
+            return {}
+        index = self._resolve(zones)
+        self._setpoint[index] = [setpoint for _, setpoint in zones]
+
+        power_kw, occupancy, occupied = self.step()
+
+        # Sensor noise is applied to the outputs, not the thermal state
+        temps = np.clip(self._temp[index] + self._rng.normal(0, 0.05, len(index)), 15.0, 30.0)
+        humidity = self._humidity[index]
+        power = power_kw[index]
+        co2 = np.clip(self._co2[index], 350, 2000)
+        occ = occupancy[index]
+        has_occ = occupied[index]
+
+        readings = {}
+        for i, (zone_id, _) in enumerate(zones):
+            reading = {
+                "temperature": round(float(temps[i]), 2),
+                "humidity": round(float(humidity[i]), 1),
+                "power_kw": round(float(power[i]), 2),
+            }
+            if has_occ[i]:
+                reading["co2_level"] = round(float(co2[i]), 0)
+                reading["occupancy"] = int(occ[i])
+            readings[zone_id] = reading
+        return readings
+
+    def generate_reading(self, zone_id: str, setpoint: float) -> dict:
+        """Single-zone convenience wrapper; steps the whole network."""
+        return self.generate_batch([(zone_id, setpoint)])[zone_id]
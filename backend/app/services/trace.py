@@ -0,0 +1,231 @@
+import json
+import math
+import os
+import struct
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# File layout: MAGIC, then a stream of records, each starting with a 1-byte
+# tag. Records are only ever appended, so a trace that was cut off mid-write
+# stays readable up to its last complete record.
+MAGIC = b"FCUTRC01"
+
+TAG_ZONE = 1  # zone index (u16), name length (u16), utf-8 name
+TAG_TICK = 2  # unix timestamp (f64)
+TAG_READING = 3  # zone index (u16), metrics (4 x f32, NaN = missing), occupancy (i16, -1 = missing)
+TAG_EVENT = 4  # length (u32), JSON body
+
+_ZONE = struct.Struct("<HH")
+_TICK = struct.Struct("<d")
+_READING = struct.Struct("<H4fh")
+_EVENT = struct.Struct("<I")
+
+# Metric columns and the rounding MockDataGenerator applies to each
+METRICS: Tuple[Tuple[str, int], ...] = (
+    ("temperature", 2),
+    ("humidity", 1),
+    ("co2_level", 0),
+    ("power_kw", 2),
+)
+
+
+@dataclass
+class TraceTick:
+    """One recorded tick: its readings and the discovery events that followed."""
+
+    timestamp: datetime
+    readings: Dict[str, dict] = field(default_factory=dict)
+    events: List[dict] = field(default_factory=list)
+
+
+class TraceWriter:
+    """
+    Appends simulation ticks to a compact binary trace.
+
+    A reading costs 21 bytes; zone ids are written once and then referred
+    to by index. Appending to an existing trace continues its zone table.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zones: Dict[str, int] = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            for zone_id in TraceReader(path).zone_ids():
+                self._zones[zone_id] = len(self._zones)
+            self._file: BinaryIO = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(MAGIC)
+
+    def _zone_index(self, zone_id: str) -> int:
+        index = self._zones.get(zone_id)
+        if index is None:
+            index = len(self._zones)
+            self._zones[zone_id] = index
+            name = zone_id.encode()
+            self._file.write(bytes([TAG_ZONE]) + _ZONE.pack(index, len(name)) + name)
+        return index
+
+    def write_tick(self, timestamp: datetime, readings: Dict[str, dict]):
+        """Record one tick's readings, keyed by zone id."""
+        out = bytearray([TAG_TICK])
+        out += _TICK.pack(timestamp.timestamp())
+        for zone_id, reading in readings.items():
+            index = self._zone_index(zone_id)
+            values = [reading.get(name) for name, _ in METRICS]
+            occupancy = reading.get("occupancy")
+            out.append(TAG_READING)
+            out += _READING.pack(
+                index,
+                *(math.nan if v is None else v for v in values),
+                -1 if occupancy is None else occupancy,
+            )
+        self._file.write(out)
+        self._file.flush()
+
+    def write_event(self, event: dict):
+        """Record a discovery event against the most recent tick."""
+        body = json.dumps(event, separators=(",", ":")).encode()
+        self._file.write(bytes([TAG_EVENT]) + _EVENT.pack(len(body)) + body)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class TraceReader:
+    """Streams ticks back out of a trace written by `TraceWriter`."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _records(self) -> Iterator[Tuple[int, object]]:
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a simulation trace")
+            while True:
+                tag = f.read(1)
+                if not tag:
+                    return
+                tag = tag[0]
+                if tag == TAG_ZONE:
+                    header = f.read(_ZONE.size)
+                    if len(header) < _ZONE.size:
+                        return
+                    index, length = _ZONE.unpack(header)
+                    name = f.read(length)
+                    if len(name) < length:
+                        return
+                    yield tag, (index, name.decode())
+                elif tag == TAG_TICK:
+                    body = f.read(_TICK.size)
+                    if len(body) < _TICK.size:
+                        return
+                    yield tag, _TICK.unpack(body)[0]
+                elif tag == TAG_READING:
+                    body = f.read(_READING.size)
+                    if len(body) < _READING.size:
+                        return
+                    yield tag, _READING.unpack(body)
+                elif tag == TAG_EVENT:
+                    header = f.read(_EVENT.size)
+                    if len(header) < _EVENT.size:
+                        return
+                    (length,) = _EVENT.unpack(header)
+                    body = f.read(length)
+                    if len(body) < length:
+                        return
+                    yield tag, json.loads(body)
+                else:
+                    raise ValueError(f"Corrupt trace {self.path}: unknown record tag {tag}")
+
+    def zone_ids(self) -> List[str]:
+        return [value[1] for tag, value in self._records() if tag == TAG_ZONE]
+
+    def ticks(self) -> Iterator[TraceTick]:
+        zones: List[str] = []
+        current: Optional[TraceTick] = None
+        for tag, value in self._records():
+            if tag == TAG_ZONE:
+                zones.append(value[1])
+            elif tag == TAG_TICK:
+                if current is not None:
+                    yield current
+                current = TraceTick(timestamp=datetime.fromtimestamp(value))
+            elif current is None:
+                continue
+            elif tag == TAG_READING:
+                index, *values, occupancy = value
+                reading = {}
+                for (name, digits), v in zip(METRICS, values):
+                    if not math.isnan(v):
+                        reading[name] = round(v, digits)
+                if occupancy >= 0:
+                    reading["occupancy"] = occupancy
+                current.readings[zones[index]] = reading
+            else:
+                current.events.append(value)
+        if current is not None:
+            yield current
+
+
+class TraceReplaySource:
+    """
+    Reading source that plays a recorded trace back one tick per call to
+    `generate_batch`. Setpoints are ignored: the trace already reflects the
+    setpoints in force when it was recorded. Replay speed is set by the tick
+    interval the caller runs at.
+    """
+
+    def __init__(self, path: str, loop: bool = False):
+        self.reader = TraceReader(path)
+        self.loop = loop
+        self.finished = False
+        self.ticks_replayed = 0
+        self._ticks = self.reader.ticks()
+        self._timestamp: Optional[datetime] = None
+        self._events: List[dict] = []
+
+    def now(self) -> datetime:
+        """Recorded timestamp of the tick most recently replayed."""
+        return self._timestamp or datetime.now()
+
+    def _next_tick(self) -> Optional[TraceTick]:
+        tick = next(self._ticks, None)
+        if tick is None and self.loop and self.ticks_replayed:
+            self._ticks = self.reader.ticks()
+            tick = next(self._ticks, None)
+        return tick
+
+    def generate_batch(self, zones: List[Tuple[str, float]]) -> Dict[str, dict]:
+        """Return the next recorded tick's readings for the requested zones."""
+        tick = self._next_tick()
+        if tick is None:
+            self.finished = True
+            return {}
+        self.ticks_replayed += 1
+        self._timestamp = tick.timestamp
+        self._events.extend(tick.events)
+        return {
+            zone_id: tick.readings[zone_id]
+            for zone_id, _ in zones
+            if zone_id in tick.readings
+        }
+
+    def take_events(self) -> List[dict]:
+        """Discovery events recorded after the tick just replayed."""
+        events, self._events = self._events, []
+        return events
+
+
+def open_replay_source(path: str, step_seconds: float = 5.0):
+    """Replay source for either trace format, chosen by the file's magic bytes."""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        return TraceReplaySource(path)
+
+    from app.services.mmap_trace import MmapReplaySource
+
+    return MmapReplaySource(path, step_seconds=step_seconds)
@@ -0,0 +1,667 @@
+"""
+Simulation engine: sensor tick loop, per-zone pipelines and device discovery.
+
+Runs inside the API process by default (SIMULATION_MODE=embedded). It can
+also run as its own process, writing to the database and publishing events
+to API processes over a local TCP event bus:
+
+    python -m app.simulation            # simulator + event bus
+    SIMULATION_MODE=external uvicorn app.main:app   # API consuming events
+"""
+
+import asyncio
+import random
+import signal
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, insert
+
+from app.config import get_settings
+from app.database import init_db, async_session_maker, warm_up_pool
+from app.models import Zone, Device, SensorReading, Prediction
+from app.services import (
+    create_simulator,
+    prediction_engine,
+    discovery_simulator,
+    DeviceDiscoverySimulator,
+    TickScheduler,
+    ShardedSimulator,
+)
+from app.services.event_bus import event_bus, EventBusServer
+from app.services.onboarding import DeviceOnboarding
+from app.services.device_registry import DeviceRegistry
+from app.services.simulator import SimulatedClock
+from app.services.trace import TraceWriter, open_replay_source
+from app.services.query_profiler import query_profiler
+from app.services.load_shedder import load_shedder
+from app.services.rolling_stats import rolling_stats
+from app.services.energy import energy_meter
+from app.services.alerts import alert_engine, load_rules
+from app.services.setpoint_optimizer import setpoint_optimizer
+from app.services.metrics import (
+    metrics,
+    TICK_DURATION,
+    ZONE_PIPELINE_DURATION,
+    ZONES_SKIPPED,
+    ZONE_PIPELINES_LATE,
+    PREDICTION_DURATION,
+    QUEUE_DEPTH,
+    BACKGROUND_EXCEPTIONS,
+)
+
+settings = get_settings()
+
+# Background task flags
+background_tasks_running = False
+energy_task: Optional[asyncio.Task] = None
+
+# Seeded runs use a simulated clock that advances one interval per tick, so
+# time-of-day effects don't depend on when the run happens
+sim_clock = (
+    SimulatedClock(settings.simulation_start, settings.sensor_update_interval)
+    if settings.simulation_seed is not None
+    else None
+)
+clock = sim_clock or datetime.now
+
+# Replays run the recorded ticks N times faster than they were recorded
+replaying = settings.trace_replay_path is not None
+tick_interval = settings.sensor_update_interval / (settings.replay_speed if replaying else 1.0)
+
+# Fixed-rate clock driving the sensor loop
+sensor_scheduler = TickScheduler(
+    interval=tick_interval,
+    overrun_policy=settings.tick_overrun_policy,
+    stagger_fraction=settings.tick_stagger_fraction,
+)
+
+# Bounded per-zone concurrency within a tick
+zone_semaphore = asyncio.Semaphore(settings.zone_concurrency)
+zones_in_flight: set = set()
+QUEUE_DEPTH.set_function(lambda: len(zones_in_flight), queue="zone_pipelines")
+
+# Multi-process simulation shards (None = simulate in this process)
+sharded_simulator = (
+    ShardedSimulator(
+        shards=settings.simulation_shards,
+        backend=settings.simulator_backend,
+        substeps=settings.rc_substeps,
+        seed=settings.simulation_seed,
+        horizon_minutes=settings.prediction_horizon_minutes,
+        interval_seconds=settings.sensor_update_interval,
+    )
+    if settings.simulation_shards > 0 and not replaying
+    else None
+)
+
+# In-process reading source: a recorded trace or the configured backend
+reading_source = (
+    open_replay_source(settings.trace_replay_path, settings.sensor_update_interval)
+    if replaying
+    else create_simulator(
+        settings.simulator_backend,
+        step_seconds=settings.sensor_update_interval,
+        substeps=settings.rc_substeps,
+        seed=settings.simulation_seed,
+        clock=clock,
+    )
+)
+
+discovery = (
+    DeviceDiscoverySimulator(
+        rng=random.Random(f"discovery-{settings.simulation_seed}"), clock=clock
+    )
+    if settings.simulation_seed is not None
+    else discovery_simulator
+)
+
+# In-memory device table; heartbeats are batched and silent devices time out.
+# The timeout never drops below three ticks, or healthy devices would flap.
+device_registry = DeviceRegistry(
+    offline_timeout=max(settings.device_offline_timeout, 3 * settings.sensor_update_interval)
+)
+
+# Takes discovered devices through syncing to online, one task per device
+onboarding = DeviceOnboarding(
+    async_session_maker,
+    event_bus.publish,
+    sync_seconds=settings.device_sync_seconds,
+    registry=device_registry,
+)
+
+# Records every generated reading and discovery event for later replay
+trace_writer = (
+    TraceWriter(settings.trace_record_path) if settings.trace_record_path else None
+)
+
+# Rolling stats, energy counters, alerts, the setpoint optimizer and the load
+# shedder live in their service modules so the API reads them without
+# importing this one.
+
+# Hourly and daily kWh per zone and building-wide, integrated from power_kw.
+# Like device timeouts, the longest gap still integrated spans three ticks.
+energy_meter.configure(
+    max_gap=max(settings.energy_max_gap, 3 * settings.sensor_update_interval)
+)
+
+# Threshold alerts over the latest readings and forecasts, evaluated per tick
+if settings.alert_rules_path:
+    alert_engine.compile(load_rules(settings.alert_rules_path))
+
+# Setpoints applied to adaptive zones, traded between comfort and power
+setpoint_optimizer.configure(
+    max_offset=settings.adaptive_max_offset,
+    comfort_band=settings.adaptive_comfort_band,
+    energy_weight=settings.adaptive_energy_weight,
+    horizon_minutes=settings.prediction_horizon_minutes,
+    budget=settings.adaptive_budget_ms / 1000,
+)
+
+# Sheds low-priority work when ticks fall behind
+load_shedder.configure(
+    enabled=settings.load_shedding_enabled,
+    recovery_ticks=settings.shed_recovery_ticks,
+)
+
+
+async def seed_initial_data():
+    """Seed initial zones and devices if database is empty."""
+    async with async_session_maker() as db:
+        # Check if zones exist
+        result = await db.execute(select(Zone))
+        zones = result.scalars().all()
+
+        if not zones:
+            # Create zones
+            server_room = Zone(
+                id="server-room",
+                name="Server Room",
+                setpoint=18.0,
+                adaptive_mode=True,
+            )
+            open_office = Zone(
+                id="open-office",
+                name="Open Office",
+                setpoint=23.0,
+                adaptive_mode=True,
+            )
+            db.add(server_room)
+            db.add(open_office)
+            await db.commit()
+
+            # Create initial devices
+            devices = [
+                Device(
+                    id="fcu-sr-01",
+                    name="FCU Server Room 1",
+                    type="fcu",
+                    zone_id="server-room",
+                    status="online",
+                    last_seen=datetime.now(),
+                ),
+                Device(
+                    id="sensor-sr-01",
+                    name="Temp/Humidity Sensor SR",
+                    type="sensor",
+                    zone_id="server-room",
+                    status="online",
+                    last_seen=datetime.now(),
+                ),
+                Device(
+                    id="fcu-of-01",
+                    name="FCU Open Office 1",
+                    type="fcu",
+                    zone_id="open-office",
+                    status="online",
+                    last_seen=datetime.now(),
+                ),
+                Device(
+                    id="sensor-of-01",
+                    name="Multi Sensor Office",
+                    type="sensor",
+                    zone_id="open-office",
+                    status="online",
+                    last_seen=datetime.now(),
+                ),
+            ]
+
+            for device in devices:
+                db.add(device)
+
+            await db.commit()
+            print("Database seeded with initial zones and devices")
+
+
+async def sensor_data_loop():
+    """Background task to generate and broadcast sensor data."""
+    await sensor_scheduler.run(run_sensor_tick)
+
+
+async def run_sensor_tick(tick_start: float):
+    """Run one scheduled tick, keeping the loop alive on errors."""
+    try:
+        with TICK_DURATION.time(), query_profiler.profile("tick", "sensor_tick"):
+            await sensor_tick(tick_start)
+    except Exception as e:
+        BACKGROUND_EXCEPTIONS.inc(loop="sensor_data")
+        print(f"Error in sensor data loop: {e}")
+
+
+async def sensor_tick(tick_start: float):
+    """Fan each zone's pipeline out as an independent task for this tick."""
+    if sim_clock is not None:
+        sim_clock.advance()
+
+    async with async_session_maker() as db:
+        # Get all zones with their setpoints, in a stable order
+        result = await db.execute(
+            select(Zone.id, Zone.setpoint, Zone.adaptive_mode).order_by(Zone.id)
+        )
+        zones = result.all()
+
+    load_shedder.update(
+        lag=sensor_scheduler.last_lag,
+        interval=sensor_scheduler.interval,
+        overruns=sensor_scheduler.overruns,
+        backlog=len(zones_in_flight),
+        zone_count=len(zones),
+    )
+    alert_engine.set_setpoints((zone_id, setpoint) for zone_id, setpoint, _ in zones)
+
+    try:
+        # Adaptive zones run at the optimizer's setpoints instead of their targets
+        setpoints = setpoint_optimizer.optimize(zones)
+        for event in setpoint_optimizer.changes(clock()):
+            await event_bus.publish(event)
+
+        if sharded_simulator is not None:
+            await sharded_tick(setpoints)
+            return
+
+        # Every backend produces the whole tick's readings in one batch
+        readings = reading_source.generate_batch(setpoints)
+        if trace_writer is not None:
+            trace_writer.write_tick(clock(), readings)
+        if replaying:
+            replay_events()
+
+        offsets = sensor_scheduler.phase_offsets(len(zones))
+        tasks = []
+        for (zone_id, _), offset in zip(setpoints, offsets):
+            if zone_id not in readings:
+                # Replayed traces only cover the zones they were recorded with
+                continue
+            # A zone still busy with an earlier tick is not started twice
+            if zone_id in zones_in_flight:
+                ZONES_SKIPPED.inc(reason="in_flight")
+                continue
+            zones_in_flight.add(zone_id)
+            tasks.append(
+                asyncio.create_task(
+                    run_zone_pipeline(zone_id, readings[zone_id], tick_start + offset)
+                )
+            )
+
+        if not tasks:
+            return
+
+        # Finish the tick inside its slot; stragglers keep running and
+        # their zones are skipped next tick until they complete.
+        pending = await sensor_scheduler.wait_for(tasks, tick_start)
+        if pending:
+            ZONE_PIPELINES_LATE.inc(len(pending))
+    finally:
+        # The rules advance every tick, also when no zone pipeline could
+        # start; zones without a new reading hold their alert state
+        await evaluate_alerts()
+
+
+async def sharded_tick(zones):
+    """
+    Simulate all zones across the shard processes, then persist the whole
+    batch in one transaction and broadcast it.
+    """
+    compute_predictions = load_shedder.compute_predictions
+    batch = await sharded_simulator.step(
+        [(zone_id, setpoint) for zone_id, setpoint in zones],
+        compute_predictions=compute_predictions,
+        now=clock(),
+    )
+    if trace_writer is not None:
+        trace_writer.write_tick(
+            clock(),
+            {zone_id: batch.reading(i) for i, zone_id in enumerate(batch.zone_ids)},
+        )
+    if not compute_predictions:
+        load_shedder.record_shed("prediction")
+
+    async with async_session_maker() as db:
+        now = datetime.now()
+        readings, predictions, messages = [], [], []
+        for index, zone_id in enumerate(batch.zone_ids):
+            sensor_id = device_registry.sensor_for_zone(zone_id)
+            if sensor_id is None:
+                continue
+            reading_data = batch.reading(index)
+            readings.append({"device_id": sensor_id, "zone_id": zone_id, **reading_data})
+            device_registry.heartbeat([sensor_id], now)
+            rolling_stats.add(zone_id, reading_data, now)
+            energy_meter.add(zone_id, reading_data.get("power_kw"), now)
+            alert_engine.observe(zone_id, reading_data)
+            setpoint_optimizer.observe(zone_id, reading_data)
+            messages.append(reading_message(zone_id, sensor_id, reading_data, now))
+
+            prediction = batch.prediction(index)
+            if prediction is None:
+                continue
+            current_temp, predicted_temp, confidence, trend = prediction
+            alert_engine.observe_prediction(zone_id, predicted_temp)
+            setpoint_optimizer.observe_prediction(zone_id, predicted_temp)
+            predictions.append(
+                {
+                    "zone_id": zone_id,
+                    "current_temp": current_temp,
+                    "predicted_temp": predicted_temp,
+                    "confidence": confidence,
+                    "trend": trend,
+                }
+            )
+
+        if readings:
+            await db.execute(insert(SensorReading), readings)
+        if predictions:
+            if load_shedder.persist_predictions:
+                await db.execute(insert(Prediction), predictions)
+            else:
+                load_shedder.record_shed("prediction_persist")
+        await db.commit()
+
+    if load_shedder.broadcast_readings:
+        for message in messages:
+            await event_bus.publish(message)
+    elif messages:
+        load_shedder.record_shed("reading_broadcast")
+
+    timestamp = now.isoformat()
+    for prediction in predictions:
+        await event_bus.publish(
+            {"type": "prediction", **prediction, "timestamp": timestamp}
+        )
+
+
+async def evaluate_alerts():
+    """Run the alert rules over this tick's state and broadcast transitions."""
+    for alert in alert_engine.evaluate():
+        await event_bus.publish(alert)
+
+
+def reading_message(zone_id: str, sensor_id: str, reading_data: dict, now: datetime) -> dict:
+    """The `reading` event, with rolling stats attached if configured."""
+    message = {
+        "type": "reading",
+        "zone_id": zone_id,
+        "device_id": sensor_id,
+        "data": reading_data,
+        "timestamp": now.isoformat(),
+    }
+    if settings.websocket_stats_window:
+        message["stats"] = rolling_stats.window_stats(zone_id, settings.websocket_stats_window)
+    return message
+
+
+def replay_events():
+    """Feed the discovery events recorded with this tick back through the handler."""
+    for event in reading_source.take_events():
+        asyncio.create_task(device_discovery_callback(event))
+    if reading_source.finished:
+        print(f"Trace replay finished after {reading_source.ticks_replayed} ticks")
+        sensor_scheduler.stop()
+
+
+async def run_zone_pipeline(zone_id: str, reading_data: dict, start_at: float):
+    """Run one zone's pipeline in its phase slot with its own session."""
+    try:
+        await sensor_scheduler.wait_until(start_at)
+        async with zone_semaphore:
+            with ZONE_PIPELINE_DURATION.time():
+                async with async_session_maker() as db:
+                    await process_zone(db, zone_id, reading_data)
+    except Exception as e:
+        BACKGROUND_EXCEPTIONS.inc(loop="zone_pipeline")
+        print(f"Error processing zone {zone_id}: {e}")
+    finally:
+        zones_in_flight.discard(zone_id)
+
+
+async def process_zone(db, zone_id: str, reading_data: dict):
+    """Persist and broadcast one reading and prediction for a zone."""
+    # Get sensor device for this zone
+    sensor_id = device_registry.sensor_for_zone(zone_id)
+
+    if sensor_id:
+        # Save reading to database
+        reading = SensorReading(
+            device_id=sensor_id,
+            zone_id=zone_id,
+            temperature=reading_data.get("temperature"),
+            humidity=reading_data.get("humidity"),
+            co2_level=reading_data.get("co2_level"),
+            power_kw=reading_data.get("power_kw"),
+            occupancy=reading_data.get("occupancy"),
+        )
+        db.add(reading)
+        await db.commit()
+
+        # The reporting sensor is alive; flushed to the DB in batches
+        now = datetime.now()
+        device_registry.heartbeat([sensor_id], now)
+        rolling_stats.add(zone_id, reading_data, now)
+        energy_meter.add(zone_id, reading_data.get("power_kw"), now)
+        alert_engine.observe(zone_id, reading_data)
+        setpoint_optimizer.observe(zone_id, reading_data)
+
+        # Broadcast to WebSocket clients
+        if load_shedder.broadcast_readings:
+            await event_bus.publish(reading_message(zone_id, sensor_id, reading_data, now))
+        else:
+            load_shedder.record_shed("reading_broadcast")
+
+        # Generate and broadcast prediction
+        if load_shedder.compute_predictions:
+            await generate_and_broadcast_prediction(
+                db, zone_id, persist=load_shedder.persist_predictions
+            )
+        else:
+            load_shedder.record_shed("prediction")
+
+
+async def generate_and_broadcast_prediction(db, zone_id: str, persist: bool = True):
+    """Generate prediction and broadcast to clients."""
+    from datetime import timedelta
+
+    # Get recent readings
+    cutoff = datetime.now() - timedelta(minutes=5)
+    readings_query = (
+        select(SensorReading)
+        .where(SensorReading.zone_id == zone_id)
+        .where(SensorReading.timestamp >= cutoff)
+        .where(SensorReading.temperature.isnot(None))
+        .order_by(SensorReading.timestamp)
+    )
+
+    result = await db.execute(readings_query)
+    readings = result.scalars().all()
+
+    temps = [r.temperature for r in readings if r.temperature is not None]
+
+    if temps:
+        current_temp = temps[-1]
+        with PREDICTION_DURATION.time():
+            predicted_temp, confidence, trend = prediction_engine.predict(temps)
+        alert_engine.observe_prediction(zone_id, predicted_temp)
+        setpoint_optimizer.observe_prediction(zone_id, predicted_temp)
+
+        # Save prediction
+        if persist:
+            prediction = Prediction(
+                zone_id=zone_id,
+                current_temp=current_temp,
+                predicted_temp=predicted_temp,
+                confidence=confidence,
+                trend=trend,
+            )
+            db.add(prediction)
+            await db.commit()
+        else:
+            load_shedder.record_shed("prediction_persist")
+
+        # Broadcast prediction
+        await event_bus.publish(
+            {
+                "type": "prediction",
+                "zone_id": zone_id,
+                "current_temp": current_temp,
+                "predicted_temp": predicted_temp,
+                "confidence": confidence,
+                "trend": trend,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
+
+
+async def record_discovery_event(event: dict):
+    """Append a discovery event to the trace, then handle it as usual."""
+    trace_writer.write_event(event)
+    await device_discovery_callback(event)
+
+
+async def device_discovery_callback(event: dict):
+    """Hand discovery events to the onboarding pipeline without waiting on them."""
+    if event["type"] == "device_discovered":
+        onboarding.discover(event)
+    elif event["type"] == "device_status_change":
+        onboarding.change_status(event)
+
+
+async def start_background_tasks():
+    """Start all background tasks."""
+    global background_tasks_running, energy_task
+    background_tasks_running = True
+
+    # Device lookups and heartbeats are served from memory
+    await device_registry.load(async_session_maker)
+    asyncio.create_task(
+        device_registry.run(
+            async_session_maker,
+            event_bus.publish,
+            flush_interval=settings.heartbeat_flush_interval,
+            resync_interval=settings.device_resync_interval,
+        )
+    )
+
+    energy_task = asyncio.create_task(
+        energy_meter.run(async_session_maker, flush_interval=settings.energy_flush_interval)
+    )
+
+    # Start sensor data generation
+    if sharded_simulator is not None:
+        await sharded_simulator.start()
+    asyncio.create_task(sensor_data_loop())
+
+    # Start device discovery simulation; replays carry their own events
+    if not replaying:
+        callback = (
+            record_discovery_event if trace_writer is not None else device_discovery_callback
+        )
+        asyncio.create_task(
+            discovery.start_discovery_loop(callback, settings.discovery_check_interval)
+        )
+
+
+async def stop_background_tasks():
+    """Stop all background tasks."""
+    global background_tasks_running
+    background_tasks_running = False
+    sensor_scheduler.stop()
+    discovery.stop()
+    await onboarding.stop()
+    device_registry.stop()
+    await device_registry.flush(async_session_maker)
+    energy_meter.stop()
+    if energy_task is not None:
+        energy_task.cancel()
+        # A flush interrupted here puts its increments back for the last one
+        await asyncio.gather(energy_task, return_exceptions=True)
+    await energy_meter.flush(async_session_maker)
+    if sharded_simulator is not None:
+        await sharded_simulator.stop()
+    if trace_writer is not None:
+        trace_writer.close()
+
+
+async def serve_metrics(host: str, port: int) -> asyncio.AbstractServer:
+    """Minimal HTTP responder exposing this process's metrics at any path."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            # Drain the request headers; the path is ignored
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            body = metrics.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def run_standalone():
+    """Run the simulation engine without the API server."""
+    await init_db()
+    await asyncio.gather(warm_up_pool(), seed_initial_data())
+
+    bus_server = EventBusServer(
+        event_bus,
+        host=settings.event_bus_host,
+        port=settings.event_bus_port,
+        snapshot=lambda: alert_engine.snapshot() + setpoint_optimizer.snapshot(),
+    )
+    await bus_server.start()
+    metrics_server = None
+    if settings.simulator_metrics_port:
+        metrics_server = await serve_metrics(
+            settings.event_bus_host, settings.simulator_metrics_port
+        )
+
+    await start_background_tasks()
+    print("Smart FCU simulation engine started")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+    await stop.wait()
+
+    await stop_background_tasks()
+    await bus_server.stop()
+    if metrics_server is not None:
+        metrics_server.close()
+    print("Smart FCU simulation engine stopped")
+
+
+def main():
+    asyncio.run(run_standalone())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is the fallback
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode plain dicts/lists/scalars to JSON bytes. Datetimes are written as
+    ISO 8601, the same as Pydantic, so responses match the declared schemas.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), default=_default).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response for content that is already plain data (no model validation)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
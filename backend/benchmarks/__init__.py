@@ -0,0 +1 @@
+# Performance benchmarks for the Smart FCU backend
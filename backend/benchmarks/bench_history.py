@@ -0,0 +1,133 @@
+"""
+History endpoint serialization: ORM entities + Pydantic models versus the
+column-tuple fast path, against a temporary SQLite database.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_history [--quick]
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models import Device, SensorReading, Zone
+from app.routers.sensors import get_zone_sensor_history
+from app.schemas import SensorDataPoint, ZoneSensorHistory
+from benchmarks.harness import measure_async, parse_args, save_results
+
+ROW_COUNTS = [10_000, 100_000]
+ZONE_ID = "open-office"
+
+
+async def seed(database_url: str, rows: int):
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    rng = random.Random(rows)
+    # Spread over the last day so the 1440-minute window covers every row
+    start = datetime.now() - timedelta(hours=23)
+    step = timedelta(hours=22) / rows
+    async with session_maker() as db:
+        db.add(Zone(id=ZONE_ID, name="Open Office", setpoint=23.0))
+        db.add(Device(id="sensor-of-01", name="Sensor", type="sensor", zone_id=ZONE_ID))
+        await db.flush()
+        await db.execute(
+            insert(SensorReading),
+            [
+                {
+                    "device_id": "sensor-of-01",
+                    "zone_id": ZONE_ID,
+                    "timestamp": start + step * i,
+                    "temperature": round(rng.uniform(18, 26), 2),
+                    "humidity": round(rng.uniform(40, 60), 1),
+                    "co2_level": round(rng.uniform(400, 900), 0),
+                    "power_kw": round(rng.uniform(1, 3), 2),
+                    "occupancy": rng.randint(0, 25),
+                }
+                for i in range(rows)
+            ],
+        )
+        await db.commit()
+    await engine.dispose()
+
+
+async def orm_history(session_maker) -> bytes:
+    """The previous implementation: entities, then models, then JSON."""
+    async with session_maker() as db:
+        cutoff = datetime.now() - timedelta(minutes=1440)
+        result = await db.execute(
+            select(SensorReading)
+            .where(SensorReading.zone_id == ZONE_ID)
+            .where(SensorReading.timestamp >= cutoff)
+            .order_by(SensorReading.timestamp)
+        )
+        readings = result.scalars().all()
+        history = ZoneSensorHistory(
+            zone_id=ZONE_ID,
+            readings=[
+                SensorDataPoint(
+                    timestamp=r.timestamp,
+                    temperature=r.temperature,
+                    humidity=r.humidity,
+                    co2_level=r.co2_level,
+                    power_kw=r.power_kw,
+                    occupancy=r.occupancy,
+                )
+                for r in readings
+            ],
+        )
+        return history.model_dump_json().encode()
+
+
+async def fast_history(session_maker) -> bytes:
+    async with session_maker() as db:
+        response = await get_zone_sensor_history(ZONE_ID, minutes=1440, db=db)
+        return response.body
+
+
+def bench_history(results: Dict[str, Dict], repeat: int, sizes: List[int]):
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+            asyncio.run(seed(database_url, rows))
+
+            # NullPool: measure_async runs each suite on its own event loop
+            engine = create_async_engine(database_url, poolclass=NullPool)
+            session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+            results[f"history_orm_pydantic[n={rows}]"] = measure_async(
+                lambda: orm_history(session_maker), repeat=repeat, min_time=0.5
+            )
+            results[f"history_fast_path[n={rows}]"] = measure_async(
+                lambda: fast_history(session_maker), repeat=repeat, min_time=0.5
+            )
+
+            orm = results[f"history_orm_pydantic[n={rows}]"]["median"]
+            fast = results[f"history_fast_path[n={rows}]"]["median"]
+            print(f"n={rows}: fast path {orm / fast:.2f}x faster ({orm * 1e3:.1f} -> {fast * 1e3:.1f} ms)")
+
+
+def main():
+    args = parse_args(__doc__)
+    repeat = 3 if args.quick else 5
+    sizes = ROW_COUNTS[:1] if args.quick else ROW_COUNTS
+
+    results: Dict[str, Dict] = {}
+    bench_history(results, repeat, sizes)
+
+    save_results("history", results, args.output, args.compare)
+
+
+if __name__ == "__main__":
+    main()
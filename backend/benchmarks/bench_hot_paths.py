@@ -0,0 +1,138 @@
+"""
+Micro-benchmarks for the simulator, predictor and serialization hot paths.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_hot_paths [--quick]
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from app.routers.websocket import ConnectionManager
+from app.schemas import SensorDataPoint, ZoneSensorHistory
+from app.services import MockDataGenerator, PredictionEngine
+from benchmarks.harness import measure, measure_async, parse_args, save_results
+
+# Readings per prediction window (5s interval: 1 min, 5 min, 30 min, 2 h)
+WINDOW_SIZES = [12, 60, 360, 1440]
+HISTORY_SIZES = [1_000, 10_000, 100_000]
+SOCKET_COUNTS = [1, 10, 100, 1000]
+
+
+class FakeWebSocket:
+    """In-process stand-in for a WebSocket that encodes like Starlette does."""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send_json(self, data: Any):
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        self.bytes_sent += len(text)
+
+
+def _temperature_window(size: int) -> List[float]:
+    rng = random.Random(size)
+    temp = 22.0
+    window = []
+    for _ in range(size):
+        temp += rng.gauss(0, 0.1)
+        window.append(round(temp, 2))
+    return window
+
+
+def _history(size: int) -> List[Dict[str, Any]]:
+    rng = random.Random(size)
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "timestamp": start + timedelta(seconds=5 * i),
+            "temperature": round(rng.uniform(18, 26), 2),
+            "humidity": round(rng.uniform(40, 60), 1),
+            "co2_level": round(rng.uniform(400, 900), 0),
+            "power_kw": round(rng.uniform(1, 3), 2),
+            "occupancy": rng.randint(0, 25),
+        }
+        for i in range(size)
+    ]
+
+
+def bench_simulator(results: Dict[str, Dict], repeat: int):
+    generator = MockDataGenerator()
+    for zone_id, setpoint in (("server-room", 18.0), ("open-office", 23.0)):
+        results[f"generate_reading[{zone_id}]"] = measure(
+            lambda: generator.generate_reading(zone_id, setpoint), repeat=repeat
+        )
+
+
+def bench_predictor(results: Dict[str, Dict], repeat: int):
+    engine = PredictionEngine()
+    for size in WINDOW_SIZES:
+        temps = _temperature_window(size)
+        start = datetime(2025, 1, 1)
+        timestamps = [start + timedelta(seconds=5 * i) for i in range(size)]
+        results[f"predict[n={size}]"] = measure(
+            lambda: engine.predict(temps), repeat=repeat
+        )
+        results[f"get_prediction_series[n={size}]"] = measure(
+            lambda: engine.get_prediction_series(temps, timestamps), repeat=repeat
+        )
+
+
+def bench_serialization(results: Dict[str, Dict], repeat: int, sizes: List[int]):
+    for size in sizes:
+        rows = _history(size)
+
+        def build():
+            return ZoneSensorHistory(
+                zone_id="open-office",
+                readings=[SensorDataPoint(**row) for row in rows],
+            )
+
+        history = build()
+        results[f"history_build[n={size}]"] = measure(build, repeat=repeat)
+        results[f"history_dump_json[n={size}]"] = measure(
+            history.model_dump_json, repeat=repeat
+        )
+
+
+def bench_broadcast(results: Dict[str, Dict], repeat: int):
+    message = {
+        "type": "reading",
+        "zone_id": "open-office",
+        "device_id": "sensor-of-01",
+        "data": {
+            "temperature": 23.41,
+            "humidity": 54.2,
+            "power_kw": 1.62,
+            "co2_level": 812.0,
+            "occupancy": 17,
+        },
+        "timestamp": datetime(2025, 1, 1).isoformat(),
+    }
+    for count in SOCKET_COUNTS:
+        manager = ConnectionManager()
+        manager.active_connections = [FakeWebSocket() for _ in range(count)]
+        results[f"broadcast[sockets={count}]"] = measure_async(
+            lambda: manager.broadcast(message), repeat=repeat
+        )
+
+
+def main():
+    args = parse_args(__doc__)
+    repeat = 3 if args.quick else 7
+    sizes = HISTORY_SIZES[:2] if args.quick else HISTORY_SIZES
+
+    results: Dict[str, Dict] = {}
+    bench_simulator(results, repeat)
+    bench_predictor(results, repeat)
+    bench_serialization(results, repeat, sizes)
+    bench_broadcast(results, repeat)
+
+    save_results("hot_paths", results, args.output, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Minimal benchmark harness shared by the benchmark suites.
+
+Each suite collects named timings with `measure` / `measure_async` and hands
+them to `save_results`, which writes a timestamped JSON file under
+`benchmarks/results/` and compares it against the most recent previous run
+of the same suite so regressions are visible between runs.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Relative slowdown (median) reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+
+def _autorange(run_batch: Callable[[int], float], min_time: float) -> int:
+    """Find a call count whose batch takes at least `min_time` seconds."""
+    number = 1
+    while True:
+        elapsed = run_batch(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            return number
+        number *= 10 if elapsed < min_time / 10 else 2
+
+
+def _summarize(batch_times: list, number: int) -> Dict[str, Any]:
+    per_call = [t / number for t in batch_times]
+    return {
+        "number": number,
+        "repeat": len(batch_times),
+        "min": min(per_call),
+        "median": statistics.median(per_call),
+        "mean": statistics.fmean(per_call),
+        "stdev": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+    }
+
+
+def measure(
+    fn: Callable[[], Any],
+    number: Optional[int] = None,
+    repeat: int = 5,
+    min_time: float = 0.2,
+) -> Dict[str, Any]:
+    """Time a synchronous callable. All reported times are seconds per call."""
+
+    def run_batch(n: int) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return time.perf_counter() - start
+
+    if number is None:
+        number = _autorange(run_batch, min_time)
+    return _summarize([run_batch(number) for _ in range(repeat)], number)
+
+
+def measure_async(
+    fn: Callable[[], Awaitable[Any]],
+    number: Optional[int] = None,
+    repeat: int = 5,
+    min_time: float = 0.2,
+) -> Dict[str, Any]:
+    """Time a coroutine function on a dedicated event loop."""
+    loop = asyncio.new_event_loop()
+
+    async def batch(n: int) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            await fn()
+        return time.perf_counter() - start
+
+    def run_batch(n: int) -> float:
+        return loop.run_until_complete(batch(n))
+
+    try:
+        if number is None:
+            number = _autorange(run_batch, min_time)
+        return _summarize([run_batch(number) for _ in range(repeat)], number)
+    finally:
+        loop.close()
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def _latest_result(results_dir: Path, suite: str, exclude: Path) -> Optional[Path]:
+    previous = sorted(
+        p for p in results_dir.glob(f"{suite}-*.json") if p != exclude
+    )
+    return previous[-1] if previous else None
+
+
+def save_results(
+    suite: str,
+    results: Dict[str, Dict[str, Any]],
+    output_dir: Optional[Path] = None,
+    compare_to: Optional[Path] = None,
+) -> Path:
+    """Write results as JSON and print a comparison with the previous run."""
+    results_dir = output_dir or RESULTS_DIR
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = results_dir / f"{suite}-{stamp}.json"
+    payload = {
+        "suite": suite,
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+
+    baseline_path = compare_to or _latest_result(results_dir, suite, exclude=path)
+    baseline = {}
+    if baseline_path and baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text()).get("results", {})
+
+    print(f"\n{suite} ({path.name})")
+    width = max(len(name) for name in results) if results else 0
+    regressions = 0
+    for name, stats in results.items():
+        line = f"  {name:<{width}}  median {_format_time(stats['median']):>12}"
+        previous = baseline.get(name)
+        if previous and previous.get("median"):
+            change = stats["median"] / previous["median"] - 1
+            line += f"  ({change:+.1%} vs {baseline_path.name})"
+            if change > REGRESSION_THRESHOLD:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+
+    if regressions:
+        print(f"\n{regressions} benchmark(s) slower than the previous run")
+    return path
+
+
+def parse_args(description: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Fewer repeats and smaller sizes, for a fast sanity check",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Directory for JSON results (default: benchmarks/results)",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        default=None,
+        help="Result file to compare against (default: latest previous run)",
+    )
+    return parser.parse_args()
@@ -0,0 +1,349 @@
+"""
+End-to-end load harness: N zones x M WebSocket clients x K HTTP pollers.
+
+Seeds a temporary SQLite database with an arbitrary number of zones and
+devices, boots the API with uvicorn in a subprocess on localhost, then
+drives it with WebSocket subscribers on /ws/sensors and HTTP pollers on the
+history / latest / prediction endpoints. Run from the backend directory:
+
+    python -m benchmarks.load_test --zones 200 --ws-clients 50 --pollers 20
+
+Reported numbers:
+- tick period: time between consecutive readings of the same zone
+- tick spread: first to last zone broadcast within one tick
+- reading latency: broadcast timestamp to receipt by a WebSocket client
+- request latency: per-endpoint HTTP round trip, plus error counts
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Summarize a latency sample in milliseconds."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "p50": pct(50),
+        "p90": pct(90),
+        "p99": pct(99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def zone_ids(count: int) -> List[str]:
+    return [f"zone-{i:04d}" for i in range(count)]
+
+
+async def seed_database(database_url: str, zones: int, devices_per_zone: int):
+    """Create the schema and populate zones with one sensor plus FCUs."""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    from app.database import Base
+    from app.models import Zone, Device
+
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as db:
+        for index, zone_id in enumerate(zone_ids(zones)):
+            db.add(
+                Zone(
+                    id=zone_id,
+                    name=f"Zone {index}",
+                    setpoint=random.uniform(19.0, 24.0),
+                    adaptive_mode=True,
+                )
+            )
+            for device_index in range(devices_per_zone):
+                device_type = "sensor" if device_index == 0 else "fcu"
+                db.add(
+                    Device(
+                        id=f"{device_type}-{zone_id}-{device_index:02d}",
+                        name=f"{device_type.upper()} {zone_id} {device_index}",
+                        type=device_type,
+                        zone_id=zone_id,
+                        status="online",
+                        last_seen=datetime.now(),
+                    )
+                )
+        await db.commit()
+    await engine.dispose()
+
+
+class LoadStats:
+    """Samples collected by all clients during a run."""
+
+    def __init__(self):
+        self.reading_latency: List[float] = []
+        self.tick_period: List[float] = []
+        self.tick_spread: List[float] = []
+        self.request_latency: Dict[str, List[float]] = defaultdict(list)
+        self.request_errors: Dict[str, int] = defaultdict(int)
+        self.messages: Dict[str, int] = defaultdict(int)
+        self.ws_failures = 0
+
+
+async def websocket_client(url: str, stats: LoadStats, stop: asyncio.Event, track_ticks: bool):
+    import websockets
+
+    last_seen: Dict[str, float] = {}
+    tick_zones: set = set()
+    tick_start: Optional[float] = None
+    tick_last = 0.0
+
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            while not stop.is_set():
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                received = time.time()
+                message = json.loads(raw)
+                kind = message.get("type", "unknown")
+                stats.messages[kind] += 1
+                if kind != "reading":
+                    continue
+
+                sent = datetime.fromisoformat(message["timestamp"]).timestamp()
+                stats.reading_latency.append(received - sent)
+
+                if not track_ticks:
+                    continue
+                zone_id = message["zone_id"]
+                if zone_id in last_seen:
+                    stats.tick_period.append(received - last_seen[zone_id])
+                last_seen[zone_id] = received
+
+                # A zone repeating marks the start of the next tick
+                if zone_id in tick_zones:
+                    stats.tick_spread.append(tick_last - tick_start)
+                    tick_zones.clear()
+                    tick_start = None
+                if tick_start is None:
+                    tick_start = received
+                tick_zones.add(zone_id)
+                tick_last = received
+    except Exception as e:
+        if not stop.is_set():
+            stats.ws_failures += 1
+            print(f"WebSocket client failed: {e}")
+
+
+async def http_poller(base_url: str, zones: List[str], stats: LoadStats, stop: asyncio.Event):
+    import httpx
+
+    endpoints = {
+        "history": "/api/sensors/zones/{zone}/history?minutes=60",
+        "latest": "/api/sensors/zones/{zone}/latest",
+        "prediction": "/api/predictions/{zone}",
+    }
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        while not stop.is_set():
+            name, template = random.choice(list(endpoints.items()))
+            path = template.format(zone=random.choice(zones))
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                elapsed = time.perf_counter() - start
+                # latest returns 404 until the zone's first reading lands
+                if response.status_code >= 500:
+                    stats.request_errors[name] += 1
+                else:
+                    stats.request_latency[name].append(elapsed)
+            except httpx.HTTPError:
+                stats.request_errors[name] += 1
+
+
+async def wait_for_health(base_url: str, process: subprocess.Popen, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError("API process exited during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("API did not become healthy in time")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run the load test against an API on a scratch database, removed afterwards."""
+    with tempfile.TemporaryDirectory(prefix="fcu-load-") as workdir:
+        return await run_in(args, Path(workdir))
+
+
+async def run_in(args: argparse.Namespace, workdir: Path) -> dict:
+    database_url = f"sqlite+aiosqlite:///{workdir / 'load.db'}"
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    env = dict(os.environ)
+    env.update(
+        {
+            "DATABASE_URL": database_url,
+            "ENVIRONMENT": "loadtest",
+            "SENSOR_UPDATE_INTERVAL": str(args.interval),
+            "DISCOVERY_CHECK_INTERVAL": str(args.discovery_interval),
+        }
+    )
+
+    await seed_database(database_url, args.zones, args.devices_per_zone)
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+    stats = LoadStats()
+    stop = asyncio.Event()
+    try:
+        await wait_for_health(base_url, process)
+
+        zones = zone_ids(args.zones)
+        ws_url = f"ws://127.0.0.1:{port}/ws/sensors"
+        tasks = [
+            asyncio.create_task(websocket_client(ws_url, stats, stop, track_ticks=i == 0))
+            for i in range(args.ws_clients)
+        ]
+        tasks += [
+            asyncio.create_task(http_poller(base_url, zones, stats, stop))
+            for _ in range(args.pollers)
+        ]
+
+        print(
+            f"Running {args.zones} zones, {args.ws_clients} WebSocket clients, "
+            f"{args.pollers} pollers for {args.duration:.0f}s on {base_url}"
+        )
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {
+        "config": {
+            "zones": args.zones,
+            "devices_per_zone": args.devices_per_zone,
+            "ws_clients": args.ws_clients,
+            "pollers": args.pollers,
+            "duration_s": args.duration,
+            "interval_s": args.interval,
+        },
+        "tick_period_ms": percentiles(stats.tick_period),
+        "tick_spread_ms": percentiles(stats.tick_spread),
+        "reading_latency_ms": percentiles(stats.reading_latency),
+        "request_latency_ms": {
+            name: percentiles(values) for name, values in stats.request_latency.items()
+        },
+        "request_errors": dict(stats.request_errors),
+        "messages_received": dict(stats.messages),
+        "websocket_failures": stats.ws_failures,
+    }
+
+
+def _print_report(report: dict):
+    def line(label: str, summary: dict):
+        if not summary.get("count"):
+            print(f"  {label:<24} no samples")
+            return
+        print(
+            f"  {label:<24} n={summary['count']:<7} p50={summary['p50']:>9.1f}ms "
+            f"p90={summary['p90']:>9.1f}ms p99={summary['p99']:>9.1f}ms "
+            f"max={summary['max']:>9.1f}ms"
+        )
+
+    print("\nResults")
+    line("tick period", report["tick_period_ms"])
+    line("tick spread", report["tick_spread_ms"])
+    line("reading latency", report["reading_latency_ms"])
+    for name, summary in sorted(report["request_latency_ms"].items()):
+        line(f"GET {name}", summary)
+    if report["request_errors"]:
+        print(f"  request errors: {report['request_errors']}")
+    if report["websocket_failures"]:
+        print(f"  websocket failures: {report['websocket_failures']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load harness")
+    parser.add_argument("--zones", type=int, default=50)
+    parser.add_argument("--devices-per-zone", type=int, default=2)
+    parser.add_argument("--ws-clients", type=int, default=10)
+    parser.add_argument("--pollers", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument(
+        "--interval", type=float, default=5.0, help="SENSOR_UPDATE_INTERVAL"
+    )
+    parser.add_argument(
+        "--discovery-interval",
+        type=float,
+        default=30.0,
+        help="DISCOVERY_CHECK_INTERVAL",
+    )
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--json", type=Path, default=None, help="Write report here")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    _print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
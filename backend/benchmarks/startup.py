@@ -0,0 +1,144 @@
+"""
+Cold-start budget: import time of the API module, broken down per module,
+and wall time from launching uvicorn to the first healthy /health response.
+
+Each sample runs in a fresh interpreter against an empty temporary SQLite
+database, so the numbers include schema creation and seeding. Run from the
+backend directory:
+
+    python -m benchmarks.startup [--quick]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.harness import parse_args, save_results
+from benchmarks.load_test import _free_port
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules listed in the per-module breakdown
+TOP_MODULES = 15
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "number": 1,
+        "repeat": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def _environment(workdir: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(workdir, 'startup.db')}",
+            "ENVIRONMENT": "benchmark",
+        }
+    )
+    return env
+
+
+def import_times(env: dict) -> Dict[str, float]:
+    """Cumulative import time in seconds per module, from `-X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def time_to_health(env: dict, timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until /health first answers 200."""
+    import httpx
+
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError("API process exited during startup")
+                try:
+                    if client.get("/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError("API did not become healthy in time")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    args = parse_args(__doc__)
+    repeat = 3 if args.quick else 7
+
+    imports: Dict[str, List[float]] = defaultdict(list)
+    health: List[float] = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = _environment(workdir)
+            for name, seconds in import_times(env).items():
+                imports[name].append(seconds)
+            health.append(time_to_health(env))
+
+    medians = {name: statistics.median(samples) for name, samples in imports.items()}
+    print(f"Slowest imports (median cumulative, of {medians['app.main'] * 1e3:.0f} ms total):")
+    for name in sorted(medians, key=medians.get, reverse=True)[:TOP_MODULES]:
+        print(f"  {medians[name] * 1e3:8.1f} ms  {name}")
+    print(f"Time to first /health: {statistics.median(health) * 1e3:.0f} ms (median)")
+
+    results = {"time_to_first_health": _summary(health)}
+    # Track the application's top-level modules, where regressions get introduced
+    for name, samples in imports.items():
+        if name.startswith("app.") and name.count(".") == 1:
+            results[f"import[{name}]"] = _summary(samples)
+
+    save_results("startup", results, args.output, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from app.services.alerts import AlertEngine, AlertRule
+
+CO2 = AlertRule(
+    name="co2_high",
+    metric="co2_level",
+    threshold=1000.0,
+    clear_threshold=900.0,
+    for_ticks=3,
+    clear_ticks=2,
+)
+
+
+def tick(engine: AlertEngine, readings: dict) -> list:
+    """Observe one reading per zone, then evaluate; returns (state, zone) transitions."""
+    for zone_id, reading in readings.items():
+        engine.observe(zone_id, reading)
+    return [(event["state"], event["zone_id"]) for event in engine.evaluate()]
+
+
+def co2(value: float) -> dict:
+    return {"co2_level": value}
+
+
+def test_raises_after_for_ticks_consecutive_breaches():
+    engine = AlertEngine([CO2])
+
+    assert tick(engine, {"z": co2(1200)}) == []
+    assert tick(engine, {"z": co2(1200)}) == []
+    assert tick(engine, {"z": co2(1200)}) == [("raised", "z")]
+    assert [alert["zone_id"] for alert in engine.active()] == ["z"]
+    # Stays raised without repeating the event
+    assert tick(engine, {"z": co2(1200)}) == []
+
+
+def test_interrupted_breach_restarts_the_count():
+    engine = AlertEngine([CO2])
+
+    tick(engine, {"z": co2(1200)})
+    tick(engine, {"z": co2(1200)})
+    tick(engine, {"z": co2(950)})
+    assert tick(engine, {"z": co2(1200)}) == []
+    assert tick(engine, {"z": co2(1200)}) == []
+    assert tick(engine, {"z": co2(1200)}) == [("raised", "z")]
+
+
+def test_hysteresis_band_neither_raises_nor_clears():
+    engine = AlertEngine([CO2])
+    for _ in range(3):
+        tick(engine, {"z": co2(1200)})
+
+    # Below the threshold but above clear_threshold: still active
+    for _ in range(5):
+        assert tick(engine, {"z": co2(950)}) == []
+    assert engine.active()
+
+    assert tick(engine, {"z": co2(850)}) == []
+    assert tick(engine, {"z": co2(850)}) == [("cleared", "z")]
+    assert engine.active() == []
+
+
+def test_missing_values_hold_state_and_counters():
+    engine = AlertEngine([CO2])
+
+    tick(engine, {"z": co2(1200)})
+    tick(engine, {"z": co2(1200)})
+    assert tick(engine, {"z": {}}) == []
+    assert tick(engine, {"z": co2(1200)}) == [("raised", "z")]
+
+
+def test_stale_reading_is_not_counted_again():
+    engine = AlertEngine([CO2])
+    engine.observe("z", co2(1200))
+
+    # No new reading: the zone's pipeline is still running
+    assert [engine.evaluate() for _ in range(3)] == [[], [], []]
+    assert engine.active() == []
+
+
+def test_less_than_rules_and_zone_scope():
+    rule = AlertRule(
+        name="too_cold",
+        metric="temperature",
+        op="<",
+        threshold=16.0,
+        clear_threshold=17.0,
+        zones=["server-room"],
+    )
+    engine = AlertEngine([rule])
+
+    assert tick(engine, {"server-room": {"temperature": 15.0}, "office": {"temperature": 15.0}}) == [
+        ("raised", "server-room")
+    ]
+    assert tick(engine, {"server-room": {"temperature": 16.5}}) == []
+    assert tick(engine, {"server-room": {"temperature": 17.5}}) == [("cleared", "server-room")]
+
+
+def test_deviation_rule_tests_distance_from_setpoint():
+    rule = AlertRule(name="drift", metric="temperature", threshold=2.0, deviation=True)
+    engine = AlertEngine([rule])
+    engine.set_setpoints([("z", 22.0)])
+
+    assert tick(engine, {"z": {"temperature": 23.5}}) == []
+    assert tick(engine, {"z": {"temperature": 19.5}}) == [("raised", "z")]
+
+
+def test_many_zones_grow_the_table():
+    engine = AlertEngine([CO2], capacity=2)
+    readings = {f"z{i}": co2(1200 if i % 2 else 500) for i in range(10)}
+
+    for _ in range(3):
+        events = tick(engine, readings)
+
+    assert sorted(zone for _, zone in events) == [f"z{i}" for i in range(1, 10, 2)]
+
+
+def test_follower_mirrors_active_set_from_events_and_snapshot():
+    engine, follower, late = AlertEngine([CO2]), AlertEngine([CO2]), AlertEngine([CO2])
+    for _ in range(3):
+        for zone_id in ("a", "b"):
+            engine.observe(zone_id, co2(1200))
+        for event in engine.evaluate():
+            asyncio.run(follower.follow(event))
+
+    for event in engine.snapshot():
+        asyncio.run(late.follow(event))
+    assert {a["zone_id"] for a in follower.active()} == {a["zone_id"] for a in late.active()} == {"a", "b"}
+
+    for _ in range(2):
+        engine.observe("a", co2(800))
+        for event in engine.evaluate():
+            asyncio.run(follower.follow(event))
+    assert [a["zone_id"] for a in follower.active()] == ["b"]
+
+
+def test_rule_validation():
+    with pytest.raises(ValueError):
+        AlertRule(name="bad", metric="pressure", threshold=1.0)
+    with pytest.raises(ValueError):
+        AlertRule(name="bad", metric="co2_level", threshold=1000.0, clear_threshold=1100.0)
+    with pytest.raises(ValueError):
+        AlertEngine([CO2, CO2])
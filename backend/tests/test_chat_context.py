@@ -0,0 +1,139 @@
+import asyncio
+
+from app.services.chat_context import ResponseCache, ZoneContext, normalize_prompt
+
+ZONES = [("open-office", "Open Office", 23.0, True), ("server-room", "Server Room", 18.0, False)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def ask(text: str) -> list:
+    return [{"role": "user", "content": text}]
+
+
+def report(context: ZoneContext, zone_id: str, **reading):
+    asyncio.run(context.observe({"type": "reading", "zone_id": zone_id, "data": reading}))
+
+
+def test_normalize_prompt_ignores_case_whitespace_and_edge_punctuation():
+    assert normalize_prompt("  What is  an FCU?\n") == normalize_prompt("what is an fcu")
+
+
+def test_cache_hits_equivalent_prompts_within_one_context_version():
+    cache = ResponseCache()
+    cache.put(ask("What is an FCU?"), "A fan coil unit.", context=3)
+
+    assert cache.get(ask("what is an fcu"), context=3) == "A fan coil unit."
+    assert cache.get(ask("what is an fcu"), context=4) is None
+    assert cache.get(ask("what is a VAV?"), context=3) is None
+
+
+def test_cache_keys_the_whole_conversation():
+    cache = ResponseCache()
+    first = ask("hi") + [{"role": "assistant", "content": "Hello!"}] + ask("and the server room?")
+    cache.put(first, "18 °C", context=1)
+
+    assert cache.get(ask("and the server room?"), context=1) is None
+    assert cache.get(first, context=1) == "18 °C"
+
+
+def test_cache_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=300.0, clock=clock)
+    cache.put(ask("q"), "a")
+
+    clock.now = 300.0
+    assert cache.get(ask("q")) == "a"
+    clock.now = 300.1
+    assert cache.get(ask("q")) is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put(ask("a"), "1")
+    cache.put(ask("b"), "2")
+    cache.get(ask("a"))
+    cache.put(ask("c"), "3")
+
+    assert cache.get(ask("b")) is None
+    assert cache.get(ask("a")) == "1"
+    assert cache.get(ask("c")) == "3"
+
+
+def test_cache_skips_empty_answers_and_can_be_disabled():
+    cache = ResponseCache()
+    cache.put(ask("q"), "")
+    assert cache.get(ask("q")) is None
+
+    disabled = ResponseCache(max_entries=0)
+    disabled.put(ask("q"), "a")
+    assert len(disabled) == 0
+
+
+def test_context_version_survives_reading_noise():
+    context = ZoneContext()
+    report(context, "open-office", temperature=23.0, humidity=50.0, power_kw=1.5)
+    context.update(ZONES)
+    version = context.version
+
+    for temperature, power in ((23.4, 1.9), (22.6, 1.1), (23.2, 2.4)):
+        report(context, "open-office", temperature=temperature, humidity=51.0, power_kw=power)
+        context.update(ZONES)
+        # The summary shows the latest values all the same
+        assert f"{temperature:.1f}°C" in context.summary
+
+    assert context.version == version
+
+
+def test_context_version_moves_when_a_reading_drifts():
+    context = ZoneContext()
+    report(context, "open-office", temperature=23.0)
+    context.update(ZONES)
+    version = context.version
+
+    # Drift is measured from the versioned value, not the previous refresh
+    for temperature in (23.6, 24.2):
+        report(context, "open-office", temperature=temperature)
+        context.update(ZONES)
+
+    assert context.version == version + 1
+
+
+def test_context_version_moves_on_structural_changes():
+    context = ZoneContext()
+    context.update(ZONES)
+    versions = [context.version]
+
+    # A setpoint change
+    context.update([("open-office", "Open Office", 22.0, True), ZONES[1]])
+    versions.append(context.version)
+    # A zone's first reading
+    report(context, "server-room", temperature=18.0)
+    context.update([("open-office", "Open Office", 22.0, True), ZONES[1]])
+    versions.append(context.version)
+    # A zone removed
+    context.update([ZONES[1]])
+    versions.append(context.version)
+    # Nothing changed
+    context.update([ZONES[1]])
+    versions.append(context.version)
+
+    assert versions == [1, 2, 3, 4, 4]
+
+
+def test_deleted_zones_are_forgotten():
+    context = ZoneContext()
+    report(context, "open-office", temperature=23.0)
+    context.update(ZONES)
+
+    context.update([ZONES[1]])
+
+    assert "open-office" not in context.summary
+    assert context._readings == {}
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from app.services.chat_context import ResponseCache
+from app.services.chat_provider import ChatBusyError, ChatGateway, FakeChatProvider
+
+SYSTEM = "You are an HVAC assistant."
+
+
+class CountingProvider(FakeChatProvider):
+    """Fake provider that counts the model calls it serves."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def stream(self, messages, system_prompt):
+        self.calls += 1
+        return super().stream(messages, system_prompt)
+
+
+def ask(text: str) -> list:
+    return [{"role": "user", "content": text}]
+
+
+async def collect(gateway: ChatGateway, messages: list, context: int = 0, pause: float = 0.0):
+    chunks = []
+    async for chunk in gateway.stream(messages, SYSTEM, context):
+        chunks.append(chunk)
+        await asyncio.sleep(pause)
+    return chunks
+
+
+def test_repeat_question_is_served_from_the_cache():
+    provider = CountingProvider()
+    gateway = ChatGateway(provider, cache=ResponseCache())
+
+    async def main():
+        first = await gateway.complete(ask("What is an FCU?"), SYSTEM, context=1)
+        again = await gateway.complete(ask("what is an fcu"), SYSTEM, context=1)
+        streamed = await collect(gateway, ask("What is an FCU?"), context=1)
+        return first, again, streamed
+
+    first, again, streamed = asyncio.run(main())
+
+    assert first == again == "This is a simulated answer to: What is an FCU?"
+    # A cache hit streams the whole answer as one chunk
+    assert streamed == [first]
+    assert provider.calls == 1
+
+
+def test_new_context_version_asks_the_model_again():
+    provider = CountingProvider()
+    gateway = ChatGateway(provider, cache=ResponseCache())
+
+    async def main():
+        await collect(gateway, ask("How warm is it?"), context=1)
+        await collect(gateway, ask("How warm is it?"), context=2)
+        await collect(gateway, ask("How warm is it?"), context=2)
+
+    asyncio.run(main())
+
+    assert provider.calls == 2
+
+
+def test_requests_beyond_the_slots_wait_then_are_rejected():
+    gateway = ChatGateway(FakeChatProvider(latency=0.5), max_concurrency=1, queue_timeout=0.05)
+
+    async def main():
+        busy = asyncio.create_task(gateway.complete(ask("first"), SYSTEM))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ChatBusyError):
+            await gateway.complete(ask("second"), SYSTEM)
+        assert gateway._waiting == 0
+        return await busy
+
+    assert asyncio.run(main()) == "This is a simulated answer to: first"
+
+
+def test_timed_out_call_frees_its_slot_and_is_not_cached():
+    provider = CountingProvider(latency=0.5)
+    gateway = ChatGateway(provider, max_concurrency=1, timeout=0.05, cache=ResponseCache())
+
+    async def main():
+        with pytest.raises(TimeoutError):
+            await gateway.complete(ask("q"), SYSTEM)
+        provider.latency = 0.0
+        return await gateway.complete(ask("q"), SYSTEM)
+
+    assert asyncio.run(main()) == "This is a simulated answer to: q"
+    assert provider.calls == 2
+
+
+def test_stream_timeout_ignores_time_spent_by_the_consumer():
+    provider = FakeChatProvider(token_delay=0.01)
+    gateway = ChatGateway(provider, timeout=0.2)
+
+    # At 0.1 s per chunk the consumer alone runs well past the timeout
+    chunks = asyncio.run(collect(gateway, ask("is the server room ok"), pause=0.1))
+
+    assert "".join(chunks) == "This is a simulated answer to: is the server room ok"
+
+
+def test_stalled_stream_times_out_and_is_not_cached():
+    provider = CountingProvider(token_delay=0.2)
+    gateway = ChatGateway(provider, timeout=0.3, cache=ResponseCache())
+
+    async def main():
+        chunks = []
+        with pytest.raises(TimeoutError):
+            async for chunk in gateway.stream(ask("q"), SYSTEM):
+                chunks.append(chunk)
+        provider.token_delay = 0.0
+        return chunks, await collect(gateway, ask("q"))
+
+    partial, complete = asyncio.run(main())
+
+    assert partial == ["This "]
+    assert "".join(complete) == "This is a simulated answer to: q"
+    assert provider.calls == 2
@@ -0,0 +1,116 @@
+from app.services.device_registry import DeviceRecord, DeviceRegistry, TimerWheel
+
+TIMEOUT = 3.0
+
+
+def seeded() -> DeviceRegistry:
+    """A registry holding the seeded zone layout: one FCU and one sensor per zone."""
+    registry = DeviceRegistry(offline_timeout=TIMEOUT)
+    for device_id, device_type, zone_id in (
+        ("fcu-sr-01", "fcu", "server-room"),
+        ("sensor-sr-01", "sensor", "server-room"),
+        ("fcu-of-01", "fcu", "open-office"),
+        ("sensor-of-01", "sensor", "open-office"),
+    ):
+        registry.add(DeviceRecord(device_id, device_type, zone_id, "online"))
+    return registry
+
+
+def tick(registry: DeviceRegistry, reporting=("server-room", "open-office")) -> list:
+    """Heartbeat the reporting sensor of each zone, then advance one second."""
+    for zone_id in reporting:
+        registry.heartbeat([registry.sensor_for_zone(zone_id)])
+    return [record.id for record in registry.expire()]
+
+
+def status(registry: DeviceRegistry, device_id: str) -> str:
+    return registry.get(device_id).status
+
+
+def test_fcus_stay_online_while_their_zone_reports():
+    registry = seeded()
+
+    for _ in range(int(TIMEOUT) * 5):
+        assert tick(registry) == []
+
+    assert [record.id for record in registry.find(status="online")] == [
+        "fcu-of-01",
+        "fcu-sr-01",
+        "sensor-of-01",
+        "sensor-sr-01",
+    ]
+
+
+def test_silent_sensor_times_out_alone():
+    registry = seeded()
+
+    expired = [tick(registry, reporting=["open-office"]) for _ in range(int(TIMEOUT))]
+
+    assert expired == [[], [], ["sensor-sr-01"]]
+    assert status(registry, "sensor-sr-01") == "offline"
+    assert status(registry, "fcu-sr-01") == "online"
+    # The status change is queued for the next flush
+    assert "sensor-sr-01" in registry._status_dirty
+
+
+def test_only_the_reporting_sensor_has_a_timer():
+    registry = seeded()
+    registry.add(DeviceRecord("sensor-sr-02", "sensor", "server-room", "online"))
+
+    for _ in range(int(TIMEOUT) * 2):
+        assert tick(registry) == []
+    assert status(registry, "sensor-sr-02") == "online"
+
+    # A lower id takes over reporting for the zone
+    registry.add(DeviceRecord("sensor-sr-00", "sensor", "server-room", "online"))
+    assert registry.sensor_for_zone("server-room") == "sensor-sr-00"
+    expired = [tick(registry) for _ in range(int(TIMEOUT))]
+    assert expired == [[], [], []]
+
+
+def test_timer_restarts_when_a_sensor_comes_back_online():
+    registry = seeded()
+    for _ in range(int(TIMEOUT)):
+        tick(registry, reporting=["open-office"])
+    assert status(registry, "sensor-sr-01") == "offline"
+
+    # Heartbeats from offline devices are ignored
+    tick(registry)
+    assert status(registry, "sensor-sr-01") == "offline"
+
+    registry.set_status("sensor-sr-01", "online")
+    expired = [tick(registry, reporting=["open-office"]) for _ in range(int(TIMEOUT))]
+    assert expired == [[], [], ["sensor-sr-01"]]
+
+
+def test_reload_keeps_a_running_timer():
+    registry = seeded()
+    tick(registry, reporting=["open-office"])
+    tick(registry, reporting=["open-office"])
+
+    # A resync re-adds the unchanged row; that must not count as a heartbeat
+    registry.add(DeviceRecord("sensor-sr-01", "sensor", "server-room", "online"))
+
+    assert tick(registry, reporting=["open-office"]) == ["sensor-sr-01"]
+
+
+def test_removed_devices_are_forgotten():
+    registry = seeded()
+    registry.remove("sensor-sr-01")
+
+    assert registry.sensor_for_zone("server-room") is None
+    assert "sensor-sr-01" not in registry
+    assert [tick(registry, reporting=["open-office"]) for _ in range(5)] == [[]] * 5
+
+
+def test_timer_wheel_fires_each_key_once_at_its_deadline():
+    wheel = TimerWheel(max_delay=5)
+    wheel.schedule("a", 2)
+    wheel.schedule("b", 5)
+    wheel.schedule("c", 3)
+    wheel.cancel("c")
+
+    fired = [wheel.advance() for _ in range(7)]
+
+    assert fired == [[], ["a"], [], [], ["b"], [], []]
+    assert len(wheel) == 0
@@ -0,0 +1,177 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.energy import BUILDING, EnergyCounter
+from app.services.energy import EnergyMeter, period_start
+
+
+def hour(h: int, day: int = 1) -> datetime:
+    return datetime(2026, 1, day, h)
+
+
+class GatedSessions:
+    """Session maker whose commits wait until `release` is set, then fail if `error` is."""
+
+    def __init__(self, session_maker):
+        self._session_maker = session_maker
+        self.committing = asyncio.Event()
+        self.release = asyncio.Event()
+        self.error = None
+
+    @asynccontextmanager
+    async def __call__(self):
+        async with self._session_maker() as db:
+            commit = db.commit
+
+            async def gated_commit():
+                self.committing.set()
+                await self.release.wait()
+                if self.error is not None:
+                    raise self.error
+                await commit()
+
+            db.commit = gated_commit
+            yield db
+
+
+async def counters_db(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(EnergyCounter.__table__.create)
+    return engine, GatedSessions(async_sessionmaker(engine, expire_on_commit=False))
+
+
+def metered() -> EnergyMeter:
+    meter = EnergyMeter(max_gap=60)
+    meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 0, 0))
+    meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 0, 36))
+    return meter
+
+
+KWH = 2.0 * 36 / 3600
+
+
+def test_trapezoid_within_an_hour():
+    meter = EnergyMeter(max_gap=60)
+    meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 0, 0))
+    meter.add("zone", 4.0, datetime(2026, 1, 1, 10, 0, 30))
+
+    assert meter.pending_kwh("zone", "hour", hour(10)) == pytest.approx(3.0 * 30 / 3600)
+
+
+def test_interval_is_split_at_the_hour_boundary():
+    meter = EnergyMeter(max_gap=60)
+    meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 59, 30))
+    meter.add("zone", 4.0, datetime(2026, 1, 1, 11, 0, 30))
+
+    # Power at 11:00 is interpolated to 3 kW
+    assert meter.pending_kwh("zone", "hour", hour(10)) == pytest.approx(2.5 * 30 / 3600)
+    assert meter.pending_kwh("zone", "hour", hour(11)) == pytest.approx(3.5 * 30 / 3600)
+    assert meter.pending_kwh("zone", "day", hour(0)) == pytest.approx(6.0 * 30 / 3600)
+
+
+def test_interval_across_midnight_lands_in_both_days():
+    meter = EnergyMeter(max_gap=60)
+    meter.add("zone", 1.0, datetime(2026, 1, 1, 23, 59, 45))
+    meter.add("zone", 1.0, datetime(2026, 1, 2, 0, 0, 15))
+
+    assert meter.pending_kwh("zone", "day", hour(0, day=1)) == pytest.approx(15 / 3600)
+    assert meter.pending_kwh("zone", "day", hour(0, day=2)) == pytest.approx(15 / 3600)
+    assert meter.pending_kwh("zone", "hour", hour(23)) == pytest.approx(15 / 3600)
+
+
+def test_building_counters_sum_every_zone():
+    meter = EnergyMeter(max_gap=60)
+    for zone, power in (("a", 1.0), ("b", 3.0)):
+        meter.add(zone, power, datetime(2026, 1, 1, 10, 0, 0))
+        meter.add(zone, power, datetime(2026, 1, 1, 10, 0, 36))
+
+    assert meter.pending_kwh(BUILDING, "hour", hour(10)) == pytest.approx(4.0 * 36 / 3600)
+    assert meter.pending_zones("hour", hour(10)) == pytest.approx(
+        {"a": 1.0 * 36 / 3600, "b": 3.0 * 36 / 3600}
+    )
+
+
+def test_gaps_longer_than_max_gap_are_not_integrated():
+    meter = EnergyMeter(max_gap=60)
+    meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 0, 0))
+    meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 5, 0))
+    meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 5, 30))
+
+    assert meter.pending_kwh("zone", "hour", hour(10)) == pytest.approx(2.0 * 30 / 3600)
+
+
+def test_missing_power_is_ignored():
+    meter = EnergyMeter()
+    meter.add("zone", None, datetime(2026, 1, 1, 10))
+
+    assert meter.pending_zones("hour", hour(10)) == {}
+
+
+def test_period_start():
+    timestamp = datetime(2026, 5, 6, 7, 8, 9, 10)
+
+    assert period_start(timestamp, "hour") == datetime(2026, 5, 6, 7)
+    assert period_start(timestamp, "day") == datetime(2026, 5, 6)
+    with pytest.raises(ValueError):
+        period_start(timestamp, "week")
+
+
+def test_increments_count_as_pending_until_the_flush_commits(tmp_path):
+    async def main():
+        engine, sessions = await counters_db(tmp_path / "energy.db")
+        meter = metered()
+
+        flush = asyncio.create_task(meter.flush(sessions))
+        await sessions.committing.wait()
+        # Mid-write: not in the table yet, so still reported as pending
+        assert meter.pending_kwh("zone", "hour", hour(10)) == pytest.approx(KWH)
+        assert meter.pending_zones("day", hour(0)) == pytest.approx({"zone": KWH})
+
+        # Readings keep arriving during the write
+        meter.add("zone", 2.0, datetime(2026, 1, 1, 10, 1, 12))
+        sessions.release.set()
+        assert await flush == 4
+
+        assert meter.pending_kwh("zone", "hour", hour(10)) == pytest.approx(KWH)
+        async with sessions() as db:
+            counter = await db.get(EnergyCounter, ("zone", "hour", hour(10)))
+        assert counter.kwh == pytest.approx(KWH)
+        await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_failed_or_cancelled_flush_keeps_its_increments(tmp_path):
+    async def main():
+        engine, sessions = await counters_db(tmp_path / "energy.db")
+        meter = metered()
+
+        sessions.error = RuntimeError("database is locked")
+        sessions.release.set()
+        with pytest.raises(RuntimeError):
+            await meter.flush(sessions)
+        assert meter.pending_kwh(BUILDING, "day", hour(0)) == pytest.approx(KWH)
+
+        sessions.error = None
+        sessions.release.clear()
+        sessions.committing.clear()
+        flush = asyncio.create_task(meter.flush(sessions))
+        await sessions.committing.wait()
+        flush.cancel()
+        await asyncio.gather(flush, return_exceptions=True)
+        assert meter.pending_kwh(BUILDING, "day", hour(0)) == pytest.approx(KWH)
+
+        sessions.release.set()
+        await meter.flush(sessions)
+        async with sessions() as db:
+            counter = await db.get(EnergyCounter, (BUILDING, "day", hour(0)))
+        assert counter.kwh == pytest.approx(KWH)
+        assert meter.pending_kwh(BUILDING, "day", hour(0)) == 0.0
+        await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+import asyncio
+import socket
+
+from app.services.event_bus import EventBus, EventBusClient, EventBusServer
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+        self.changed = asyncio.Event()
+
+    async def __call__(self, event: dict):
+        self.events.append(event)
+        self.changed.set()
+
+    async def wait_for(self, count: int, timeout: float = 5.0):
+        async def wait():
+            while len(self.events) < count:
+                self.changed.clear()
+                await self.changed.wait()
+
+        await asyncio.wait_for(wait(), timeout)
+
+
+def test_failing_handler_does_not_stop_the_others():
+    async def main():
+        bus, recorder = EventBus(), Recorder()
+
+        async def broken(event: dict):
+            raise RuntimeError("boom")
+
+        bus.subscribe(broken)
+        bus.subscribe(recorder)
+        bus.subscribe(recorder)
+        await bus.publish({"type": "reading"})
+        bus.unsubscribe(recorder)
+        await bus.publish({"type": "prediction"})
+        return recorder.events
+
+    # Subscribing twice delivers once
+    assert asyncio.run(main()) == [{"type": "reading"}]
+
+
+def test_subscriber_gets_the_snapshot_then_live_events_in_order():
+    async def main():
+        port = free_port()
+        state = [{"type": "alert", "state": "active", "zone_id": "a"}]
+        source, local, recorder = EventBus(), EventBus(), Recorder()
+        server = EventBusServer(source, port=port, snapshot=lambda: list(state))
+        client = EventBusClient(local, port=port, reconnect_delay=0.05)
+        local.subscribe(recorder)
+        await server.start()
+        task = asyncio.create_task(client.run())
+        try:
+            await recorder.wait_for(1)
+            for i in range(3):
+                await source.publish({"type": "reading", "seq": i})
+            await recorder.wait_for(4)
+        finally:
+            client.stop()
+            await server.stop()
+            await asyncio.wait_for(task, 5)
+        return recorder.events
+
+    events = asyncio.run(main())
+
+    assert events[0] == {"type": "alert", "state": "active", "zone_id": "a"}
+    assert [event["seq"] for event in events[1:]] == [0, 1, 2]
+
+
+def test_client_reconnects_and_is_sent_a_fresh_snapshot():
+    async def main():
+        port = free_port()
+        state = {"version": 1}
+        local, recorder = EventBus(), Recorder()
+        local.subscribe(recorder)
+        client = EventBusClient(local, port=port, reconnect_delay=0.05)
+
+        # The client starts first and keeps retrying until the server is up
+        task = asyncio.create_task(client.run())
+        try:
+            for _ in range(2):
+                server = EventBusServer(
+                    EventBus(), port=port, snapshot=lambda: [{"type": "snapshot", **state}]
+                )
+                await server.start()
+                await recorder.wait_for(state["version"])
+                assert client.connected
+                await server.stop()
+                state["version"] += 1
+        finally:
+            client.stop()
+            await asyncio.wait_for(task, 5)
+        return recorder.events
+
+    assert [event["version"] for event in asyncio.run(main())] == [1, 2]
@@ -0,0 +1,73 @@
+from app.services.load_shedder import LoadShedder
+
+INTERVAL = 1.0
+
+
+def healthy(shedder: LoadShedder, overruns: int = 0) -> int:
+    return shedder.update(lag=0.0, interval=INTERVAL, overruns=overruns, backlog=0, zone_count=10)
+
+
+def lagging(shedder: LoadShedder, overruns: int = 0) -> int:
+    return shedder.update(lag=0.5, interval=INTERVAL, overruns=overruns, backlog=0, zone_count=10)
+
+
+def test_escalates_one_level_per_pressured_tick_up_to_the_last():
+    shedder = LoadShedder(recovery_ticks=3)
+
+    assert [lagging(shedder) for _ in range(5)] == [1, 2, 3, 3, 3]
+    assert shedder.level_name == "skip_reading_broadcast"
+    assert not shedder.broadcast_readings
+    assert not shedder.compute_predictions
+    assert not shedder.persist_predictions
+
+
+def test_shed_work_follows_priority_order():
+    shedder = LoadShedder()
+
+    lagging(shedder)
+    assert (shedder.persist_predictions, shedder.compute_predictions) == (False, True)
+    lagging(shedder)
+    assert (shedder.compute_predictions, shedder.broadcast_readings) == (False, True)
+
+
+def test_overruns_and_backlog_count_as_pressure():
+    shedder = LoadShedder()
+
+    assert healthy(shedder, overruns=1) == 1
+    # The overrun count is cumulative; no new overrun, no new pressure
+    assert healthy(shedder, overruns=1) == 1
+    assert shedder.update(lag=0.0, interval=INTERVAL, overruns=1, backlog=2, zone_count=10) == 2
+
+
+def test_recovers_one_level_per_healthy_streak():
+    shedder = LoadShedder(recovery_ticks=3)
+    for _ in range(3):
+        lagging(shedder)
+
+    levels = [healthy(shedder) for _ in range(9)]
+
+    assert levels == [3, 3, 2, 2, 2, 1, 1, 1, 0]
+
+
+def test_borderline_tick_resets_the_healthy_streak():
+    shedder = LoadShedder(lag_high=0.2, lag_low=0.05, recovery_ticks=3)
+    lagging(shedder)
+
+    healthy(shedder)
+    healthy(shedder)
+    # Between the low and high marks: neither pressure nor healthy
+    shedder.update(lag=0.1, interval=INTERVAL, overruns=0, backlog=0, zone_count=10)
+    healthy(shedder)
+    healthy(shedder)
+    assert shedder.level == 1
+    assert healthy(shedder) == 0
+
+
+def test_disabled_shedder_never_degrades():
+    shedder = LoadShedder(enabled=False)
+
+    for _ in range(5):
+        lagging(shedder)
+
+    assert shedder.level == 0
+    assert shedder.broadcast_readings and shedder.compute_predictions
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from app.services.loop_monitor import LoopMonitor, _culprit
+
+
+def monitored(body, **kwargs) -> LoopMonitor:
+    """Run `body()` on a loop watched by a fast-sampling monitor."""
+    monitor = LoopMonitor(interval=0.02, block_threshold=0.05, **kwargs)
+
+    async def main():
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.1)
+        try:
+            await body()
+        finally:
+            monitor.stop()
+            await task
+            monitor._watchdog.join(timeout=1)
+
+    asyncio.run(main())
+    return monitor
+
+
+def hog(seconds: float):
+    time.sleep(seconds)
+
+
+def test_idle_loop_records_lag_but_no_blocks():
+    async def body():
+        await asyncio.sleep(0.3)
+
+    monitor = monitored(body)
+    report = monitor.report()
+
+    assert report["lag_ms"]["samples"] >= 5
+    assert report["recent_blocks"] == []
+    assert not monitor._watchdog.is_alive()
+
+
+def test_blocking_call_is_attributed_to_its_frame_and_task():
+    async def blocker():
+        hog(0.3)
+
+    async def body():
+        await asyncio.create_task(blocker(), name="blocker")
+        await asyncio.sleep(0.1)
+
+    report = monitored(body).report()
+
+    [block] = report["recent_blocks"]
+    assert block["duration_ms"] >= 250
+    assert block["task"] == "blocker"
+    assert block["culprit"].startswith("hog (test_loop_monitor.py:")
+    assert ".<locals>.blocker (test_loop_monitor.py:" in block["stack"][-2]
+    assert report["culprits"] == [
+        {"culprit": block["culprit"], "blocks": 1, "total_ms": block["duration_ms"]}
+    ]
+
+
+def test_culprit_is_the_innermost_app_frame():
+    stack = [
+        "main (runners.py:118)",
+        "sensor_data_generator (app/simulation.py:240)",
+        "summary (app/services/chat_context.py:88)",
+        "dumps (__init__.py:231)",
+    ]
+
+    assert _culprit(stack) == "summary (app/services/chat_context.py:88)"
+    assert _culprit(stack[:1]) == "main (runners.py:118)"
+    assert _culprit([]) == "unknown"
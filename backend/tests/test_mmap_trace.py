@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.mmap_trace import (
+    ZONE_ID_BYTES,
+    MmapReplaySource,
+    MmapTrace,
+    MmapTraceWriter,
+    convert_trace,
+)
+from app.services.trace import TraceReader, TraceWriter
+
+START = datetime(2026, 1, 1, 8, 0)
+ZONES = [("open-office", 23.0), ("server-room", 18.0)]
+
+
+def record(path, ticks: int = 6) -> list:
+    """Write a trace where the server room only reports every other tick."""
+    writer = TraceWriter(str(path))
+    for i in range(ticks):
+        readings = {"open-office": {"temperature": 22.0 + i / 4, "humidity": 50.0, "occupancy": i}}
+        if i % 2 == 0:
+            readings["server-room"] = {"temperature": 18.0 - i / 4, "power_kw": 2.5}
+        writer.write_tick(START + timedelta(seconds=5 * i), readings)
+    writer.close()
+    return list(TraceReader(str(path)).ticks())
+
+
+def test_conversion_keeps_every_row(tmp_path):
+    ticks = record(tmp_path / "run.trc")
+
+    zone_rows = convert_trace(str(tmp_path / "run.trc"), str(tmp_path / "run.fcum"))
+
+    assert zone_rows == {"open-office": 6, "server-room": 3}
+    trace = MmapTrace(str(tmp_path / "run.fcum"))
+    assert trace.zone_ids == ["open-office", "server-room"]
+    assert trace.start == START.timestamp()
+    assert trace.end == (START + timedelta(seconds=25)).timestamp()
+    timestamps, columns = trace.zone("server-room")
+    assert list(timestamps) == [tick.timestamp.timestamp() for tick in ticks[::2]]
+    assert list(columns["power_kw"]) == [2.5, 2.5, 2.5]
+
+
+def test_replay_matches_the_recorded_ticks(tmp_path):
+    ticks = record(tmp_path / "run.trc")
+    convert_trace(str(tmp_path / "run.trc"), str(tmp_path / "run.fcum"))
+    source = MmapReplaySource(str(tmp_path / "run.fcum"), step_seconds=5.0)
+
+    replayed = [source.generate_batch(ZONES) for _ in range(len(ticks))]
+
+    assert replayed == [tick.readings for tick in ticks]
+    assert source.generate_batch(ZONES) == {}
+    assert source.finished
+
+
+def test_replay_steps_coarser_than_the_recording_take_the_latest_sample(tmp_path):
+    ticks = record(tmp_path / "run.trc")
+    convert_trace(str(tmp_path / "run.trc"), str(tmp_path / "run.fcum"))
+    source = MmapReplaySource(str(tmp_path / "run.fcum"), step_seconds=10.0)
+
+    replayed = [source.generate_batch(ZONES) for _ in range(3)]
+
+    assert [batch["open-office"] for batch in replayed] == [
+        ticks[i].readings["open-office"] for i in (0, 2, 4)
+    ]
+    assert source.ticks_replayed == 3
+
+
+def test_looping_replay_starts_over(tmp_path):
+    record(tmp_path / "run.trc", ticks=2)
+    convert_trace(str(tmp_path / "run.trc"), str(tmp_path / "run.fcum"))
+    source = MmapReplaySource(str(tmp_path / "run.fcum"), step_seconds=5.0, loop=True)
+
+    batches = [source.generate_batch(ZONES) for _ in range(4)]
+
+    assert batches[:2] == batches[2:]
+    assert not source.finished
+
+
+def test_zone_ids_longer_than_the_index_field_are_rejected(tmp_path):
+    zone_id = "zone-" + "x" * ZONE_ID_BYTES
+
+    with pytest.raises(ValueError, match="longer than"):
+        MmapTraceWriter(str(tmp_path / "run.fcum"), {zone_id: 1})
+    assert not (tmp_path / "run.fcum").exists()
+
+    # Multi-byte characters count by their encoded length
+    MmapTraceWriter(str(tmp_path / "ok.fcum"), {"é" * (ZONE_ID_BYTES // 2): 1}).close()
+    with pytest.raises(ValueError):
+        MmapTraceWriter(str(tmp_path / "long.fcum"), {"é" * (ZONE_ID_BYTES // 2 + 1): 1})
+
+
+def test_rejects_files_in_another_format(tmp_path):
+    record(tmp_path / "run.trc")
+
+    with pytest.raises(ValueError, match="not a memory-mapped trace"):
+        MmapTrace(str(tmp_path / "run.trc"))
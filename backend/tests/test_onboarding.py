@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models import Device
+from app.services.device_registry import DeviceRegistry
+from app.services.onboarding import DeviceOnboarding
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+class CountingSessions:
+    """Session maker that counts the sessions opened through it."""
+
+    def __init__(self, session_maker):
+        self._session_maker = session_maker
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return self._session_maker()
+
+
+def discovered(device_id: str, device_type: str = "fcu", zone_id: str = "open-office") -> dict:
+    return {
+        "type": "device_discovered",
+        "device": {
+            "id": device_id,
+            "name": device_id.upper(),
+            "type": device_type,
+            "zone_id": zone_id,
+        },
+    }
+
+
+def onboard(tmp_path, body, **kwargs):
+    """Run `body(onboarding, sessions, published)` against a scratch database."""
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'devices.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = CountingSessions(async_sessionmaker(engine, expire_on_commit=False))
+        published = []
+
+        async def publish(event: dict):
+            published.append(event)
+
+        onboarding = DeviceOnboarding(
+            sessions, publish, sync_seconds=0.05, clock=lambda: NOW, **kwargs
+        )
+        try:
+            return await body(onboarding, sessions, published)
+        finally:
+            await onboarding.stop()
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def statuses(sessions) -> dict:
+    async with sessions() as db:
+        rows = await db.execute(select(Device.id, Device.status))
+        return dict(rows.all())
+
+
+def test_burst_is_onboarded_in_a_few_transactions(tmp_path):
+    registry = DeviceRegistry()
+
+    async def body(onboarding, sessions, published):
+        await asyncio.gather(
+            *(onboarding.discover(discovered(f"fcu-{i:03d}")) for i in range(100))
+        )
+        return sessions.opened, await statuses(sessions), published
+
+    opened, rows, published = onboard(tmp_path, body, registry=registry)
+
+    # One insert batch and one update batch, not two commits per device
+    assert opened <= 4
+    assert rows == {f"fcu-{i:03d}": "online" for i in range(100)}
+    assert len(registry.find(status="online")) == 100
+    assert registry.get("fcu-000").last_seen == NOW
+    assert published.index(discovered("fcu-007")) < published.index(
+        {
+            "type": "device_status",
+            "device_id": "fcu-007",
+            "status": "online",
+            "timestamp": NOW.isoformat(),
+        }
+    )
+
+
+def test_known_and_in_flight_devices_are_not_onboarded_twice(tmp_path):
+    async def body(onboarding, sessions, published):
+        await onboarding.discover(discovered("fcu-1"))
+        published.clear()
+
+        # Already in the database
+        await onboarding.discover(discovered("fcu-1"))
+        # Discovered twice while the first is still in flight
+        await asyncio.gather(
+            onboarding.discover(discovered("fcu-2")), onboarding.discover(discovered("fcu-2"))
+        )
+        return published
+
+    published = onboard(tmp_path, body)
+
+    assert [event["type"] for event in published] == ["device_discovered", "device_status"]
+
+
+def test_stop_leaves_devices_mid_sync_syncing(tmp_path):
+    async def body(onboarding, sessions, published):
+        onboarding.sync_seconds = 60.0
+        onboarding.discover(discovered("fcu-1"))
+        while "fcu-1" not in await statuses(sessions):
+            await asyncio.sleep(0.01)
+        assert onboarding.states == {"fcu-1": "syncing"}
+
+        await onboarding.stop()
+        return onboarding.states, await statuses(sessions)
+
+    states, rows = onboard(tmp_path, body)
+
+    assert states == {}
+    assert rows == {"fcu-1": "syncing"}
+
+
+def test_status_change_hits_the_sampled_online_device(tmp_path):
+    async def body(onboarding, sessions, published):
+        await asyncio.gather(*(onboarding.discover(discovered(f"fcu-{i}")) for i in range(4)))
+        published.clear()
+
+        # Online devices are sampled in id order
+        await onboarding.change_status({"selector": 0.5, "status": "offline"})
+        await onboarding.change_status({"selector": 0.99, "status": "offline"})
+        return await statuses(sessions), published
+
+    rows, published = onboard(tmp_path, body)
+
+    assert rows == {"fcu-0": "online", "fcu-1": "online", "fcu-2": "offline", "fcu-3": "offline"}
+    assert [event["device_id"] for event in published] == ["fcu-2", "fcu-3"]
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_round_trips_sort_key():
+    timestamp = datetime(2026, 3, 1, 12, 30, 15, 250000)
+
+    cursor = encode_cursor(timestamp, 42)
+
+    assert decode_cursor(cursor, 2) == [timestamp.isoformat(), 42]
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor("zone/with+odd?chars", 1)
+
+    assert "=" not in cursor
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+    assert decode_cursor(cursor, 2) == ["zone/with+odd?chars", 1]
+
+
+def test_string_keys_round_trip():
+    assert decode_cursor(encode_cursor("fcu-sr-01"), 1) == ["fcu-sr-01"]
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "e30", "!!!!"])
+def test_rejects_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+def test_rejects_cursor_for_another_key_size():
+    cursor = encode_cursor("2026-03-01T00:00:00", 7)
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 3)
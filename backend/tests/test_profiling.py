@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import diagnostics
+from app.services.profiling import MemoryTracker, ProfilerBusyError, SamplingProfiler
+
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_sees_other_threads_in_collapsed_form():
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        stacks = SamplingProfiler().sample(0.2, hz=200)
+    finally:
+        stop.set()
+        worker.join()
+
+    # The sampling thread itself is never in the profile
+    assert "MainThread" not in {stack[0] for stack in stacks}
+    spinning = [stack for stack in stacks if stack[0] == "spinner"]
+    assert sum(stacks[stack] for stack in spinning) >= 20
+    assert all("spin (tests/test_profiling.py)" in stack for stack in spinning)
+    line = SamplingProfiler.collapsed(Counter({spinning[0]: 3}))
+    assert line == ";".join(spinning[0]) + " 3\n"
+
+
+def test_only_one_profile_runs_at_a_time():
+    profiler = SamplingProfiler()
+    errors = []
+
+    def second():
+        time.sleep(0.05)
+        try:
+            profiler.sample(0.01)
+        except ProfilerBusyError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    profiler.sample(0.2)
+    thread.join()
+
+    assert len(errors) == 1
+    # The lock is released once the first profile ends
+    assert profiler.sample(0.01) is not None
+
+
+def test_top_functions_splits_self_and_total_time():
+    stacks = Counter(
+        {
+            ("MainThread", "main", "tick", "summary"): 6,
+            ("MainThread", "main", "tick"): 2,
+            ("worker", "run", "summary"): 2,
+        }
+    )
+
+    top = {row["function"]: row for row in SamplingProfiler.top_functions(stacks)}
+
+    assert top["summary"] == {
+        "function": "summary",
+        "self": 8,
+        "total": 8,
+        "self_pct": 80.0,
+        "total_pct": 80.0,
+    }
+    assert (top["tick"]["self"], top["tick"]["total"]) == (2, 8)
+    # Functions that never ran themselves are not listed
+    assert set(top) == {"summary", "tick"}
+
+
+def test_memory_diff_points_at_the_growing_allocation():
+    tracker = MemoryTracker(max_snapshots=2)
+    leak = []
+    try:
+        base = tracker.snapshot()
+        leak.extend(bytearray(1024) for _ in range(500))
+        middle = tracker.snapshot()
+        latest = tracker.snapshot(keep=base)
+
+        # The base snapshot is kept for the diff; the one in between makes room
+        assert [entry["id"] for entry in tracker.snapshots()] == [base, latest]
+        assert tracker.get(middle) is None
+        growth = tracker.diff(base, latest)
+        assert growth[0]["where"][0].startswith("tests/test_profiling.py:")
+        assert growth[0]["size_diff_kb"] >= 500
+        with pytest.raises(KeyError):
+            tracker.diff(middle, latest)
+    finally:
+        tracker.stop()
+
+    assert not tracker.tracing
+    assert tracker.snapshots() == []
+
+
+def test_diagnostics_fail_closed(monkeypatch):
+    token = SimpleNamespace(admin_token="")
+    monkeypatch.setattr(diagnostics, "get_settings", lambda: token)
+
+    with pytest.raises(HTTPException) as disabled:
+        diagnostics.require_admin("anything")
+    token.admin_token = "s3cret"
+    with pytest.raises(HTTPException) as missing:
+        diagnostics.require_admin(None)
+    with pytest.raises(HTTPException) as wrong:
+        diagnostics.require_admin("guess")
+
+    assert (disabled.value.status_code, missing.value.status_code, wrong.value.status_code) == (
+        404,
+        403,
+        403,
+    )
+    diagnostics.require_admin("s3cret")
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.services.query_profiler import QueryProfiler, QueryProfilingMiddleware
+
+
+def profiled(body, **kwargs) -> QueryProfiler:
+    """Run `body(profiler, engine)` against an instrumented in-memory database."""
+    profiler = QueryProfiler(**kwargs)
+
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        profiler.instrument(engine)
+        try:
+            await body(profiler, engine)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+    return profiler
+
+
+async def select_each(engine, zone_ids):
+    async with engine.connect() as conn:
+        for zone_id in zone_ids:
+            await conn.execute(text("SELECT :zone_id"), {"zone_id": zone_id})
+
+
+def test_select_per_item_is_flagged_as_n_plus_one():
+    async def body(profiler, engine):
+        for _ in range(2):
+            with profiler.profile("tick", "sensor_tick"):
+                await select_each(engine, range(12))
+        with profiler.profile("tick", "sensor_tick"):
+            await select_each(engine, range(3))
+
+    report = profiled(body, n_plus_one_threshold=10).report()
+
+    tick = report["scopes"]["tick"]
+    assert tick["profiled"] == 3
+    assert [scope["queries"] for scope in tick["recent"]] == [3, 12, 12]
+    assert tick["recent"][0]["n_plus_one"] == []
+    assert tick["recent"][1]["n_plus_one"] == [{"statement": "SELECT ?", "count": 12}]
+    assert report["n_plus_one"] == [
+        {"scope": "sensor_tick", "statement": "SELECT ?", "max_count": 12}
+    ]
+
+
+def test_tasks_spawned_in_a_scope_report_into_it():
+    async def body(profiler, engine):
+        await select_each(engine, ["outside"])
+        with profiler.profile("tick", "sensor_tick"):
+            # Nested scopes join the enclosing one
+            with profiler.profile("request", "GET /inner") as inner:
+                assert inner is None
+            await asyncio.gather(*(select_each(engine, [zone]) for zone in "abcd"))
+
+    report = profiled(body).report()
+
+    assert list(report["scopes"]) == ["tick"]
+    assert report["scopes"]["tick"]["recent"][0]["queries"] == 4
+
+
+def test_unsampled_scopes_are_not_profiled():
+    draws = iter([0.7, 0.2])
+
+    async def body(profiler, engine):
+        for _ in range(2):
+            with profiler.profile("tick", "sensor_tick"):
+                await select_each(engine, ["a"])
+
+    report = profiled(body, sample_rate=0.5, rng=lambda: next(draws)).report()
+
+    assert report["scopes"]["tick"]["profiled"] == 1
+
+
+def test_failed_statement_does_not_skew_the_next_timing():
+    async def body(profiler, engine):
+        with profiler.profile("tick", "sensor_tick") as profile:
+            async with engine.connect() as conn:
+                try:
+                    await conn.execute(text("SELECT * FROM missing"))
+                except Exception:
+                    pass
+                await conn.execute(text("SELECT 1"))
+                starts = conn.sync_connection.info["profile_start"]
+        assert profile.queries == 1
+        assert starts == []
+
+    profiled(body)
+
+
+def test_middleware_groups_requests_by_route_template():
+    profiler = QueryProfiler()
+
+    async def app(scope, receive, send):
+        scope["route"] = SimpleNamespace(path="/api/sensors/zones/{zone_id}/latest")
+
+    async def main():
+        middleware = QueryProfilingMiddleware(app, profiler)
+        for zone_id in ("open-office", "server-room"):
+            path = f"/api/sensors/zones/{zone_id}/latest"
+            await middleware({"type": "http", "method": "GET", "path": path}, None, None)
+        await middleware({"type": "websocket", "path": "/ws/sensors"}, None, None)
+
+    asyncio.run(main())
+
+    recent = profiler.report(kind="request")["scopes"]["request"]["recent"]
+    assert [scope["name"] for scope in recent] == ["GET /api/sensors/zones/{zone_id}/latest"] * 2
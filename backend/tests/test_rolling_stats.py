@@ -0,0 +1,85 @@
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.rolling_stats import RollingStats
+
+START = datetime(2026, 1, 1)
+
+
+def brute_force(samples, now: datetime, minutes: int):
+    cutoff = (now - timedelta(minutes=minutes)).timestamp()
+    values = [value for ts, value in samples if ts > cutoff]
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values),
+        "min": min(values),
+        "max": max(values),
+        "stddev": statistics.stdev(values) if len(values) > 1 else 0.0,
+    }
+
+
+def test_matches_brute_force_recomputation():
+    rng = random.Random(7)
+    stats = RollingStats(window_minutes=(1, 5, 15), metrics=("temperature",))
+    samples = []
+    now = START
+
+    for step in range(3000):
+        # Irregular spacing, including gaps longer than the shorter windows
+        now += timedelta(seconds=rng.choice([1, 5, 5, 5, 30, 200]))
+        value = rng.gauss(22.0, 3.0)
+        stats.add("zone", {"temperature": value}, now)
+        samples.append((now.timestamp(), value))
+
+        if step % 10:
+            continue
+        now += timedelta(seconds=rng.choice([0, 10, 100]))
+        for key, per_metric in stats.zone("zone", now).items():
+            expected = brute_force(samples, now, int(key[:-1]))
+            actual = per_metric["temperature"]
+            if expected is None:
+                assert actual is None
+                continue
+            assert actual["count"] == expected["count"]
+            assert actual["min"] == expected["min"]
+            assert actual["max"] == expected["max"]
+            assert actual["mean"] == pytest.approx(expected["mean"], abs=1e-3)
+            assert actual["stddev"] == pytest.approx(expected["stddev"], abs=1e-3)
+
+
+def test_samples_are_stored_once_for_the_longest_window():
+    stats = RollingStats(window_minutes=(1, 5), metrics=("temperature",))
+
+    for second in range(0, 600, 5):
+        stats.add("zone", {"temperature": float(second)}, START + timedelta(seconds=second))
+
+    series = stats._zones["zone"]["temperature"]
+    short, long = series.windows
+    assert short.count == 12
+    assert long.count == 60
+    # Only the 5 minute window's samples are kept, shared by both windows
+    assert len(series.samples) == 60
+
+
+def test_zone_that_stops_reporting_empties_out():
+    stats = RollingStats(window_minutes=(1,), metrics=("temperature",))
+    stats.add("zone", {"temperature": 21.0}, START)
+
+    assert stats.zone("zone", START + timedelta(seconds=30))["1m"]["temperature"]["count"] == 1
+    assert stats.zone("zone", START + timedelta(minutes=2))["1m"]["temperature"] is None
+
+
+def test_missing_metrics_are_skipped():
+    stats = RollingStats(window_minutes=(1,), metrics=("temperature", "co2_level"))
+    stats.add("zone", {"temperature": 21.0, "co2_level": None}, START)
+
+    window = stats.window_stats("zone", 1)
+
+    assert window["temperature"]["count"] == 1
+    assert window["co2_level"] is None
+    assert stats.zone("other") is None
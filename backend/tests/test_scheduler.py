@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from app.services.scheduler import TickScheduler
+
+INTERVAL = 0.1
+# The first tick runs 2.5 intervals, so it overruns by 1.5 of them
+SLOW_TICK = 0.25
+
+
+def run_two_ticks(policy: str):
+    """Scheduled starts of a slow first tick and the tick after it."""
+    scheduler = TickScheduler(INTERVAL, overrun_policy=policy, stagger_fraction=0)
+    starts = []
+
+    async def tick(scheduled: float):
+        starts.append(scheduled)
+        if len(starts) == 1:
+            await asyncio.sleep(SLOW_TICK)
+        else:
+            scheduler.stop()
+
+    asyncio.run(scheduler.run(tick))
+    return scheduler, starts
+
+
+def test_skip_drops_missed_slots_and_stays_on_grid():
+    scheduler, (first, second) = run_two_ticks("skip")
+
+    assert scheduler.overruns == 1
+    assert scheduler.skipped_ticks == 2
+    # Slots 1 and 2 passed during the slow tick; slot 3 is the next one
+    assert second - first == pytest.approx(3 * INTERVAL)
+
+
+def test_merge_fires_one_catch_up_tick_immediately():
+    scheduler, (first, second) = run_two_ticks("merge")
+
+    assert scheduler.overruns == 1
+    assert scheduler.skipped_ticks == 1
+    # Starts when the slow tick finished, off the original grid
+    assert second - first >= SLOW_TICK
+    assert second - first < 3 * INTERVAL
+
+
+def test_ticks_on_time_are_not_overruns():
+    scheduler = TickScheduler(0.01)
+    starts = []
+
+    async def tick(scheduled: float):
+        starts.append(scheduled)
+        if len(starts) == 5:
+            scheduler.stop()
+
+    asyncio.run(scheduler.run(tick))
+
+    assert scheduler.overruns == 0
+    assert scheduler.skipped_ticks == 0
+    assert [b - a for a, b in zip(starts, starts[1:])] == pytest.approx([0.01] * 4)
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        TickScheduler(1.0, overrun_policy="queue")
+
+
+def test_phase_offsets_spread_over_stagger_window():
+    scheduler = TickScheduler(1.0, stagger_fraction=0.5)
+    assert scheduler.phase_offsets(4) == pytest.approx([0.0, 0.125, 0.25, 0.375])
+    assert scheduler.phase_offsets(0) == []
+
+
+def test_slow_zone_does_not_make_the_tick_overrun():
+    scheduler = TickScheduler(0.2, stagger_fraction=0.5)
+    in_flight = set()
+    launched = []
+    starts = []
+
+    async def zone(zone_id: str, start_at: float, duration: float):
+        try:
+            await scheduler.wait_until(start_at)
+            await asyncio.sleep(duration)
+        finally:
+            in_flight.discard(zone_id)
+
+    async def tick(scheduled: float):
+        # Zone "slow" takes three intervals; the others finish quickly
+        zones = {"fast-1": 0.01, "fast-2": 0.01, "slow": 0.6}
+        tasks = []
+        for (zone_id, duration), offset in zip(zones.items(), scheduler.phase_offsets(len(zones))):
+            if zone_id in in_flight:
+                continue
+            in_flight.add(zone_id)
+            tasks.append(asyncio.create_task(zone(zone_id, scheduled + offset, duration)))
+            launched.append((len(starts), zone_id))
+        starts.append(scheduled)
+        await scheduler.wait_for(tasks, scheduled)
+        if len(starts) == 6:
+            scheduler.stop()
+
+    async def main():
+        await scheduler.run(tick)
+        await asyncio.gather(*[t for t in asyncio.all_tasks() if t is not asyncio.current_task()])
+
+    asyncio.run(main())
+
+    assert scheduler.overruns == 0
+    assert scheduler.skipped_ticks == 0
+    assert [b - a for a, b in zip(starts, starts[1:])] == pytest.approx([0.2] * 5)
+    # Fast zones run every tick; the slow one is left running and only
+    # restarted once it finished, in the fifth tick
+    assert [tick for tick, zone_id in launched if zone_id == "slow"] == [0, 4]
+    assert [tick for tick, zone_id in launched if zone_id == "fast-1"] == [0, 1, 2, 3, 4, 5]
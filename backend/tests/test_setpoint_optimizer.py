@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.services.setpoint_optimizer import MAX_SETPOINT, SetpointOptimizer
+
+
+def run(optimizer: SetpointOptimizer, zones, temperature: float, ticks: int):
+    """Optimize `ticks` times with every zone reading `temperature`; returns the last setpoints."""
+    for _ in range(ticks):
+        applied = dict(optimizer.optimize(zones))
+        for zone_id, _, _ in zones:
+            optimizer.observe(zone_id, {"temperature": temperature, "occupancy": 5})
+    return applied
+
+
+def test_non_adaptive_zones_get_their_target():
+    optimizer = SetpointOptimizer()
+
+    assert optimizer.optimize([("z", 21.5, False)]) == [("z", 21.5)]
+    assert optimizer.report()["zones"] == []
+
+
+def test_adaptive_zone_starts_at_its_target():
+    optimizer = SetpointOptimizer()
+
+    # No reading yet, so nothing to forecast from
+    assert optimizer.optimize([("z", 22.0, True)]) == [("z", 22.0)]
+
+
+def test_setpoint_ramps_at_most_max_step_per_tick():
+    optimizer = SetpointOptimizer(max_step=0.1, energy_weight=0.0)
+    zones = [("z", 22.0, True)]
+    previous = 22.0
+
+    for _ in range(10):
+        applied = run(optimizer, zones, temperature=17.0, ticks=1)["z"]
+        assert abs(applied - previous) <= 0.1 + 1e-9
+        previous = applied
+    # A cold zone is pushed up
+    assert previous > 22.0
+
+
+def test_setpoint_is_clamped_to_max_offset_from_target():
+    optimizer = SetpointOptimizer(max_offset=1.0, max_step=0.5, energy_weight=0.0)
+
+    applied = run(optimizer, [("z", 22.0, True)], temperature=15.0, ticks=20)
+
+    assert applied["z"] == pytest.approx(23.0)
+
+
+def test_setpoint_is_clamped_to_the_simulators_range():
+    optimizer = SetpointOptimizer(max_offset=2.0, max_step=0.5, energy_weight=0.0)
+
+    applied = run(optimizer, [("z", 29.5, True)], temperature=20.0, ticks=20)
+
+    assert applied["z"] == pytest.approx(MAX_SETPOINT)
+
+
+def test_budget_defers_zones_round_robin():
+    # A zero budget still solves one chunk per tick
+    optimizer = SetpointOptimizer(budget=0.0, chunk_size=4, energy_weight=0.0)
+    zones = [(f"z{i}", 22.0, True) for i in range(10)]
+    run(optimizer, zones, temperature=18.0, ticks=1)
+
+    moved = set()
+    sizes = []
+    for _ in range(3):
+        applied = optimizer.optimize(zones)
+        assert (optimizer.last_optimized, optimizer.last_deferred) == (4, 6)
+        moved |= {zone_id for zone_id, setpoint in applied if setpoint != 22.0}
+        sizes.append(len(moved))
+
+    # Deferred zones go first next tick, so every zone gets its turn
+    assert sizes == [4, 8, 10]
+
+
+def test_generous_budget_optimizes_every_zone():
+    optimizer = SetpointOptimizer(budget=1.0, chunk_size=4)
+    zones = [(f"z{i}", 22.0, True) for i in range(10)]
+
+    run(optimizer, zones, temperature=18.0, ticks=2)
+
+    assert optimizer.last_optimized == 10
+    assert optimizer.last_deferred == 0
+
+
+def test_changes_are_published_once_and_followed():
+    optimizer, follower = SetpointOptimizer(energy_weight=0.0), SetpointOptimizer()
+    zones = [("a", 22.0, True), ("b", 20.0, False)]
+
+    run(optimizer, zones, temperature=18.0, ticks=3)
+    events = optimizer.changes()
+    assert [event["zone_id"] for event in events] == ["a"]
+    assert optimizer.changes() == []
+
+    for event in events:
+        asyncio.run(follower.follow(event))
+    assert follower.report()["zones"] == optimizer.report()["zones"]
+
+    optimizer.optimize([("a", 22.0, False)])
+    events = optimizer.changes()
+    assert [(event["zone_id"], event["adaptive"]) for event in events] == [("a", False)]
+    for event in events:
+        asyncio.run(follower.follow(event))
+    assert follower.report()["zones"] == []
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import signal
+import sys
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services.sharded_simulator import ShardedSimulator
+
+NOW = datetime(2026, 1, 1, 12, 0)
+ZONES = [(f"zone-{i:02d}", 22.0) for i in range(12)]
+
+
+def simulate(body, **kwargs):
+    """Run `body(simulator)` against started shards, stopping them afterwards."""
+
+    async def main():
+        simulator = ShardedSimulator(2, seed=7, interval_seconds=5.0, **kwargs)
+        await simulator.start()
+        try:
+            return await body(simulator)
+        finally:
+            await simulator.stop()
+
+    return asyncio.run(main())
+
+
+async def wait_until_ready(simulator: ShardedSimulator, timeout: float = 30.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while simulator._restarting:
+        assert asyncio.get_running_loop().time() < deadline, "shard did not restart"
+        await asyncio.sleep(0.05)
+
+
+def shard_zones(simulator: ShardedSimulator, index: int) -> set:
+    return {zone_id for zone_id, _ in ZONES if simulator.shard_for(zone_id) == index}
+
+
+def test_every_zone_gets_a_reading_and_prediction():
+    async def body(simulator):
+        return [await simulator.step(ZONES, now=NOW) for _ in range(3)]
+
+    batches = simulate(body)
+
+    for batch in batches:
+        assert sorted(batch.zone_ids) == [zone_id for zone_id, _ in ZONES]
+        for index in range(len(batch.zone_ids)):
+            assert "temperature" in batch.reading(index)
+            assert batch.prediction(index) is not None
+    # Both shards got zones
+    assert {ShardedSimulator(2).shard_for(zone_id) for zone_id, _ in ZONES} == {0, 1}
+
+
+def test_seeded_shards_are_reproducible():
+    async def body(simulator):
+        batch = await simulator.step(ZONES, compute_predictions=False, now=NOW)
+        assert batch.predictions is None
+        return batch
+
+    first, second = simulate(body), simulate(body)
+
+    assert first.zone_ids == second.zone_ids
+    np.testing.assert_array_equal(first.columns["temperature"], second.columns["temperature"])
+
+
+def test_dead_shard_is_skipped_then_restarted():
+    async def body(simulator):
+        down = shard_zones(simulator, 0)
+        simulator._processes[0].kill()
+        simulator._processes[0].join()
+
+        batch = await simulator.step(ZONES, now=NOW)
+        assert set(batch.zone_ids) == {zone_id for zone_id, _ in ZONES} - down
+
+        await wait_until_ready(simulator)
+        batch = await simulator.step(ZONES, now=NOW)
+        assert len(batch.zone_ids) == len(ZONES)
+
+    simulate(body)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGSTOP")
+def test_shard_that_stops_answering_is_restarted():
+    async def body(simulator):
+        down = shard_zones(simulator, 1)
+        wedged = simulator._processes[1]
+        os.kill(wedged.pid, signal.SIGSTOP)
+
+        batch = await simulator.step(ZONES, now=NOW)
+        assert set(batch.zone_ids) == {zone_id for zone_id, _ in ZONES} - down
+        assert 1 in simulator._restarting
+
+        await wait_until_ready(simulator)
+        wedged.join(timeout=5)
+        assert not wedged.is_alive()
+        batch = await simulator.step(ZONES, now=NOW)
+        assert len(batch.zone_ids) == len(ZONES)
+
+    simulate(body, reply_timeout=0.5)
+
+
+def test_stop_ends_every_worker():
+    async def body(simulator):
+        processes = list(simulator._processes)
+        await simulator.stop()
+        return processes
+
+    processes = simulate(body)
+
+    assert all(not process.is_alive() for process in processes)
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services.simulator import SimulatedClock, create_simulator
+from app.services.thermal_network import ThermalNetworkSimulator
+
+# A weekday afternoon: offices occupied, outdoors warm
+START = datetime(2026, 1, 7, 13, 0)
+ZONES = [("server-room", 18.0), ("open-office", 23.0)]
+
+
+def network(seed: int = 1) -> ThermalNetworkSimulator:
+    return ThermalNetworkSimulator(
+        step_seconds=5.0, rng=np.random.default_rng(seed), clock=lambda: START
+    )
+
+
+def test_fcus_hold_each_zone_at_its_setpoint():
+    simulator = network()
+    # Three hours of 5 s ticks: the PI loop settles after the start-up transient
+    for _ in range(2160):
+        readings = simulator.generate_batch(ZONES)
+
+    assert readings["server-room"]["temperature"] == pytest.approx(18.0, abs=0.3)
+    assert readings["open-office"]["temperature"] == pytest.approx(23.0, abs=0.3)
+    assert readings["open-office"]["occupancy"] > 0
+    assert "occupancy" not in readings["server-room"]
+
+
+def test_setpoint_change_is_tracked_and_costs_power():
+    simulator = network()
+    for _ in range(360):
+        steady = simulator.generate_batch(ZONES)["open-office"]
+
+    lowered = [("server-room", 18.0), ("open-office", 20.0)]
+    cooling = simulator.generate_batch(lowered)["open-office"]
+    for _ in range(720):
+        reading = simulator.generate_batch(lowered)["open-office"]
+
+    assert cooling["power_kw"] > steady["power_kw"]
+    assert reading["temperature"] == pytest.approx(20.0, abs=0.3)
+
+
+def test_coupling_moves_heat_without_creating_any():
+    simulator = network()
+    simulator.generate_batch([("a", 20.0), ("b", 20.0), ("c", 20.0)])
+    # Insulated zones with no gains and no FCUs: only coupling is left
+    for name in ("_ua", "_gain", "_capacity", "_max_occupancy", "_edge_conductance"):
+        getattr(simulator, name)[:] = 0.0
+    simulator._temp[:] = [30.0, 20.0, 10.0]
+    simulator.couple("a", "c", 5000.0)
+    heat = simulator._capacitance @ simulator._temp
+
+    for _ in range(2000):
+        simulator.step(START)
+
+    assert simulator._capacitance @ simulator._temp == pytest.approx(heat)
+    # a and c meet in the middle; b, now isolated, never moves
+    assert simulator._temp == pytest.approx([20.0] * 3, abs=0.01)
+
+
+def test_batches_may_reorder_or_subset_zones():
+    simulator = network()
+    simulator.generate_batch(ZONES)
+
+    readings = simulator.generate_batch([("open-office", 23.0)])
+    assert set(readings) == {"open-office"}
+    readings = simulator.generate_batch(list(reversed(ZONES)) + [("new-zone", 21.0)])
+    assert set(readings) == {"server-room", "open-office", "new-zone"}
+    assert simulator.zone_count == 3
+
+
+def test_seeded_runs_are_identical():
+    def run():
+        clock = SimulatedClock(START, 5.0)
+        simulator = create_simulator("rc_network", step_seconds=5.0, seed=42, clock=clock)
+        batches = []
+        for _ in range(50):
+            clock.advance()
+            batches.append(simulator.generate_batch(ZONES))
+        return batches
+
+    assert run() == run()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown simulator backend"):
+        create_simulator("finite_elements")
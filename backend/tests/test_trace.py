@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.mmap_trace import MmapReplaySource, convert_trace
+from app.services.simulator import SimulatedClock, create_simulator
+from app.services.trace import TraceReader, TraceReplaySource, TraceWriter, open_replay_source
+
+START = datetime(2026, 1, 7, 9, 0)
+ZONES = [("open-office", 23.0), ("server-room", 18.0), ("zone-3", 21.0)]
+
+
+def simulate(backend: str, ticks: int = 40, seed: int = 42) -> list:
+    """(timestamp, readings) per tick from a seeded simulator on a simulated clock."""
+    clock = SimulatedClock(START, 5.0)
+    simulator = create_simulator(backend, step_seconds=5.0, seed=seed, clock=clock)
+    run = []
+    for _ in range(ticks):
+        clock.advance()
+        run.append((clock(), simulator.generate_batch(ZONES)))
+    return run
+
+
+def record(path, run: list, events: dict = None):
+    writer = TraceWriter(str(path))
+    for i, (timestamp, readings) in enumerate(run):
+        writer.write_tick(timestamp, readings)
+        for event in (events or {}).get(i, []):
+            writer.write_event(event)
+    writer.close()
+
+
+def replay(source) -> list:
+    batches = []
+    while True:
+        batch = source.generate_batch(ZONES)
+        if source.finished:
+            return batches
+        batches.append((source.now(), batch))
+
+
+@pytest.mark.parametrize("backend", ["random_walk", "rc_network"])
+def test_seeded_simulation_is_deterministic(backend):
+    assert simulate(backend) == simulate(backend)
+    assert simulate(backend) != simulate(backend, seed=43)
+
+
+def test_replay_reproduces_the_recorded_run(tmp_path):
+    run = simulate("random_walk")
+    record(tmp_path / "run.trc", run)
+
+    assert replay(TraceReplaySource(str(tmp_path / "run.trc"))) == run
+
+
+def test_events_replay_after_their_tick(tmp_path):
+    run = simulate("random_walk", ticks=3)
+    online = {"type": "device_status", "device_id": "fcu-1", "status": "online"}
+    record(tmp_path / "run.trc", run, events={1: [online]})
+    source = TraceReplaySource(str(tmp_path / "run.trc"))
+
+    taken = []
+    for _ in range(3):
+        source.generate_batch(ZONES)
+        taken.append(source.take_events())
+
+    assert taken == [[], [online], []]
+
+
+def test_appending_continues_the_zone_table(tmp_path):
+    path = str(tmp_path / "run.trc")
+    run = simulate("random_walk", ticks=4)
+    record(path, run[:2])
+    writer = TraceWriter(path)
+    for timestamp, readings in run[2:]:
+        writer.write_tick(timestamp, {"zone-4": {"temperature": 20.0}, **readings})
+    writer.close()
+
+    assert TraceReader(path).zone_ids() == [zone_id for zone_id, _ in ZONES] + ["zone-4"]
+    ticks = list(TraceReader(path).ticks())
+    assert [tick.readings for tick in ticks[:2]] == [readings for _, readings in run[:2]]
+    assert ticks[3].readings["server-room"] == run[3][1]["server-room"]
+
+
+def test_truncated_trace_replays_up_to_its_last_complete_tick(tmp_path):
+    path = tmp_path / "run.trc"
+    run = simulate("random_walk", ticks=5)
+    record(path, run)
+    # Cut the last reading in half, as a crash mid-write would
+    path.write_bytes(path.read_bytes()[:-10])
+
+    ticks = list(TraceReader(str(path)).ticks())
+
+    assert [tick.readings for tick in ticks[:4]] == [readings for _, readings in run[:4]]
+    assert len(ticks[4].readings) == len(ZONES) - 1
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("not a trace")
+
+    with pytest.raises(ValueError, match="not a simulation trace"):
+        list(TraceReader(str(path)).ticks())
+
+
+def test_open_replay_source_picks_the_format(tmp_path):
+    record(tmp_path / "run.trc", simulate("random_walk", ticks=2))
+    convert_trace(str(tmp_path / "run.trc"), str(tmp_path / "run.fcum"))
+
+    assert isinstance(open_replay_source(str(tmp_path / "run.trc")), TraceReplaySource)
+    assert isinstance(open_replay_source(str(tmp_path / "run.fcum")), MmapReplaySource)